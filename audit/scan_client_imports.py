@@ -1,18 +1,48 @@
-import re
+import os
+import sys
+import json
 import pathlib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from fronteira_cliente import AnaliseFronteira
+
+TXT_FILE = pathlib.Path("audit/02d_client_imports_risky.txt")
+JSON_FILE = pathlib.Path("audit/02d_client_imports_risky.json")
+
+analise = AnaliseFronteira()
+
+# 1) Imports diretos de @/lib e @/modules em arquivos "use client" (formato original)
 out = []
-for p in pathlib.Path("src").rglob("*.ts*"):
-    try:
-        t = p.read_text(encoding="utf-8", errors="ignore")
-    except:
-        continue
-    
-    if re.search(r"^[\"']use client[\"']", t, re.M):
-        imps = re.findall(r"from ['\"](@/[^'\"]+|\.{1,2}/[^'\"]+)['\"]", t)
-        risky = [i for i in imps if i.startswith("@/lib") or i.startswith("@/modules")]
-        if risky:
-            out.append(f"{p} :: {', '.join(risky)}")
+for cliente in analise.clientes:
+    risky = analise.diretos(cliente)
+    if risky:
+        out.append(f"{pathlib.Path(cliente)} :: {', '.join(risky)}")
+
+# 2) Módulos server-only puxados transitivamente, com a cadeia de imports
+violacoes = analise.violacoes()
+if violacoes:
+    out.append("")
+    out.append("# TRANSITIVO: módulos server-only alcançados a partir de arquivos \"use client\"")
+    for cliente, alvos in violacoes:
+        for alvo, cadeia in alvos:
+            out.append(f"{pathlib.Path(cliente)} => {pathlib.Path(alvo)} :: {' -> '.join(str(pathlib.Path(c)) for c in cadeia)}")
+
+TXT_FILE.write_text("\n".join(out), encoding="utf-8")
+JSON_FILE.write_text(json.dumps({
+    "server_only_modules": sorted(p.replace("\\", "/") for p in analise.server_only),
+    "violations": [
+        {
+            "client": cliente.replace("\\", "/"),
+            "direct_imports": analise.diretos(cliente),
+            "server_only": [
+                {"module": alvo.replace("\\", "/"), "chain": [c.replace("\\", "/") for c in cadeia]}
+                for alvo, cadeia in alvos
+            ],
+        }
+        for cliente, alvos in violacoes
+    ],
+}, ensure_ascii=False, indent=2), encoding="utf-8")
 
-pathlib.Path("audit/02d_client_imports_risky.txt").write_text("\n".join(out), encoding="utf-8")
-print(f"wrote audit/02d_client_imports_risky.txt with {len(out)} entries")
+total = sum(len(alvos) for _, alvos in violacoes)
+print(f"wrote {TXT_FILE} with {len(out)} entries ({total} transitive server-only imports in {len(violacoes)} client files)")
+print(f"wrote {JSON_FILE}")
@@ -0,0 +1,212 @@
+"""
+CLI unificada das ferramentas de auditoria e correção (rodar da raiz do projeto):
+
+    python -m scripts audit [--since REF] [--profile] [--no-cache] [--jobs N]
+    python -m scripts fix [--dry-run | --yes | --saved-plan]
+    python -m scripts fix-localhost [--dry-run | --yes]
+    python -m scripts zombies [--dry-run | --yes]
+    python -m scripts health-dirs [--dry-run | --yes]
+    python -m scripts client-imports
+    python -m scripts migrations [--track supabase|legado] [--no-cache] [--no-csv]
+    python -m scripts routes [--no-cache] [--no-json]
+    python -m scripts build-secrets [--dir .next] [--jobs N] [--output ARQUIVO]
+
+Cada subcomando importa só os módulos de que precisa: a API paga essa partida
+a cada chamada (meça com python -X importtime -m scripts ...). Nada pergunta
+no terminal se houver --yes ou --dry-run; sem terminal e sem nenhum dos dois,
+a CLI sai com SAIDA_SEM_CONFIRMACAO em vez de travar no input().
+Com --json, o stdout é um único objeto JSON e o texto vai para o stderr.
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# CÓDIGOS DE SAÍDA
+SAIDA_OK = 0               # rodou e não há nada pendente (ou as correções foram aplicadas)
+SAIDA_PENDENCIAS = 1       # rodou e achou algo: achados, zumbis, violações, correções não aplicadas
+SAIDA_ERRO = 2             # erro de uso ou de execução
+SAIDA_OCUPADO = 3          # outra execução segurou a trava por mais que o limite
+SAIDA_SEM_CONFIRMACAO = 4  # era preciso confirmar e não há terminal: use --yes ou --dry-run
+
+CODIGOS_STATUS = {
+    "limpo": SAIDA_OK,
+    "aplicado": SAIDA_OK,
+    "pendente": SAIDA_PENDENCIAS,
+    "erro": SAIDA_ERRO,
+    "ocupado": SAIDA_OCUPADO,
+    "sem_confirmacao": SAIDA_SEM_CONFIRMACAO,
+}
+
+
+class SemConfirmacao(Exception):
+    pass
+
+
+def confirmador(args):
+    """pergunta -> bool que respeita --yes/--dry-run e nunca bloqueia sem terminal"""
+    def confirmar(pergunta):
+        if args.dry_run:
+            print("🔎 --dry-run: nada foi alterado.")
+            return False
+        if args.yes:
+            return True
+        if not sys.stdin.isatty():
+            raise SemConfirmacao(pergunta.strip())
+        return input(pergunta).strip().lower() == "s"
+    return confirmar
+
+
+# SUBCOMANDOS (imports dentro de cada um)
+
+def cmd_audit(args):
+    import auditor_funcional as auditor
+    if args.since:
+        codigo = auditor.auditar_desde(args.since)
+        if codigo == SAIDA_ERRO:
+            return {"status": "erro", "message": f"Não foi possível comparar com '{args.since}'"}
+        with open(auditor.DELTA_FILE, "r", encoding="utf-8") as f:
+            delta = auditor.json.load(f)
+        return {"status": "pendente" if delta["new"] else "limpo", **delta}
+    dados = auditor.auditar_unico(usar_cache=not args.no_cache, jobs=args.jobs, perfilar=args.profile)
+    return {
+        "status": "pendente" if dados["summary"]["total_errors"] else "limpo",
+        "summary": dados["summary"],
+        "report": auditor.JSON_FILE,
+        "text_report": auditor.RELATORIO_FILE,
+    }
+
+
+def cmd_fix(args):
+    import faxineiro
+    if args.saved_plan:
+        return faxineiro.faxina("apply")
+    return faxineiro.faxina("plan" if args.dry_run else None, confirmador(args))
+
+
+def cmd_fix_localhost(args):
+    import fix_localhost
+    return fix_localhost.executar(confirmador(args))
+
+
+def cmd_zombies(args):
+    import cacador_zumbis
+    return cacador_zumbis.caçar_zumbis(confirmador(args))
+
+
+def cmd_health_dirs(args):
+    import alien_health
+    return alien_health.alien_trabalhando(confirmador(args))
+
+
+def cmd_client_imports(args):
+    import fronteira_cliente
+    return fronteira_cliente.verificar_fronteira()
+
+
+def cmd_migrations(args):
+    import analisador_migracoes
+    return analisador_migracoes.analisar_migracoes(args.track, usar_cache=not args.no_cache, gravar=not args.no_csv)
+
+
+def cmd_routes(args):
+    import mapa_rotas
+    return mapa_rotas.gerar_mapa(usar_cache=not args.no_cache, gravar=not args.no_json)
+
+
+def cmd_build_secrets(args):
+    import segredos_build
+    return segredos_build.varrer_segredos(args.dir, args.jobs, args.output)
+
+
+def montar_parser():
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--json", action="store_true", help="stdout vira um único objeto JSON (o texto vai para o stderr)")
+
+    alteracao = argparse.ArgumentParser(add_help=False, parents=[comum])
+    grupo = alteracao.add_mutually_exclusive_group()
+    grupo.add_argument("--yes", "-y", action="store_true", help="aplica sem perguntar")
+    grupo.add_argument("--dry-run", action="store_true", help="só mostra o que seria feito")
+
+    parser = argparse.ArgumentParser(
+        prog="python -m scripts",
+        description="Auditoria e correção do código em src/",
+        epilog="Saída: 0 ok, 1 pendências encontradas, 2 erro, 3 trava ocupada, 4 precisa de --yes/--dry-run",
+    )
+    sub = parser.add_subparsers(dest="comando", required=True, metavar="COMANDO")
+
+    p = sub.add_parser("audit", parents=[comum], help="auditoria funcional (relatório TXT + JSON)")
+    p.add_argument("--since", metavar="REF", help="só o que mudou desde REF (git), comparado ao baseline")
+    p.add_argument("--profile", action="store_true", help="mede fases, regras e arquivos mais lentos")
+    p.add_argument("--no-cache", action="store_true", help="ignora o cache em .cache/audit/")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="processos em paralelo")
+    p.set_defaults(executar=cmd_audit, dry_run=False, yes=False)
+
+    p = sub.add_parser("fix", parents=[alteracao], help="faxina: localhost + console.log (com backup no cofre)")
+    p.add_argument("--saved-plan", action="store_true", help="aplica o último plano salvo por --dry-run (não aceita --dry-run)")
+    p.set_defaults(executar=cmd_fix)
+
+    p = sub.add_parser("fix-localhost", parents=[alteracao], help="só as URLs localhost:3000")
+    p.set_defaults(executar=cmd_fix_localhost)
+
+    p = sub.add_parser("zombies", parents=[alteracao], help="arquivos que nenhum ponto de entrada importa")
+    p.set_defaults(executar=cmd_zombies)
+
+    p = sub.add_parser("health-dirs", parents=[alteracao], help="subpastas órfãs em admin/health")
+    p.set_defaults(executar=cmd_health_dirs)
+
+    p = sub.add_parser("client-imports", parents=[comum], help="arquivos 'use client' que puxam código server-only")
+    p.set_defaults(executar=cmd_client_imports, dry_run=False, yes=False)
+
+    p = sub.add_parser("migrations", parents=[comum], help="RLS, policies, grants e ordem das migrações SQL (CSVs 03a-03e)")
+    p.add_argument("--track", choices=["supabase", "legado"], default="supabase", help="trilha usada nos CSVs")
+    p.add_argument("--no-cache", action="store_true", help="tokeniza todos os arquivos de novo")
+    p.add_argument("--no-csv", action="store_true", help="só mostra os achados")
+    p.set_defaults(executar=cmd_migrations, dry_run=False, yes=False)
+
+    p = sub.add_parser("routes", parents=[comum], help="regenera o mapa de rotas de src/app (09_routes.json), órfãs e conflitos")
+    p.add_argument("--no-cache", action="store_true", help="lê todas as pastas de novo")
+    p.add_argument("--no-json", action="store_true", help="só mostra órfãs e conflitos")
+    p.set_defaults(executar=cmd_routes, dry_run=False, yes=False)
+
+    p = sub.add_parser("build-secrets", parents=[comum], help="segredos vazados no output do next build (portão de deploy)")
+    p.add_argument("--dir", default=".next", help="pasta do build")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="processos em paralelo")
+    p.add_argument("--output", help="grava o relatório em texto (ex: audit/02e_next_build_secret_scan.txt)")
+    p.set_defaults(executar=cmd_build_secrets, dry_run=False, yes=False)
+    return parser
+
+
+def main(argv=None):
+    parser = montar_parser()
+    args = parser.parse_args(argv)
+    # --saved-plan aplica direto: com --dry-run o usuário espera que nada mude
+    if getattr(args, "saved_plan", False) and args.dry_run:
+        parser.error("fix: --saved-plan aplica o plano salvo e não pode ser usado com --dry-run")
+    from trava_execucao import TravaOcupada
+
+    # Com --json, os prints dos scripts vão para o stderr e o stdout fica só com o resultado
+    stdout_real = sys.stdout
+    if args.json:
+        sys.stdout = sys.stderr
+    try:
+        resultado = args.executar(args)
+    except SemConfirmacao as e:
+        print(f"❌ Sem terminal para confirmar ({e}). Use --yes para aplicar ou --dry-run para só ver.", file=sys.stderr)
+        resultado = {"status": "sem_confirmacao", "message": str(e)}
+    except TravaOcupada as e:
+        print(f"❌ {e}", file=sys.stderr)
+        resultado = {"status": "ocupado", "message": str(e), "owner": e.dono}
+    finally:
+        sys.stdout = stdout_real
+
+    if args.json:
+        import json
+        json.dump(resultado, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return CODIGOS_STATUS[resultado["status"]]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
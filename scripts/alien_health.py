@@ -1,44 +1,64 @@
 import os
-import shutil
+
+from cofre_backup import COFRE_DIR, Execucao
+from mapa_rotas import CachePastas, indexar, orfaos
+from trava_execucao import trava_exclusiva
 
 DIR_ALVO = os.path.join("src", "app", "(super-admin)", "admin", "health")
 ARQUIVO_CHEFE = os.path.join(DIR_ALVO, "page.tsx")
-DIR_BACKUP = "_BACKUP_HEALTH"
 
-def alien_trabalhando():
+def _perguntar(pergunta):
+    return input(pergunta).lower() == 's'
+
+def alien_trabalhando(confirmar=_perguntar):
+    """
+    confirmar: pergunta -> bool antes de mover (a CLI troca o input() por --yes/--dry-run).
+    Retorna um dict com "status" (limpo, pendente, aplicado ou erro) e as pastas.
+    """
     print(f"👽 Alien analisando: {DIR_ALVO}")
     
     if not os.path.exists(ARQUIVO_CHEFE):
         print("❌ Erro: page.tsx não encontrado.")
-        return
-
-    with open(ARQUIVO_CHEFE, 'r', encoding='utf-8') as f:
-        conteudo = f.read()
+        return {"status": "erro", "message": f"{ARQUIVO_CHEFE} não encontrado"}
 
+    # Órfã = não é rota (nenhuma page/route abaixo) e nenhum import aponta para ela.
+    # Subpastas com page.tsx própria (/admin/health/audit...) são rotas, mesmo sem link no page.tsx.
+    raiz, pastas = indexar(cache=CachePastas())
+    prefixo = os.path.normpath(DIR_ALVO) + os.sep
+    lixo = [
+        os.path.relpath(o["path"], DIR_ALVO)
+        for o in orfaos(raiz, pastas) if os.path.normpath(o["path"]).startswith(prefixo)
+    ]
     subpastas = [f.name for f in os.scandir(DIR_ALVO) if f.is_dir()]
-    lixo = []
+    em_uso = []
 
     print("-" * 40)
+    for pasta in lixo:
+        print(f"⚠️  LIXO DETECTADO: {pasta}")
     for pasta in subpastas:
-        if pasta.startswith('.'): continue
-        
-        # Se o nome da pasta não está escrito no page.tsx, é lixo
-        if pasta not in conteudo:
-            print(f"⚠️  LIXO DETECTADO: {pasta}")
-            lixo.append(pasta)
-        else:
-            print(f"✅  EM USO: {pasta}")
+        if pasta.startswith('.') or pasta in lixo: continue
+        print(f"✅  EM USO: {pasta}")
+        em_uso.append(pasta)
     print("-" * 40)
+    resultado = {"status": "limpo", "orphans": lixo, "in_use": em_uso, "backup": None}
 
-    if lixo:
-        resp = input(f"Encontrei {len(lixo)} pastas inúteis. Mover para {DIR_BACKUP}? (S/N): ")
-        if resp.lower() == 's':
-            if not os.path.exists(DIR_BACKUP): os.makedirs(DIR_BACKUP)
-            for item in lixo:
-                shutil.move(os.path.join(DIR_ALVO, item), os.path.join(DIR_BACKUP, item))
-            print("🚀 Limpeza concluída!")
-    else:
+    if not lixo:
         print("✨ Nada para limpar.")
+        return resultado
+
+    if not confirmar(f"Encontrei {len(lixo)} pastas inúteis. Mover para o cofre {COFRE_DIR}? (S/N): "):
+        resultado["status"] = "pendente"
+        return resultado
+
+    with trava_exclusiva("fix"):
+        execucao = Execucao("alien_health")
+        for item in lixo:
+            execucao.mover_pasta(os.path.join(DIR_ALVO, item))
+        execucao.finalizar()
+    print("🚀 Limpeza concluída!")
+    print(f"   Para desfazer: python scripts/cofre_backup.py restore {execucao.id}")
+    resultado.update(status="aplicado", backup=execucao.id)
+    return resultado
 
 if __name__ == "__main__":
     alien_trabalhando()
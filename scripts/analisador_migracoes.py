@@ -0,0 +1,956 @@
+import os
+import re
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+from bisect import bisect_right
+
+from indice_fontes import ArquivoFonte
+from cache_auditoria import CACHE_DIR, CacheAuditoria
+
+# CONFIGURAÇÃO
+# Cada trilha é reaplicada do zero, na ordem dos nomes dos arquivos.
+# supabase/20251215_all_in_one.sql é a concatenação de arquivos de
+# supabase/migrations (marcadores "-- FILE:") e não entra: contaria tudo duas vezes.
+TRILHAS = {
+    # Aplicada pelo supabase CLI: só arquivos <versão>_<nome>.sql, versões únicas
+    "supabase": {"antes": [], "pastas": [os.path.join("supabase", "migrations")], "cli": True},
+    # Ordem do COMO-APLICAR-MIGRATIONS.md: schema.sql e depois migrations/ no SQL Editor
+    "legado": {"antes": [os.path.join("supabase", "schema.sql")], "pastas": ["migrations"], "cli": False},
+}
+TRILHA_PADRAO = "supabase"
+MIGRACOES_CACHE_FILE = os.path.join(CACHE_DIR, "migracoes.json")
+PASTA_SAIDA = "audit"
+RLS_CSV = os.path.join(PASTA_SAIDA, "03a_rls_status.csv")
+POLICIES_CSV = os.path.join(PASTA_SAIDA, "03b_policies.csv")
+GRANTS_CSV = os.path.join(PASTA_SAIDA, "03c_grants.csv")
+DEFINER_CSV = os.path.join(PASTA_SAIDA, "03d_security_definer_functions.csv")
+ACHADOS_CSV = os.path.join(PASTA_SAIDA, "03e_migration_findings.csv")
+SCHEMA_PADRAO = "public"
+# O Supabase concede tudo em toda tabela nova de public a estes roles (ALTER DEFAULT PRIVILEGES)
+ROLES_PADRAO = ("anon", "authenticated", "service_role")
+PRIVILEGIOS_TABELA = ("DELETE", "INSERT", "REFERENCES", "SELECT", "TRIGGER", "TRUNCATE", "UPDATE")
+DONO_PADRAO = "postgres"
+NOME_MIGRACAO = re.compile(r"^(\d+)_.*\.sql$")
+
+# Incrementar quando a extração de fatos mudar (invalida o cache)
+VERSAO_ANALISADOR = 1
+
+# LÉXICO SQL
+# Grupos: 1 comentário, 2-3 dollar quote (tag, corpo), 4 string E'', 5 string,
+# 6 identificador entre aspas, 7 palavra, 8 número, 9 símbolo
+TOKEN_SQL = re.compile(
+    r"(--[^\n]*|/\*.*?(?:\*/|\Z))"
+    r"|\$([A-Za-z_]\w*|)\$(.*?)(?:\$\2\$|\Z)"
+    r"|(?<![\w$])[Ee]'((?:[^'\\]|''|\\.)*)'?"
+    r"|'((?:[^']|'')*)'?"
+    r'|"((?:[^"]|"")*)"?'
+    r"|([^\W\d][\w$]*)"
+    r"|(\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)"
+    r"|(::|[^\s\w])",
+    re.S,
+)
+PALAVRA, IDENT, TEXTO, DOLAR, NUMERO, SIMBOLO = range(6)
+_TIPO_GRUPO = {3: DOLAR, 4: TEXTO, 5: TEXTO, 6: IDENT, 7: PALAVRA, 8: NUMERO, 9: SIMBOLO}
+
+# Comandos reconhecidos dentro de blocos PL/pgSQL (DO $$ ... $$)
+INICIOS_PLPGSQL = {"CREATE", "ALTER", "DROP", "GRANT", "REVOKE", "PERFORM", "EXECUTE"}
+# Atributos de CREATE FUNCTION que encerram o tipo de RETURNS
+OPCOES_FUNCAO = {
+    "LANGUAGE", "AS", "SECURITY", "EXTERNAL", "SET", "STABLE", "IMMUTABLE", "VOLATILE", "STRICT",
+    "CALLED", "PARALLEL", "COST", "ROWS", "LEAKPROOF", "NOT", "WINDOW", "SUPPORT", "TRANSFORM",
+}
+MODOS_ARGUMENTO = {"IN", "OUT", "INOUT", "VARIADIC"}
+FORMATO = re.compile(r"%(.)")
+
+
+def tokenizar(texto, inicio=0, fim=None):
+    """[(tipo, valor, início, fim)] sem comentários; palavras em maiúsculas, offsets do próprio texto"""
+    tokens = []
+    for m in TOKEN_SQL.finditer(texto, inicio, len(texto) if fim is None else fim):
+        grupo = m.lastindex
+        if grupo == 1:
+            continue
+        tipo = _TIPO_GRUPO[grupo]
+        valor = m.group(grupo)
+        if tipo == PALAVRA:
+            valor = valor.upper()
+        elif tipo == TEXTO:
+            valor = valor.replace("''", "'")
+        elif tipo == IDENT:
+            valor = valor.replace('""', '"')
+        # Dollar quote: os offsets são os do corpo (para segmentar DO $$ ... $$ depois)
+        tokens.append((tipo, valor, m.start(grupo), m.end(grupo)) if tipo == DOLAR else (tipo, valor, m.start(), m.end()))
+    return tokens
+
+
+def comandos(tokens):
+    """Divide os tokens nos ";" (os de dentro de strings e dollar quotes já viraram um token só)"""
+    atual = []
+    for token in tokens:
+        if token[0] == SIMBOLO and token[1] == ";":
+            if atual:
+                yield atual
+            atual = []
+        else:
+            atual.append(token)
+    if atual:
+        yield atual
+
+
+def _ident(token):
+    if token is None:
+        return None
+    if token[0] == PALAVRA:
+        return token[1].lower()
+    if token[0] == IDENT:
+        return token[1]
+    return None
+
+
+def _formatar(modelo, valores):
+    """format() do PL/pgSQL com %I, %L, %s e %%; None se o modelo usar algo além disso"""
+    partes, restantes = [], iter(valores)
+    pos = 0
+    for m in FORMATO.finditer(modelo):
+        partes.append(modelo[pos:m.start()])
+        pos = m.end()
+        tipo = m.group(1)
+        if tipo == "%":
+            partes.append("%")
+            continue
+        valor = next(restantes, None)
+        if valor is None or tipo not in "sIL":
+            return None
+        if tipo == "I" and not re.fullmatch(r"[a-z_][a-z0-9_$]*", valor):
+            valor = '"' + valor.replace('"', '""') + '"'
+        elif tipo == "L":
+            valor = "'" + valor.replace("'", "''") + "'"
+        partes.append(valor)
+    partes.append(modelo[pos:])
+    return "".join(partes)
+
+
+class _Leitor:
+    """Cursor sobre os tokens de um comando"""
+
+    __slots__ = ("tokens", "pos", "texto")
+
+    def __init__(self, tokens, texto):
+        self.tokens = tokens
+        self.pos = 0
+        self.texto = texto
+
+    def olhar(self, i=0):
+        j = self.pos + i
+        return self.tokens[j] if j < len(self.tokens) else None
+
+    def palavra(self, i=0):
+        token = self.olhar(i)
+        return token[1] if token is not None and token[0] == PALAVRA else None
+
+    def simbolo(self, valor):
+        token = self.olhar()
+        if token is not None and token[0] == SIMBOLO and token[1] == valor:
+            self.pos += 1
+            return True
+        return False
+
+    def aceitar(self, *palavras):
+        """Consome a sequência de palavras se ela vier inteira"""
+        if all(self.palavra(i) == p for i, p in enumerate(palavras)):
+            self.pos += len(palavras)
+            return True
+        return False
+
+    def nome(self):
+        """[schema.]nome; sem schema, public"""
+        primeiro = _ident(self.olhar())
+        if primeiro is None:
+            return None
+        self.pos += 1
+        if self.simbolo("."):
+            segundo = _ident(self.olhar())
+            if segundo is not None:
+                self.pos += 1
+                return [primeiro, segundo]
+        return [SCHEMA_PADRAO, primeiro]
+
+    def nomes(self):
+        """Lista de nomes separados por vírgula"""
+        lista = []
+        while True:
+            nome = self.nome()
+            if nome is None:
+                return lista
+            lista.append(nome)
+            if not self.simbolo(","):
+                return lista
+
+    def grupo(self):
+        """Consome "( ... )" balanceado; retorna os tokens de dentro, ou None"""
+        if not self.simbolo("("):
+            return None
+        inicio, nivel = self.pos, 1
+        while self.pos < len(self.tokens):
+            tipo, valor = self.tokens[self.pos][:2]
+            self.pos += 1
+            if tipo == SIMBOLO and valor == "(":
+                nivel += 1
+            elif tipo == SIMBOLO and valor == ")":
+                nivel -= 1
+                if nivel == 0:
+                    return self.tokens[inicio:self.pos - 1]
+        return self.tokens[inicio:]
+
+    def texto_de(self, tokens):
+        """Trecho original dos tokens, com os espaços normalizados"""
+        if not tokens:
+            return ""
+        return " ".join(self.texto[tokens[0][2]:tokens[-1][3]].split())
+
+    def pular_ate(self, *palavras):
+        """Avança até a primeira das palavras fora de parênteses; False se não houver"""
+        while self.pos < len(self.tokens):
+            if self.palavra() in palavras:
+                return True
+            if self.grupo() is None:
+                self.pos += 1
+        return False
+
+
+def _separar_por_virgula(tokens):
+    partes, atual, nivel = [], [], 0
+    for token in tokens:
+        if token[0] == SIMBOLO and token[1] in "([":
+            nivel += 1
+        elif token[0] == SIMBOLO and token[1] in ")]":
+            nivel -= 1
+        elif token[0] == SIMBOLO and token[1] == "," and nivel == 0:
+            partes.append(atual)
+            atual = []
+            continue
+        atual.append(token)
+    if atual:
+        partes.append(atual)
+    return partes
+
+
+def _assinatura(tokens):
+    """Argumentos de uma função: (parâmetros de entrada [(nome, default)], quantos são obrigatórios)"""
+    parametros, obrigatorios = [], 0
+    for arg in _separar_por_virgula(tokens):
+        modo = arg[0][1] if arg[0][0] == PALAVRA and arg[0][1] in MODOS_ARGUMENTO else None
+        if modo is not None:
+            arg = arg[1:]
+        if modo == "OUT" or not arg:
+            continue
+        default = None
+        for i, token in enumerate(arg):
+            if (token[0] == PALAVRA and token[1] == "DEFAULT") or (token[0] == SIMBOLO and token[1] == "="):
+                seguinte = arg[i + 1] if i + 1 < len(arg) else None
+                default = seguinte[1] if seguinte is not None and seguinte[0] == TEXTO else ""
+                arg = arg[:i]
+                break
+        # "p_id uuid" tem nome; "uuid" sozinho não
+        nome = _ident(arg[0]) if len(arg) > 1 and arg[1][0] in (PALAVRA, IDENT) else None
+        parametros.append([nome, default])
+        if default is None:
+            obrigatorios = len(parametros)
+    return parametros, obrigatorios
+
+
+class ExtratorFatos:
+    """
+    Transforma o texto de uma migração na lista de "fatos" que a reaplicação
+    usa: tabelas, RLS, policies, grants, funções e chamadas. Cada fato é um
+    dict serializável (vai para o cache) com tipo, linha e se é condicional
+    (dentro de DO $$ ... $$, geralmente protegido por IF EXISTS).
+    """
+
+    def __init__(self, texto, linha_de):
+        self.texto = texto
+        self.linha_de = linha_de
+        self.fatos = []
+
+    @classmethod
+    def do_arquivo(cls, texto):
+        quebras = [m.start() for m in re.finditer("\n", texto)]
+        extrator = cls(texto, lambda offset: bisect_right(quebras, offset - 1) + 1)
+        extrator.extrair(tokenizar(texto))
+        return extrator.fatos
+
+    def extrair(self, tokens, condicional=False, plpgsql=False):
+        for comando in comandos(tokens):
+            if plpgsql:
+                comando = self._inicio_plpgsql(comando)
+                if comando is None:
+                    continue
+            try:
+                self._comando(comando, condicional)
+            except (IndexError, TypeError):
+                # Sintaxe que o extrator não conhece: o comando é ignorado
+                continue
+
+    @staticmethod
+    def _inicio_plpgsql(comando):
+        """Pula IF ... THEN, BEGIN, ELSE etc. até o comando SQL (condições ficam entre parênteses)"""
+        nivel = 0
+        for i, token in enumerate(comando):
+            if token[0] == SIMBOLO and token[1] == "(":
+                nivel += 1
+            elif token[0] == SIMBOLO and token[1] == ")":
+                nivel -= 1
+            elif nivel == 0 and token[0] == PALAVRA and token[1] in INICIOS_PLPGSQL:
+                return comando[i:]
+        return None
+
+    def _fato(self, tipo, comando, condicional, **dados):
+        self.fatos.append({"t": tipo, "linha": self.linha_de(comando[0][2]), "condicional": condicional, **dados})
+
+    def _comando(self, comando, condicional):
+        l = _Leitor(comando, self.texto)
+        inicio = l.palavra()
+        if inicio == "CREATE":
+            l.pos += 1
+            substituir = l.aceitar("OR", "REPLACE")
+            if l.palavra() in ("FUNCTION", "PROCEDURE"):
+                l.pos += 1
+                self._funcao(l, comando, condicional, substituir)
+            elif l.aceitar("POLICY"):
+                self._policy(l, comando, condicional)
+            elif l.palavra() in ("INDEX", "UNIQUE"):
+                self._indice(l, comando, condicional)
+            elif l.palavra() in ("TRIGGER", "CONSTRAINT"):
+                if l.pular_ate("ON") and l.aceitar("ON"):
+                    self._fato("ref", comando, condicional, tabela=l.nome(), se_existe=False)
+            else:
+                self._tabela(l, comando, condicional)
+        elif inicio == "ALTER":
+            l.pos += 1
+            if l.aceitar("TABLE"):
+                self._alterar_tabela(l, comando, condicional)
+            elif l.palavra() in ("FUNCTION", "PROCEDURE"):
+                l.pos += 1
+                self._alterar_funcao(l, comando, condicional)
+        elif inicio == "DROP":
+            l.pos += 1
+            if l.aceitar("TABLE"):
+                se_existe = l.aceitar("IF", "EXISTS")
+                for tabela in l.nomes():
+                    self._fato("drop_tabela", comando, condicional, tabela=tabela, se_existe=se_existe)
+            elif l.aceitar("POLICY"):
+                se_existe = l.aceitar("IF", "EXISTS")
+                nome = _ident(l.olhar())
+                l.pos += 1
+                if l.aceitar("ON"):
+                    self._fato("drop_policy", comando, condicional, nome=nome, tabela=l.nome(), se_existe=se_existe)
+            elif l.palavra() in ("FUNCTION", "PROCEDURE"):
+                l.pos += 1
+                se_existe = l.aceitar("IF", "EXISTS")
+                nome = l.nome()
+                args = l.grupo()
+                aridade = None if args is None else len(_assinatura(args)[0])
+                self._fato("drop_funcao", comando, condicional, funcao=nome, aridade=aridade, se_existe=se_existe)
+        elif inicio in ("GRANT", "REVOKE"):
+            self._grant(l, comando, condicional)
+        elif inicio == "DO":
+            l.pos += 1
+            while l.olhar() is not None and l.olhar()[0] != DOLAR:
+                l.pos += 1
+            corpo = l.olhar()
+            if corpo is not None:
+                self.extrair(tokenizar(self.texto, corpo[2], corpo[3]), condicional=True, plpgsql=True)
+        elif inicio in ("SELECT", "PERFORM"):
+            self._chamada(l, comando, condicional)
+        elif inicio == "EXECUTE":
+            # EXECUTE de texto fixo dentro de DO: o SQL gerado é extraído como se estivesse ali
+            l.pos += 1
+            sql = self._execute(l, {})
+            if sql is not None:
+                linha = self.linha_de(comando[0][2])
+                interno = ExtratorFatos(sql, lambda _: linha)
+                interno.extrair(tokenizar(sql), condicional=True)
+                self.fatos.extend(interno.fatos)
+
+    def _tabela(self, l, comando, condicional):
+        while l.palavra() in ("GLOBAL", "LOCAL", "UNLOGGED"):
+            l.pos += 1
+        if l.palavra() in ("TEMP", "TEMPORARY"):
+            return
+        if not l.aceitar("TABLE"):
+            return
+        se_nao_existe = l.aceitar("IF", "NOT", "EXISTS")
+        self._fato("tabela", comando, condicional, tabela=l.nome(), se_nao_existe=se_nao_existe)
+
+    def _indice(self, l, comando, condicional):
+        l.aceitar("UNIQUE")
+        l.aceitar("INDEX")
+        l.aceitar("CONCURRENTLY")
+        l.aceitar("IF", "NOT", "EXISTS")
+        if l.palavra() != "ON":
+            l.nome()
+        if l.aceitar("ON"):
+            l.aceitar("ONLY")
+            self._fato("ref", comando, condicional, tabela=l.nome(), se_existe=False)
+
+    def _alterar_tabela(self, l, comando, condicional):
+        se_existe = l.aceitar("IF", "EXISTS")
+        l.aceitar("ONLY")
+        tabela = l.nome()
+        acoes, renomear = [], None
+        while l.olhar() is not None:
+            if l.aceitar("ENABLE", "ROW", "LEVEL", "SECURITY"):
+                acoes.append("enable")
+            elif l.aceitar("DISABLE", "ROW", "LEVEL", "SECURITY"):
+                acoes.append("disable")
+            elif l.aceitar("FORCE", "ROW", "LEVEL", "SECURITY"):
+                acoes.append("force")
+            elif l.aceitar("NO", "FORCE", "ROW", "LEVEL", "SECURITY"):
+                acoes.append("no_force")
+            elif l.aceitar("RENAME", "TO"):
+                renomear = _ident(l.olhar())
+            elif l.grupo() is None:
+                l.pos += 1
+        self._fato("alter_tabela", comando, condicional, tabela=tabela, se_existe=se_existe, acoes=acoes, renomear=renomear)
+
+    def _policy(self, l, comando, condicional):
+        nome = _ident(l.olhar())
+        l.pos += 1
+        if not l.aceitar("ON"):
+            return
+        tabela = l.nome()
+        permissiva, cmd, roles, usando, checagem = "PERMISSIVE", "ALL", ["public"], None, None
+        while l.olhar() is not None:
+            if l.aceitar("AS"):
+                permissiva = l.palavra()
+                l.pos += 1
+            elif l.aceitar("FOR"):
+                cmd = l.palavra()
+                l.pos += 1
+            elif l.aceitar("TO"):
+                roles = []
+                while True:
+                    roles.append(_ident(l.olhar()))
+                    l.pos += 1
+                    if not l.simbolo(","):
+                        break
+            elif l.aceitar("USING"):
+                usando = l.texto_de(l.grupo())
+            elif l.aceitar("WITH", "CHECK"):
+                checagem = l.texto_de(l.grupo())
+            else:
+                l.pos += 1
+        self._fato("policy", comando, condicional, nome=nome, tabela=tabela, cmd=cmd, permissiva=permissiva,
+                   roles=roles, usando=usando, checagem=checagem)
+
+    def _funcao(self, l, comando, condicional, substituir):
+        funcao = l.nome()
+        args = l.grupo() or []
+        parametros, obrigatorios = _assinatura(args)
+        retorno, definer, search_path, linguagem, macros = "", False, False, None, []
+        while l.olhar() is not None:
+            if l.aceitar("RETURNS"):
+                inicio = l.pos
+                while l.olhar() is not None and l.palavra() not in OPCOES_FUNCAO:
+                    if l.grupo() is None:
+                        l.pos += 1
+                retorno = l.texto_de(comando[inicio:l.pos])
+            elif l.aceitar("SECURITY", "DEFINER") or l.aceitar("EXTERNAL", "SECURITY", "DEFINER"):
+                definer = True
+            elif l.aceitar("SECURITY", "INVOKER") or l.aceitar("EXTERNAL", "SECURITY", "INVOKER"):
+                definer = False
+            elif l.aceitar("SET"):
+                search_path = search_path or _ident(l.olhar()) == "search_path"
+            elif l.aceitar("LANGUAGE"):
+                linguagem = _ident(l.olhar())
+            elif l.aceitar("AS"):
+                corpo = l.olhar()
+                if corpo is not None and corpo[0] == DOLAR:
+                    macros = self._macros(tokenizar(self.texto, corpo[2], corpo[3]), parametros)
+                l.pos += 1
+            else:
+                l.pos += 1
+        self._fato("funcao", comando, condicional, funcao=funcao, args=l.texto_de(args), parametros=parametros,
+                   obrigatorios=obrigatorios, retorno=retorno, definer=definer, search_path=search_path,
+                   linguagem=linguagem, substituir=substituir, macros=macros)
+
+    def _macros(self, tokens, parametros):
+        """
+        EXECUTE format('...', p1, ...) do corpo, com os argumentos que são
+        parâmetros da função ou literais: uma chamada com valores literais
+        (PERFORM f('orders')) é expandida na reaplicação.
+        """
+        nomes = [nome for nome, _ in parametros]
+        macros = []
+        for i, token in enumerate(tokens):
+            if token[0] != PALAVRA or token[1] != "EXECUTE":
+                continue
+            l = _Leitor(tokens, self.texto)
+            l.pos = i + 1
+            if l.olhar() is not None and l.olhar()[0] == TEXTO:
+                macros.append([l.olhar()[1], []])
+            elif l.aceitar("FORMAT"):
+                args = l.grupo()
+                partes = _separar_por_virgula(args or [])
+                if not partes or len(partes[0]) != 1 or partes[0][0][0] != TEXTO:
+                    continue
+                valores = []
+                for parte in partes[1:]:
+                    if len(parte) == 1 and parte[0][0] == TEXTO:
+                        valores.append(["literal", parte[0][1]])
+                    elif len(parte) == 1 and _ident(parte[0]) in nomes:
+                        valores.append(["parametro", nomes.index(_ident(parte[0]))])
+                    else:
+                        break
+                else:
+                    macros.append([partes[0][0][1], valores])
+        return macros
+
+    def _execute(self, l, parametros):
+        """SQL de EXECUTE 'texto' ou EXECUTE format('...', literais); None se depender de variáveis"""
+        token = l.olhar()
+        if token is not None and token[0] == TEXTO:
+            return token[1]
+        if not l.aceitar("FORMAT"):
+            return None
+        partes = _separar_por_virgula(l.grupo() or [])
+        if not partes or any(len(p) != 1 or p[0][0] != TEXTO for p in partes):
+            return None
+        return _formatar(partes[0][0][1], [p[0][1] for p in partes[1:]])
+
+    def _alterar_funcao(self, l, comando, condicional):
+        funcao = l.nome()
+        args = l.grupo()
+        aridade = None if args is None else len(_assinatura(args)[0])
+        definer = search_path = None
+        while l.olhar() is not None:
+            if l.aceitar("SECURITY", "DEFINER"):
+                definer = True
+            elif l.aceitar("SECURITY", "INVOKER"):
+                definer = False
+            elif l.aceitar("SET"):
+                if _ident(l.olhar()) == "search_path":
+                    search_path = True
+            elif l.aceitar("RESET"):
+                if l.palavra() == "ALL" or _ident(l.olhar()) == "search_path":
+                    search_path = False
+            else:
+                l.pos += 1
+        if definer is not None or search_path is not None:
+            self._fato("alter_funcao", comando, condicional, funcao=funcao, aridade=aridade,
+                       definer=definer, search_path=search_path)
+
+    def _grant(self, l, comando, condicional):
+        revogar = l.palavra() == "REVOKE"
+        l.pos += 1
+        l.aceitar("GRANT", "OPTION", "FOR")
+        privilegios = []
+        while l.olhar() is not None and l.palavra() != "ON":
+            palavra = l.palavra()
+            l.pos += 1
+            if palavra is not None and l.grupo() is None and palavra not in ("PRIVILEGES",):
+                privilegios.append(palavra)
+            l.simbolo(",")
+        if not l.aceitar("ON"):
+            return   # GRANT role TO role
+        if "ALL" in privilegios:
+            privilegios = list(PRIVILEGIOS_TABELA)
+        if l.aceitar("ALL", "TABLES", "IN", "SCHEMA"):
+            objeto, alvos = "todas_tabelas", [[_ident(l.olhar())]]
+            l.pos += 1
+        elif l.palavra() in ("FUNCTION", "PROCEDURE", "ROUTINE"):
+            l.pos += 1
+            objeto, alvos = "funcao", []
+            while True:
+                nome = l.nome()
+                if nome is None:
+                    break
+                args = l.grupo()
+                alvos.append(nome + [None if args is None else len(_assinatura(args)[0])])
+                if not l.simbolo(","):
+                    break
+        elif l.palavra() in ("SEQUENCE", "SCHEMA", "ALL", "DATABASE", "TYPE", "DOMAIN", "LANGUAGE"):
+            return
+        else:
+            l.aceitar("TABLE")
+            objeto, alvos = "tabela", l.nomes()
+        if not (l.aceitar("FROM") or l.aceitar("TO")):
+            return
+        roles = []
+        while l.olhar() is not None:
+            token = l.olhar()
+            if token[0] == PALAVRA and token[1] in ("WITH", "CASCADE", "RESTRICT", "GRANTED"):
+                break
+            if token[0] in (PALAVRA, IDENT):
+                roles.append("PUBLIC" if token[0] == PALAVRA and token[1] == "PUBLIC" else _ident(token))
+            l.pos += 1
+        self._fato("grant", comando, condicional, revogar=revogar, objeto=objeto, alvos=alvos,
+                   privilegios=privilegios, roles=roles)
+
+    def _chamada(self, l, comando, condicional):
+        """SELECT/PERFORM f('literal', ...) sozinho no comando"""
+        l.pos += 1
+        funcao = l.nome()
+        args = l.grupo()
+        if funcao is None or args is None or l.olhar() is not None:
+            return
+        partes = _separar_por_virgula(args)
+        if all(len(p) == 1 and p[0][0] == TEXTO for p in partes):
+            self._fato("chamada", comando, condicional, funcao=funcao, args=[p[0][1] for p in partes])
+
+
+# REAPLICAÇÃO
+
+class ModeloBanco:
+    """Estado do banco depois de reaplicar uma trilha"""
+
+    def __init__(self):
+        self.tabelas = {}      # (schema, nome) -> {"rls", "forcado", "origem"}
+        self.politicas = {}    # (schema, tabela) -> {nome: fato da policy}, na ordem de criação
+        self.concessoes = {}   # (schema, tabela) -> {role: {privilégios}}
+        self.funcoes = {}      # (schema, nome, aridade) -> fato da função (+ "origem")
+
+
+class Reaplicacao:
+    """
+    Reaplica os fatos de uma trilha em ordem e anota os conflitos de ordem:
+    objeto usado antes de ser criado, criado duas vezes, policy recriada sem
+    DROP. Fatos condicionais (DO $$ com IF EXISTS) alteram o modelo mas não
+    geram conflito: o próprio SQL já se protege.
+    """
+
+    def __init__(self, nome, arquivos):
+        self.nome = nome
+        self.arquivos = arquivos   # [(caminho, fatos)]
+        self.modelo = ModeloBanco()
+        self.achados = []
+        self.posicao = (0, 0)
+        self.caminho = None
+        # Onde cada tabela é criada pela primeira vez (para separar "fora de ordem" de "nunca criada")
+        self.criacoes = {}
+        for i, (caminho, fatos) in enumerate(arquivos):
+            for fato in fatos:
+                if fato["t"] == "tabela":
+                    self.criacoes.setdefault(tuple(fato["tabela"]), ((i, fato["linha"]), caminho))
+
+    def executar(self):
+        for i, (caminho, fatos) in enumerate(self.arquivos):
+            self.caminho = caminho
+            for fato in fatos:
+                self.posicao = (i, fato["linha"])
+                getattr(self, "_" + fato["t"])(fato)
+        self._estado_final()
+        return self.modelo
+
+    def achado(self, severidade, tipo, objeto, mensagem, arquivo=None, linha=None):
+        self.achados.append({
+            "trilha": self.nome, "severidade": severidade, "tipo": tipo,
+            "arquivo": arquivo or self.caminho, "linha": self.posicao[1] if linha is None else linha,
+            "objeto": objeto, "mensagem": mensagem,
+        })
+
+    def _existe(self, fato, tabela, se_existe=False):
+        """A tabela existe neste ponto? Se não, anota o conflito de ordem (quando couber)"""
+        chave = tuple(tabela)
+        if chave in self.modelo.tabelas:
+            return True
+        if fato["condicional"] or se_existe or chave[0] != SCHEMA_PADRAO:
+            return False
+        criacao = self.criacoes.get(chave)
+        nome = ".".join(chave)
+        if criacao is not None and criacao[0] > self.posicao:
+            self.achado("alta", "ordem", nome, f"{fato['t']} em {nome} antes da criação em {criacao[1]}:{criacao[0][1]}")
+        else:
+            self.achado("aviso", "tabela_inexistente", nome, f"{fato['t']} em {nome}, que não existe neste ponto da trilha")
+        return False
+
+    def _tabela(self, fato):
+        chave = tuple(fato["tabela"])
+        if chave in self.modelo.tabelas:
+            if not fato["se_nao_existe"] and not fato["condicional"]:
+                origem = self.modelo.tabelas[chave]["origem"]
+                self.achado("alta", "conflito", ".".join(chave), f"CREATE TABLE sem IF NOT EXISTS; já criada em {origem}")
+            return
+        self.modelo.tabelas[chave] = {"rls": False, "forcado": False, "origem": f"{self.caminho}:{fato['linha']}"}
+        self.modelo.politicas[chave] = {}
+        self.modelo.concessoes[chave] = (
+            {role: set(PRIVILEGIOS_TABELA) for role in ROLES_PADRAO} if chave[0] == SCHEMA_PADRAO else {}
+        )
+
+    def _drop_tabela(self, fato):
+        chave = tuple(fato["tabela"])
+        if self._existe(fato, chave, fato["se_existe"]):
+            del self.modelo.tabelas[chave], self.modelo.politicas[chave], self.modelo.concessoes[chave]
+
+    def _ref(self, fato):
+        if fato["tabela"] is not None:
+            self._existe(fato, fato["tabela"], fato["se_existe"])
+
+    def _alter_tabela(self, fato):
+        chave = tuple(fato["tabela"])
+        if not self._existe(fato, chave, fato["se_existe"]):
+            return
+        tabela = self.modelo.tabelas[chave]
+        for acao in fato["acoes"]:
+            if acao in ("enable", "disable"):
+                tabela["rls"] = acao == "enable"
+            else:
+                tabela["forcado"] = acao == "force"
+        if fato["renomear"]:
+            nova = (chave[0], fato["renomear"])
+            for mapa in (self.modelo.tabelas, self.modelo.politicas, self.modelo.concessoes):
+                mapa[nova] = mapa.pop(chave)
+
+    def _policy(self, fato):
+        chave = tuple(fato["tabela"])
+        if not self._existe(fato, chave):
+            return
+        politicas = self.modelo.politicas[chave]
+        if fato["nome"] in politicas:
+            if not fato["condicional"]:
+                anterior = politicas[fato["nome"]]
+                self.achado("alta", "conflito", f"{'.'.join(chave)}: {fato['nome']}",
+                            f"CREATE POLICY sem DROP POLICY IF EXISTS antes; já criada em {anterior['origem']}")
+            return
+        politicas[fato["nome"]] = {**fato, "origem": f"{self.caminho}:{fato['linha']}"}
+
+    def _drop_policy(self, fato):
+        chave = tuple(fato["tabela"])
+        if self._existe(fato, chave, fato["se_existe"]):
+            self.modelo.politicas[chave].pop(fato["nome"], None)
+
+    def _grant(self, fato):
+        if fato["objeto"] == "funcao":
+            for schema, nome, aridade in fato["alvos"]:
+                if not self._funcoes(schema, nome, aridade) and not fato["condicional"]:
+                    self.achado("aviso", "ordem", f"{schema}.{nome}", f"GRANT/REVOKE em função que não existe neste ponto da trilha")
+            return
+        if fato["objeto"] == "todas_tabelas":
+            alvos = [chave for chave in self.modelo.tabelas if chave[0] == fato["alvos"][0][0]]
+        else:
+            alvos = [tuple(alvo) for alvo in fato["alvos"] if self._existe(fato, alvo)]
+        for chave in alvos:
+            concessoes = self.modelo.concessoes[chave]
+            for role in fato["roles"]:
+                privilegios = concessoes.setdefault(role, set())
+                if fato["revogar"]:
+                    privilegios.difference_update(fato["privilegios"])
+                else:
+                    privilegios.update(fato["privilegios"])
+
+    def _funcoes(self, schema, nome, aridade=None):
+        return [chave for chave in self.modelo.funcoes
+                if chave[:2] == (schema, nome) and (aridade is None or chave[2] == aridade)]
+
+    def _funcao(self, fato):
+        chave = (*fato["funcao"], len(fato["parametros"]))
+        anterior = self.modelo.funcoes.get(chave)
+        if anterior is not None and not fato["substituir"] and not fato["condicional"]:
+            self.achado("alta", "conflito", ".".join(fato["funcao"]),
+                        f"CREATE FUNCTION sem OR REPLACE; já criada em {anterior['origem']}")
+        self.modelo.funcoes[chave] = {**fato, "origem": f"{self.caminho}:{fato['linha']}"}
+
+    def _alter_funcao(self, fato):
+        for chave in self._funcoes(*fato["funcao"], fato["aridade"]):
+            funcao = self.modelo.funcoes[chave]
+            if fato["definer"] is not None:
+                funcao["definer"] = fato["definer"]
+            if fato["search_path"] is not None:
+                funcao["search_path"] = fato["search_path"]
+
+    def _drop_funcao(self, fato):
+        for chave in self._funcoes(*fato["funcao"], fato["aridade"]):
+            del self.modelo.funcoes[chave]
+
+    def _chamada(self, fato):
+        """Expande os EXECUTE format(...) da função chamada com os argumentos literais"""
+        for chave in self._funcoes(*fato["funcao"]):
+            funcao = self.modelo.funcoes[chave]
+            if not funcao["macros"] or not funcao["obrigatorios"] <= len(fato["args"]) <= len(funcao["parametros"]):
+                continue
+            valores = fato["args"] + [default for _, default in funcao["parametros"][len(fato["args"]):]]
+            for modelo_sql, argumentos in funcao["macros"]:
+                sql = _formatar(modelo_sql, [
+                    valores[valor] if tipo == "parametro" else valor for tipo, valor in argumentos
+                ])
+                if sql is None:
+                    continue
+                extrator = ExtratorFatos(sql, lambda _: fato["linha"])
+                extrator.extrair(tokenizar(sql), condicional=True)
+                for gerado in extrator.fatos:
+                    getattr(self, "_" + gerado["t"])(gerado)
+            return
+
+    def _estado_final(self):
+        for chave, tabela in sorted(self.modelo.tabelas.items()):
+            if chave[0] == SCHEMA_PADRAO and not tabela["rls"]:
+                arquivo, linha = tabela["origem"].rsplit(":", 1)
+                self.achado("alta", "sem_rls", ".".join(chave), "tabela em public sem ENABLE ROW LEVEL SECURITY",
+                            arquivo, int(linha))
+        for chave, funcao in sorted(self.modelo.funcoes.items()):
+            if funcao["definer"] and not funcao["search_path"]:
+                arquivo, linha = funcao["origem"].rsplit(":", 1)
+                self.achado("alta", "definer_sem_search_path", ".".join(chave[:2]),
+                            "SECURITY DEFINER sem SET search_path (sequestro de objetos via search_path)",
+                            arquivo, int(linha))
+
+
+# ANÁLISE
+
+def versao_migracoes():
+    return hashlib.sha1(json.dumps([VERSAO_ANALISADOR]).encode("utf-8")).hexdigest()
+
+
+def carregar_cache_migracoes():
+    return CacheAuditoria(versao_migracoes(), MIGRACOES_CACHE_FILE)
+
+
+def arquivos_da_trilha(config):
+    """Caminhos na ordem de aplicação; [(caminho, motivo)] dos que o supabase CLI ignoraria"""
+    caminhos = [c for c in config["antes"] if os.path.isfile(c)]
+    ignorados = []
+    for pasta in config["pastas"]:
+        if not os.path.isdir(pasta):
+            continue
+        with os.scandir(pasta) as entradas:
+            nomes = sorted(e.name for e in entradas if e.is_file() and e.name.endswith(".sql"))
+        for nome in nomes:
+            caminho = os.path.join(pasta, nome).replace("\\", "/")
+            if config["cli"] and not NOME_MIGRACAO.match(nome):
+                ignorados.append(caminho)
+            else:
+                caminhos.append(caminho)
+    return caminhos, ignorados
+
+
+def _prefixos_duplicados(caminhos, severidade):
+    por_versao = {}
+    for caminho in caminhos:
+        m = NOME_MIGRACAO.match(os.path.basename(caminho))
+        if m:
+            por_versao.setdefault(m.group(1), []).append(caminho)
+    for versao, lista in sorted(por_versao.items()):
+        if len(lista) > 1:
+            for caminho in lista[1:]:
+                yield severidade, "prefixo_duplicado", versao, caminho, \
+                    f"versão {versao} também usada por {lista[0]}: a ordem entre eles depende só do nome"
+
+
+def indexar(caminhos, cache=None):
+    """Fatos de cada arquivo; só os alterados desde a última execução são tokenizados de novo"""
+    indices = {}
+    for caminho in caminhos:
+        arquivo = ArquivoFonte.de_caminho(caminho)
+        fatos = cache.obter(arquivo) if cache else None
+        if fatos is None:
+            conteudo = arquivo.conteudo
+            fatos = ExtratorFatos.do_arquivo(conteudo) if conteudo is not None else []
+            if cache and conteudo is not None:
+                cache.guardar(arquivo, fatos)
+        indices[caminho] = fatos
+    return indices
+
+
+def analisar(cache=None):
+    """Reaplica todas as trilhas: {nome: Reaplicacao} (modelo + achados)"""
+    resultados = {}
+    planos = {nome: arquivos_da_trilha(config) for nome, config in TRILHAS.items()}
+    todos = sorted({c for caminhos, _ in planos.values() for c in caminhos})
+    indices = indexar(todos, cache)
+    if cache:
+        cache.podar(todos)
+        cache.salvar()
+    for nome, (caminhos, ignorados) in planos.items():
+        reaplicacao = Reaplicacao(nome, [(c, indices[c]) for c in caminhos])
+        reaplicacao.executar()
+        severidade = "alta" if TRILHAS[nome]["cli"] else "aviso"
+        for _, tipo, objeto, caminho, mensagem in _prefixos_duplicados(caminhos, severidade):
+            reaplicacao.achado(severidade, tipo, objeto, mensagem, caminho, 1)
+        for caminho in ignorados:
+            reaplicacao.achado("aviso", "ignorado", os.path.basename(caminho),
+                               "fora do padrão <versão>_<nome>.sql: o supabase CLI não aplica este arquivo", caminho, 1)
+        resultados[nome] = reaplicacao
+    return resultados
+
+
+def _gravar_csv(caminho, cabecalho, linhas):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho + ".tmp", "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f, lineterminator="\n")
+        escritor.writerow(cabecalho)
+        escritor.writerows(linhas)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def gravar_csvs(modelo, achados):
+    """Mesmas colunas das consultas do 03B_execution_guide, a partir do modelo em vez do banco"""
+    _gravar_csv(RLS_CSV, ["schema", "table", "rls_enabled", "rls_forced"], [
+        [schema, nome, str(t["rls"]).lower(), str(t["forcado"]).lower()]
+        for (schema, nome), t in sorted(modelo.tabelas.items())
+    ])
+    _gravar_csv(POLICIES_CSV, ["schemaname", "tablename", "policyname", "cmd", "permissive", "roles", "qual", "with_check"], [
+        [schema, nome, p["nome"], p["cmd"], p["permissiva"], "{" + ",".join(p["roles"]) + "}", p["usando"] or "", p["checagem"] or ""]
+        for (schema, nome), politicas in sorted(modelo.politicas.items()) for p in politicas.values()
+    ])
+    _gravar_csv(GRANTS_CSV, ["grantee", "table_schema", "table_name", "privilege_type"], sorted(
+        [role, schema, nome, privilegio]
+        for (schema, nome), concessoes in modelo.concessoes.items()
+        for role, privilegios in concessoes.items() for privilegio in privilegios
+    ))
+    definers = [
+        [schema, nome, "true", f["args"], f["retorno"], DONO_PADRAO]
+        for (schema, nome, _), f in sorted(modelo.funcoes.items()) if f["definer"]
+    ]
+    _gravar_csv(DEFINER_CSV, ["schema", "function_name", "security_definer", "args", "return_type", "owner"],
+                definers or [[SCHEMA_PADRAO, "no_security_definer_functions_found", "false", "", "", DONO_PADRAO]])
+    _gravar_csv(ACHADOS_CSV, ["track", "severity", "kind", "file", "line", "object", "message"], [
+        [a["trilha"], a["severidade"], a["tipo"], a["arquivo"], a["linha"], a["objeto"], a["mensagem"]] for a in achados
+    ])
+
+
+def analisar_migracoes(trilha=TRILHA_PADRAO, usar_cache=True, gravar=True):
+    inicio = time.perf_counter()
+    cache = carregar_cache_migracoes() if usar_cache else None
+    resultados = analisar(cache)
+    achados = [a for r in resultados.values() for a in r.achados]
+    modelo = resultados[trilha].modelo
+
+    print("🗄️  ANALISADOR DE MIGRAÇÕES SQL")
+    print("=" * 60)
+    for nome, r in resultados.items():
+        m = r.modelo
+        print(f"📂 {nome}: {len(r.arquivos)} arquivos → {len(m.tabelas)} tabelas, "
+              f"{sum(len(p) for p in m.politicas.values())} policies, {len(m.funcoes)} funções")
+    for severidade, emoji in (("alta", "🔴"), ("aviso", "🟡")):
+        lista = [a for a in achados if a["severidade"] == severidade]
+        if lista:
+            print(f"\n{emoji} {len(lista)} achado(s) de severidade {severidade}:")
+            for a in lista:
+                print(f"   [{a['trilha']}] {a['arquivo']}:{a['linha']} {a['tipo']}: {a['objeto']} — {a['mensagem']}")
+    if gravar:
+        gravar_csvs(modelo, achados)
+        print(f"\n📝 CSVs da trilha '{trilha}': {RLS_CSV}, {POLICIES_CSV}, {GRANTS_CSV}, {DEFINER_CSV}")
+        print(f"📝 Achados de todas as trilhas: {ACHADOS_CSV}")
+    cache_info = f", cache {cache.hits}/{cache.hits + cache.misses}" if cache else ""
+    print(f"📊 {len(achados)} achados em {(time.perf_counter() - inicio) * 1000:.0f}ms{cache_info}")
+    return {
+        "status": "pendente" if achados else "limpo",
+        "track": trilha,
+        "tables": len(modelo.tabelas),
+        "tables_without_rls": sum(1 for (s, _), t in modelo.tabelas.items() if s == SCHEMA_PADRAO and not t["rls"]),
+        "findings": achados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análise estática das migrações SQL (RLS, policies, grants, funções)")
+    parser.add_argument("--trilha", choices=sorted(TRILHAS), default=TRILHA_PADRAO, help="trilha usada nos CSVs")
+    parser.add_argument("--no-cache", action="store_true", help="tokeniza todos os arquivos de novo")
+    parser.add_argument("--sem-csv", action="store_true", help="só mostra os achados")
+    args = parser.parse_args()
+    resultado = analisar_migracoes(args.trilha, usar_cache=not args.no_cache, gravar=not args.sem_csv)
+    sys.exit(1 if resultado["findings"] else 0)
@@ -0,0 +1,67 @@
+from array import array
+
+# CONFIGURAÇÃO
+TAMANHO_TRECHO = 60
+BYTES_IMPRESSAO = 8   # impressão = 16 caracteres hex
+
+
+def ler_trecho(caminho, inicio, fim, limite=TAMANHO_TRECHO):
+    """Texto da linha [inicio, fim) (offsets em bytes), lido do disco só quando pedido"""
+    try:
+        with open(caminho, "rb") as f:
+            f.seek(inicio)
+            linha = f.read(fim - inicio).decode("utf-8", errors="replace").strip()
+    except OSError:
+        return ""
+    return linha[:limite] + "..." if len(linha) > limite else linha
+
+
+class ArmazemAchados:
+    """
+    Achados de uma auditoria em arrays paralelos (regra, arquivo, linha,
+    offsets da linha e impressão) em vez de um dict por achado. Cada caminho
+    é guardado uma vez; emoji, descrição e tipo vêm da tabela de regras; o
+    trecho só é lido do disco quando alguém pede.
+
+    Os achados de um arquivo chegam como tuplas
+    (índice da regra, linha, início, fim, impressão), o mesmo formato do
+    cache em disco.
+    """
+
+    def __init__(self, regras):
+        self.regras = list(regras)
+        self.caminhos = []
+        self.arquivo = array("I")
+        self.regra = array("B")
+        self.linha = array("I")
+        self.inicio = array("Q")
+        self.fim = array("Q")
+        self.impressoes = bytearray()
+
+    def __len__(self):
+        return len(self.linha)
+
+    def adicionar(self, caminho, achados):
+        if not achados:
+            return
+        id_arquivo = len(self.caminhos)
+        self.caminhos.append(caminho)
+        for regra, linha, inicio, fim, impressao in achados:
+            self.arquivo.append(id_arquivo)
+            self.regra.append(regra)
+            self.linha.append(linha)
+            self.inicio.append(inicio)
+            self.fim.append(fim)
+            self.impressoes += bytes.fromhex(impressao)
+
+    def caminho(self, i):
+        return self.caminhos[self.arquivo[i]]
+
+    def nome_regra(self, i):
+        return self.regras[self.regra[i]]
+
+    def impressao(self, i):
+        return self.impressoes[i * BYTES_IMPRESSAO:(i + 1) * BYTES_IMPRESSAO].hex()
+
+    def trecho(self, i):
+        return ler_trecho(self.caminho(i), self.inicio[i], self.fim[i])
@@ -1,159 +1,390 @@
 import os
-import re
+import sys
 import json
+import time
+import argparse
 from datetime import datetime
 
+from indice_fontes import PASTA_SRC, EXTENSOES, ArquivoFonte, hash_bytes, obter_indice
+from motor_padroes import MotorPadroes
+from cache_auditoria import CacheAuditoria, versao_regras
+from perfil_auditoria import PerfilAuditoria
+from armazem_achados import ArmazemAchados, ler_trecho
+from detector_clones import MIN_TOKENS as MIN_TOKENS_CLONE, detectar_clones, carregar_cache_clones
+from trava_execucao import TravaOcupada, trava_exclusiva, executar_unico
+from baseline_auditoria import (
+    BASELINE_FILE, DELTA_FILE, normalizar, impressao, carregar_baseline,
+    salvar_baseline, arquivos_alterados, comparar,
+)
+
 # CONFIGURAÇÃO
-PASTA_SRC = "src"
-EXTENSOES = {".ts", ".tsx"}
-IGNORE_DIRS = {"node_modules", ".next", "dist", "build", ".git", "_BACKUP_LIXO", "_BACKUP_ZUMBIS"}
 RELATORIO_FILE = "relatorio_auditoria.txt"
 JSON_FILE = os.path.join("public", "audit-report.json")
 
+# Abaixo disso o custo de subir o pool de processos não compensa
+LIMIAR_PARALELO = 64
+LOTES_POR_PROCESSO = 4
+
+# Grupos de clones listados no TXT (o JSON tem todos)
+MAX_CLONES_TXT = 15
+
+# No modo --stream, um registro de progresso a cada N arquivos
+INTERVALO_PROGRESSO = 25
+
 # PADRÕES A DETECTAR
+# "resumo" é a chave do summary do JSON em que cada ocorrência é contada;
+# "literais" são trechos que toda ocorrência contém (prefiltro em bytes);
+# "contexto" diz onde a ocorrência precisa começar segundo o léxico
+# (codigo, comentario, string, template); "multilinha" deixa o regex
+# atravessar linhas (ex: onClick={() => {\n}})
 PADROES = {
     # Botões Fantasmas
     "botao_vazio": {
         "regex": r'onClick=\{\s*\(\)\s*=>\s*\{\s*\}\s*\}',
         "emoji": "👻",
-        "desc": "Botão sem ação (onClick vazio)"
+        "desc": "Botão sem ação (onClick vazio)",
+        "resumo": "broken_buttons",
+        "literais": ["onClick"],
+        "contexto": ["codigo"],
+        "multilinha": True
     },
     "href_vazio": {
         "regex": r'href=["\'](#|)["\']',
         "emoji": "👻",
-        "desc": "Link sem destino (href='#' ou vazio)"
+        "desc": "Link sem destino (href='#' ou vazio)",
+        "resumo": "broken_buttons",
+        "literais": ["href="],
+        "contexto": ["codigo"]
     },
     "console_log": {
         "regex": r'console\.log\s*\(',
         "emoji": "🐛",
-        "desc": "Console.log esquecido"
+        "desc": "Console.log esquecido",
+        "resumo": "console_logs",
+        "literais": ["console."],
+        "contexto": ["codigo"]
     },
     
     # Mocks e Dados Falsos
     "mock_data": {
         "regex": r'\b(const|let|var)\s+\w*(mock|Mock|MOCK|dummy|Dummy|faker|Faker|fake|Fake)\w*\s*=',
         "emoji": "🤡",
-        "desc": "Dados Mock/Fake detectados"
+        "desc": "Dados Mock/Fake detectados",
+        "resumo": "mock_data",
+        "literais": ["mock", "Mock", "MOCK", "dummy", "Dummy", "fake", "Fake"],
+        "contexto": ["codigo"]
     },
     "todo_comment": {
         "regex": r'(//|/\*|\*)\s*(TODO|FIXME|XXX|HACK)',
         "emoji": "📝",
-        "desc": "Comentário TODO/FIXME pendente"
+        "desc": "Comentário TODO/FIXME pendente",
+        "resumo": "todos_pending",
+        "literais": ["TODO", "FIXME", "XXX", "HACK"],
+        "contexto": ["comentario"]
     },
     
     # Redirecionamentos Suspeitos
     "router_push_vazio": {
         "regex": r'router\.push\s*\(\s*["\']["\']',
         "emoji": "🔀",
-        "desc": "Router.push vazio"
+        "desc": "Router.push vazio",
+        "resumo": "broken_buttons",
+        "literais": ["router.push"],
+        "contexto": ["codigo"],
+        "multilinha": True
     },
     "localhost_hardcoded": {
         "regex": r'https?://localhost(:\d+)?',
         "emoji": "🏠",
-        "desc": "URL localhost hardcoded"
+        "desc": "URL localhost hardcoded",
+        "resumo": "localhost_urls",
+        "literais": ["localhost"],
+        "contexto": ["codigo", "string", "template"]
     },
     "href_localhost": {
         "regex": r'href=["\']https?://localhost',
         "emoji": "🏠",
-        "desc": "Link com localhost hardcoded"
+        "desc": "Link com localhost hardcoded",
+        "resumo": "localhost_urls",
+        "literais": ["localhost"],
+        "contexto": ["codigo"]
     }
 }
 
+# Ordem das chaves no summary do JSON
+CHAVES_RESUMO = ["broken_buttons", "todos_pending", "console_logs", "mock_data", "localhost_urls"]
+
+# Os achados guardam o índice da regra; o resto vem daqui na hora de escrever
+NOMES_REGRAS = list(PADROES)
+REGRAS = [
+    {
+        "emoji": config["emoji"],
+        "desc": config["desc"],
+        "tipo": config["desc"].split("(")[0].strip(),
+        "resumo": config["resumo"],
+    }
+    for config in PADROES.values()
+]
+
 def listar_arquivos(pasta):
-    arquivos = []
-    for root, dirs, files in os.walk(pasta):
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        for file in files:
-            _, ext = os.path.splitext(file)
-            if ext in EXTENSOES:
-                arquivos.append(os.path.join(root, file))
-    return arquivos
-
-def auditar_arquivo(filepath):
+    return obter_indice(pasta).arquivos(EXTENSOES)
+
+# Todas as regras compiladas em um único regex (uma passada por arquivo)
+MOTOR = MotorPadroes(PADROES)
+
+def auditar_dados(arquivo, dados):
+    """
+    Achados a partir do conteúdo cru (bytes ou mmap): só as linhas com ocorrência
+    são decodificadas. Cada achado é uma tupla (índice da regra, linha, início,
+    fim, impressão), com os offsets da linha em bytes (o trecho é lido depois,
+    só se alguém precisar dele).
+    """
     problemas = []
+    ordens = {}
+    for num_linha, idx, inicio, fim, linha in MOTOR.varrer_bytes(dados):
+        nome_padrao = NOMES_REGRAS[idx]
+        normalizado = normalizar(linha)
+        ordem = ordens.get((idx, normalizado), 0)
+        ordens[(idx, normalizado)] = ordem + 1
+        problemas.append(
+            (idx, num_linha, inicio, fim, impressao(nome_padrao, arquivo.caminho_rel, normalizado, ordem))
+        )
+    return problemas
+
+def auditar_arquivo_com_hash(arquivo):
+    """(problemas, hash do conteúdo). Arquivo ilegível gera aviso em vez de sumir calado."""
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            linhas = f.readlines()
-            
-        for num_linha, linha in enumerate(linhas, 1):
-            for nome_padrao, config in PADROES.items():
-                if re.search(config["regex"], linha):
-                    # Extrai um trecho da linha para contexto
-                    trecho = linha.strip()[:60] + "..." if len(linha.strip()) > 60 else linha.strip()
-                    problemas.append({
-                        "linha": num_linha,
-                        "emoji": config["emoji"],
-                        "desc": config["desc"],
-                        "trecho": trecho
-                    })
-    except Exception as e:
-        pass
+        with arquivo.bytes_brutos() as dados:
+            return auditar_dados(arquivo, dados), hash_bytes(dados)
+    except OSError as e:
+        print(f"⚠️  Não foi possível ler {arquivo.caminho_rel}: {e}", file=sys.stderr)
+        return [], None
+
+def auditar_arquivo(arquivo):
+    return auditar_arquivo_com_hash(arquivo)[0]
+
+def auditar_perfilado(arquivos, perfil):
+    """Auditoria serial com tempo de leitura/varredura por arquivo e custo de cada regra"""
+    saida = []
+    for arquivo in arquivos:
+        inicio = time.perf_counter()
+        with arquivo.bytes_brutos() as dados:
+            lido = time.perf_counter()
+            problemas = auditar_dados(arquivo, dados)
+        perfil.registrar_arquivo(arquivo, lido - inicio, time.perf_counter() - lido)
+        perfil.medir_regras(arquivo)
+        saida.append((arquivo, problemas))
+    return saida
+
+def _auditar_lote(lote):
+    """Roda dentro do pool: audita um lote de (caminho, tamanho, mtime)"""
+    return [auditar_arquivo_com_hash(ArquivoFonte(*item)) for item in lote]
+
+def auditar_em_paralelo(arquivos, jobs):
+    """
+    Audita os arquivos em lotes num ProcessPoolExecutor.
+    Gera (problemas, hash) na mesma ordem de entrada, à medida que os lotes terminam.
+    """
+    if jobs <= 1 or len(arquivos) < LIMIAR_PARALELO:
+        for a in arquivos:
+            yield auditar_arquivo_com_hash(a)
+        return
     
-    return problemas
+    tamanho_lote = max(1, -(-len(arquivos) // (jobs * LOTES_POR_PROCESSO)))
+    lotes = [
+        [(a.caminho, a.tamanho, a.mtime) for a in arquivos[i:i + tamanho_lote]]
+        for i in range(0, len(arquivos), tamanho_lote)
+    ]
+    # Import sob demanda: o pool custa ~25ms de import que a auditoria com cache não usa
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # pool.map preserva a ordem dos lotes: o relatório sai igual ao serial
+        for resultado in pool.map(_auditar_lote, lotes):
+            yield from resultado
+
+def iterar_auditoria(arquivos, cache, jobs=1):
+    """
+    Gera (arquivo, problemas) na ordem da varredura: os arquivos que não
+    mudaram vêm do cache em disco, os demais são auditados sob demanda.
+    """
+    cacheados = [cache.obter(a) if cache else None for a in arquivos]
+    auditados = auditar_em_paralelo([a for a, p in zip(arquivos, cacheados) if p is None], jobs)
+    
+    for arquivo, problemas in zip(arquivos, cacheados):
+        if problemas is None:
+            problemas, hash_arquivo = next(auditados)
+            if cache:
+                cache.guardar(arquivo, problemas, hash_arquivo)
+        yield arquivo, problemas
+    
+    if cache:
+        cache.podar(a.caminho_rel for a in arquivos)
+        cache.salvar()
+
+def auditar_com_cache(arquivos, cache, jobs=1):
+    """Audita só os arquivos que mudaram; os demais vêm do cache em disco"""
+    return list(iterar_auditoria(arquivos, cache, jobs))
+
+def _erro_json(caminho_rel, achado):
+    """Registro de um achado no formato do audit-report.json"""
+    idx, linha, _, _, impressao_achado = achado
+    regra = REGRAS[idx]
+    return {
+        "file": caminho_rel.replace("\\", "/"),
+        "line": linha,
+        "type": regra["tipo"],
+        "category": "other",
+        "message": regra["desc"],
+        "emoji": regra["emoji"],
+        "rule": NOMES_REGRAS[idx],
+        "fingerprint": impressao_achado
+    }
+
+def _erros_json(armazem):
+    """Um registro por vez, montado na hora de serializar"""
+    for i in range(len(armazem)):
+        achado = (armazem.regra[i], armazem.linha[i], armazem.inicio[i], armazem.fim[i], armazem.impressao(i))
+        yield _erro_json(armazem.caminho(i), achado)
+
+def gravar_json(caminho, dados, chave, itens):
+    """
+    Igual a json.dump(dados, indent=2), mas a lista `chave` (vazia em dados)
+    é escrita item a item a partir de `itens`: a lista inteira nunca existe
+    em memória.
+    """
+    texto = json.dumps(dados, ensure_ascii=False, indent=2)
+    antes, depois = texto.split(f'\n  "{chave}": []', 1)
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(f'{antes}\n  "{chave}": [')
+        vazio = True
+        for item in itens:
+            corpo = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+            f.write(("\n    " if vazio else ",\n    ") + corpo)
+            vazio = False
+        f.write("]" if vazio else "\n  ]")
+        f.write(depois)
 
-def gerar_relatorio():
-    print("🔍 AUDITOR FUNCIONAL - Iniciando varredura...")
-    print("=" * 60)
+def _emitir(registro):
+    """Uma linha NDJSON no stdout, sem buffer (o route repassa ao navegador)"""
+    sys.stdout.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+def _calado(*args, **kwargs):
+    pass
+
+def gerar_relatorio(usar_cache=True, jobs=1, perfilar=False, stream=False, cache=None, quieto=False, cache_clones=None):
+    """
+    Audita src/, grava o TXT e o JSON e retorna os dados do JSON sem a lista
+    "errors" (ela só existe no arquivo; use carregar_relatorio()).
+    cache / cache_clones: caches de achados e de impressões já carregados
+    (o daemon e o --watch mantêm os dois em memória).
+    """
+    # No modo stream o stdout é só NDJSON: start, finding, progress e summary
+    log = _calado if stream or quieto else print
+    emitir = _emitir if stream else None
     
+    log("🔍 AUDITOR FUNCIONAL - Iniciando varredura...")
+    log("=" * 60)
+    
+    # O perfil mede leitura e varredura de verdade: sem cache e sem pool
+    perfil = PerfilAuditoria(MOTOR) if perfilar else None
+    inicio_walk = time.perf_counter()
     arquivos = listar_arquivos(PASTA_SRC)
-    print(f"📁 Encontrados {len(arquivos)} arquivos para analisar\n")
+    if perfil:
+        perfil.fases["walk"] += time.perf_counter() - inicio_walk
+    log(f"📁 Encontrados {len(arquivos)} arquivos para analisar\n")
+    if emitir:
+        emitir({"type": "start", "files_total": len(arquivos)})
+    
+    if perfil:
+        cache = None
+        resultados = auditar_perfilado(arquivos, perfil)
+    else:
+        if cache is None and usar_cache:
+            cache = CacheAuditoria(versao_regras(PADROES))
+        resultados = iterar_auditoria(arquivos, cache, jobs)
+    inicio_serializacao = time.perf_counter()
     
-    relatorio = []
     total_problemas = 0
     arquivos_com_problemas = 0
     
-    # Estrutura JSON
-    json_errors = []
-    contadores = {
-        "botao_vazio": 0,
-        "href_vazio": 0,
-        "console_log": 0,
-        "mock_data": 0,
-        "todo_comment": 0,
-        "router_push_vazio": 0,
-        "localhost_hardcoded": 0,
-        "href_localhost": 0
-    }
+    # Achados compactos (arrays paralelos); o JSON é escrito a partir deles no fim
+    armazem = ArmazemAchados(NOMES_REGRAS)
+    resumo_por_chave = dict.fromkeys(CHAVES_RESUMO, 0)
+    
+    # O TXT é escrito à medida que os arquivos são auditados, num temporário:
+    # quem lê o relatório nunca vê um arquivo pela metade
+    relatorio = open(RELATORIO_FILE + ".tmp", "w", encoding="utf-8")
+    primeira_linha = [True]
+    
+    def escrever(linha):
+        relatorio.write(linha if primeira_linha[0] else "\n" + linha)
+        primeira_linha[0] = False
     
     # Cabeçalho do relatório
-    relatorio.append("=" * 60)
-    relatorio.append(f"📋 RELATÓRIO DE AUDITORIA FUNCIONAL")
-    relatorio.append(f"📅 Data: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
-    relatorio.append(f"📁 Arquivos analisados: {len(arquivos)}")
-    relatorio.append("=" * 60)
-    relatorio.append("")
+    escrever("=" * 60)
+    escrever(f"📋 RELATÓRIO DE AUDITORIA FUNCIONAL")
+    escrever(f"📅 Data: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+    escrever(f"📁 Arquivos analisados: {len(arquivos)}")
+    escrever("=" * 60)
+    escrever("")
     
-    for arquivo in arquivos:
-        problemas = auditar_arquivo(arquivo)
-        
+    for feitos, (arquivo, problemas) in enumerate(resultados, 1):
         if problemas:
             arquivos_com_problemas += 1
             total_problemas += len(problemas)
             
             # Caminho relativo para exibição
-            caminho_rel = os.path.relpath(arquivo, ".")
+            caminho_rel = os.path.relpath(arquivo.caminho, ".")
+            armazem.adicionar(caminho_rel, problemas)
             
             # Console
-            print(f"📂 {caminho_rel}")
-            relatorio.append(f"📂 {caminho_rel}")
+            log(f"📂 {caminho_rel}")
+            escrever(f"📂 {caminho_rel}")
             
             for p in problemas:
-                linha_saida = f"   [Linha {p['linha']:4d}] {p['emoji']} {p['desc']}"
-                print(linha_saida)
-                relatorio.append(linha_saida)
+                regra = REGRAS[p[0]]
+                linha_saida = f"   [Linha {p[1]:4d}] {regra['emoji']} {regra['desc']}"
+                log(linha_saida)
+                escrever(linha_saida)
+                resumo_por_chave[regra["resumo"]] += 1
+                if emitir:
+                    emitir({"type": "finding", "error": _erro_json(caminho_rel, p)})
                 
-                # Adicionar ao JSON
-                json_errors.append({
-                    "file": caminho_rel.replace("\\", "/"),
-                    "line": p["linha"],
-                    "type": p["tipo"] if "tipo" in p else p["desc"].split("(")[0].strip(),
-                    "category": p.get("categoria", "other"),
-                    "message": p["desc"],
-                    "emoji": p["emoji"]
-                })
-                
-            print()
-            relatorio.append("")
+            log()
+            escrever("")
+        
+        if emitir and (feitos % INTERVALO_PROGRESSO == 0 or feitos == len(arquivos)):
+            emitir({"type": "progress", "files_done": feitos, "files_total": len(arquivos)})
+    
+    # Código duplicado: impressões por arquivo (em cache) e agrupamento global
+    inicio_clones = time.perf_counter()
+    if perfil:
+        cache_clones = None
+    elif cache_clones is None and usar_cache:
+        cache_clones = carregar_cache_clones()
+    grupos_clones = detectar_clones(arquivos, cache_clones, 1 if perfil else jobs)
+    if perfil:
+        perfil.fases["clones"] += time.perf_counter() - inicio_clones
+        inicio_serializacao += time.perf_counter() - inicio_clones
+    
+    if grupos_clones:
+        cabecalho = [f"🧬 CÓDIGO DUPLICADO ({len(grupos_clones)} grupos, mínimo {MIN_TOKENS_CLONE} tokens)", ""]
+        for linha in cabecalho:
+            log(linha)
+            escrever(linha)
+        for grupo in grupos_clones[:MAX_CLONES_TXT]:
+            linhas = [f"   🧬 {len(grupo['occurrences'])} cópias, ~{grupo['tokens']} tokens / {grupo['lines']} linhas"]
+            linhas += [f"      {o['file']}:{o['start_line']}-{o['end_line']}" for o in grupo["occurrences"]]
+            for linha in linhas:
+                log(linha)
+                escrever(linha)
+        if len(grupos_clones) > MAX_CLONES_TXT:
+            linha = f"   ... e mais {len(grupos_clones) - MAX_CLONES_TXT} grupos em {JSON_FILE}"
+            log(linha)
+            escrever(linha)
+        log()
+        escrever("")
     
     # Resumo
     resumo = [
@@ -163,6 +394,7 @@ def gerar_relatorio():
         f"   Total de arquivos analisados: {len(arquivos)}",
         f"   Arquivos com problemas: {arquivos_com_problemas}",
         f"   Total de problemas encontrados: {total_problemas}",
+        f"   Grupos de código duplicado: {len(grupos_clones)}",
         "",
         "📌 LEGENDA:",
         "   👻 Botão/Link fantasma (sem ação)",
@@ -171,50 +403,201 @@ def gerar_relatorio():
         "   📝 TODO/FIXME pendente",
         "   🔀 Redirecionamento suspeito",
         "   🏠 URL localhost hardcoded",
+        "   🧬 Código duplicado (clone)",
         "=" * 60
     ]
     
     for linha in resumo:
-        print(linha)
-        relatorio.append(linha)
-    
-    # Salvar arquivo TXT
-    with open(RELATORIO_FILE, "w", encoding="utf-8") as f:
-        f.write("\n".join(relatorio))
+        log(linha)
+        escrever(linha)
+    relatorio.close()
+    os.replace(RELATORIO_FILE + ".tmp", RELATORIO_FILE)
     
-    # Contar por categoria
-    broken_buttons = sum(1 for e in json_errors if "fantasma" in e["message"].lower() or "vazio" in e["message"].lower())
-    todos_count = sum(1 for e in json_errors if "TODO" in e["message"] or "FIXME" in e["message"])
-    console_count = sum(1 for e in json_errors if "console" in e["message"].lower())
-    mock_count = sum(1 for e in json_errors if "mock" in e["message"].lower() or "fake" in e["message"].lower())
-    localhost_count = sum(1 for e in json_errors if "localhost" in e["message"].lower())
+    if cache:
+        log(f"⚡ Cache: {cache.hits} hits / {cache.misses} misses")
     
     # Estrutura JSON final
+    summary = {
+        "total_errors": total_problemas,
+        "files_scanned": len(arquivos),
+        "files_with_problems": arquivos_com_problemas,
+        **resumo_por_chave,
+        "clone_groups": len(grupos_clones),
+    }
     json_data = {
         "timestamp": datetime.now().isoformat(),
         "generated_at": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-        "errors": json_errors,
-        "summary": {
-            "total_errors": total_problemas,
-            "files_scanned": len(arquivos),
-            "files_with_problems": arquivos_com_problemas,
-            "broken_buttons": broken_buttons,
-            "todos_pending": todos_count,
-            "console_logs": console_count,
-            "mock_data": mock_count,
-            "localhost_urls": localhost_count
-        }
+        "errors": [],   # escrito item a item a partir do armazém
+        "summary": summary
     }
+    if cache:
+        json_data["cache"] = {"hits": cache.hits, "misses": cache.misses}
+    json_data["clones"] = {"min_tokens": MIN_TOKENS_CLONE, "groups": grupos_clones}
+    if perfil:
+        perfil.fases["serialize"] += time.perf_counter() - inicio_serializacao
+        json_data["perf"] = perfil.como_json()
+        if not (stream or quieto):
+            perfil.imprimir()
     
     # Garantir que a pasta public existe
     os.makedirs(os.path.dirname(JSON_FILE), exist_ok=True)
     
-    # Salvar arquivo JSON
-    with open(JSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    # Salvar arquivo JSON (temporário + os.replace: a página nunca lê JSON truncado)
+    gravar_json(JSON_FILE + ".tmp", json_data, "errors", _erros_json(armazem))
+    os.replace(JSON_FILE + ".tmp", JSON_FILE)
+    del json_data["errors"]
     
-    print(f"\n💾 Relatório TXT salvo em: {RELATORIO_FILE}")
-    print(f"📊 Relatório JSON salvo em: {JSON_FILE}")
+    log(f"\n💾 Relatório TXT salvo em: {RELATORIO_FILE}")
+    log(f"📊 Relatório JSON salvo em: {JSON_FILE}")
+    if emitir:
+        emitir({"type": "summary", "summary": summary, "report": JSON_FILE.replace("\\", "/")})
+    return json_data
+
+def carregar_relatorio():
+    with open(JSON_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def emitir_relatorio(dados):
+    """NDJSON de um relatório já pronto (resultado reaproveitado de outra execução)"""
+    total = dados["summary"]["files_scanned"]
+    _emitir({"type": "start", "files_total": total})
+    for erro in dados["errors"]:
+        _emitir({"type": "finding", "error": erro})
+    _emitir({"type": "progress", "files_done": total, "files_total": total})
+    _emitir({"type": "summary", "summary": dados["summary"], "report": JSON_FILE.replace("\\", "/")})
+
+def auditar_unico(usar_cache=True, jobs=1, perfilar=False, stream=False, cache=None, cache_clones=None):
+    """
+    gerar_relatorio com single-flight: pedidos simultâneos (dois admins, a API
+    e o daemon) esperam a auditoria que já está rodando e recebem o resultado
+    dela; uma faxina em andamento é esperada antes de auditar.
+    """
+    tipo = "audit:profile" if perfilar else "audit"
+    dados, seguida = executar_unico(
+        tipo,
+        lambda: gerar_relatorio(usar_cache=usar_cache, jobs=jobs, perfilar=perfilar, stream=stream,
+                                cache=cache, cache_clones=cache_clones),
+        carregar_relatorio,
+    )
+    if seguida is not None:
+        if stream:
+            emitir_relatorio(dados)
+        else:
+            print(f"🤝 Auditoria já estava rodando (PID {seguida['pid']}); resultado reaproveitado: "
+                  f"{dados['summary']['total_errors']} problemas em {RELATORIO_FILE} e {JSON_FILE}")
+    return dados
+
+def vigiar(jobs=1, forcar_polling=False):
+    """
+    --watch: auditoria completa uma vez e depois, a cada rajada de saves em
+    src/, só os arquivos tocados são relidos (o resto vem do cache em memória)
+    e o relatório é regravado.
+    """
+    from vigia_fontes import VigiaFontes
+    cache = CacheAuditoria(versao_regras(PADROES))
+    cache_clones = carregar_cache_clones()
+    with trava_exclusiva("audit"):
+        gerar_relatorio(jobs=jobs, cache=cache, cache_clones=cache_clones)
+    
+    indice = obter_indice(PASTA_SRC)
+    vigia = VigiaFontes(PASTA_SRC, forcar_polling=forcar_polling)
+    print(f"\n👀 Observando {PASTA_SRC}/ ({vigia.modo}). Ctrl+C para sair.")
+    try:
+        for alterados in vigia.lotes():
+            inicio = time.perf_counter()
+            if alterados is None:
+                mudou = indice.atualizar()
+                descricao = "árvore revarrida"
+            else:
+                mudou = indice.atualizar_caminhos(alterados)
+                descricao = f"{len(alterados)} arquivo(s) alterado(s)"
+            if not mudou:
+                continue
+            cache.hits = cache.misses = 0
+            with trava_exclusiva("audit"):
+                dados = gerar_relatorio(cache=cache, quieto=True, cache_clones=cache_clones)
+            decorrido = (time.perf_counter() - inicio) * 1000
+            print(f"🔄 {datetime.now().strftime('%H:%M:%S')} {descricao}: {cache.misses} reauditado(s), "
+                  f"{dados['summary']['total_errors']} problemas, relatório atualizado em {decorrido:.0f}ms")
+    except KeyboardInterrupt:
+        print("\n👋 Watch encerrado.")
+    finally:
+        vigia.fechar()
+
+def auditar_desde(ref, baseline_file=BASELINE_FILE):
+    """
+    --since: audita só os arquivos alterados desde `ref` (git) e compara com o
+    baseline salvo. Mostra apenas os achados novos. Retorna o código de saída
+    (0 = nada novo, 1 = achados novos, 2 = erro).
+    """
+    import subprocess
+    inicio = time.perf_counter()
+    baseline = carregar_baseline(baseline_file)
+    if baseline is None:
+        print(f"❌ Baseline não encontrado em {baseline_file}. Gere com: python scripts/auditor_funcional.py --save-baseline")
+        return 2
+    try:
+        alterados = arquivos_alterados(ref)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ Não foi possível listar as alterações desde '{ref}': {e}")
+        return 2
+    
+    auditados = {}
+    for caminho in alterados:
+        # Arquivo apagado: os achados dele saem do baseline
+        auditados[caminho] = auditar_arquivo(ArquivoFonte.de_caminho(caminho)) if os.path.isfile(caminho) else None
+    novos, resolvidos, mesclado = comparar(baseline, auditados, NOMES_REGRAS)
+    
+    for caminho, p in novos:
+        regra = REGRAS[p[0]]
+        print(f"🆕 {caminho}:{p[1]} {regra['emoji']} {regra['desc']}")
+        print(f"      {ler_trecho(caminho, p[2], p[3])}")
+    decorrido = (time.perf_counter() - inicio) * 1000
+    print(f"🔍 {len(alterados)} arquivos alterados desde {ref}: {len(novos)} achados novos, "
+          f"{len(resolvidos)} resolvidos ({decorrido:.0f}ms)")
+    
+    os.makedirs(os.path.dirname(DELTA_FILE), exist_ok=True)
+    with open(DELTA_FILE + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({
+            "ref": ref,
+            "baseline_ref": baseline.get("ref"),
+            "generated_at": datetime.now().isoformat(),
+            "files_audited": alterados,
+            "new": [
+                {"file": c, "line": p[1], "rule": NOMES_REGRAS[p[0]], "message": REGRAS[p[0]]["desc"],
+                 "emoji": REGRAS[p[0]]["emoji"], "snippet": ler_trecho(c, p[2], p[3]), "fingerprint": p[4]}
+                for c, p in novos
+            ],
+            "resolved": [{"file": c, "rule": p["regra"], "fingerprint": p["impressao"]} for c, p in resolvidos],
+            "total_after_merge": sum(len(ps) for ps in mesclado.values()),
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(DELTA_FILE + ".tmp", DELTA_FILE)
+    return 1 if novos else 0
 
 if __name__ == "__main__":
-    gerar_relatorio()
+    parser = argparse.ArgumentParser(description="Auditoria funcional do código em src/")
+    parser.add_argument("--no-cache", action="store_true", help="ignora o cache em .cache/audit/ e reaudita tudo")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="processos em paralelo (padrão: nº de CPUs)")
+    parser.add_argument("--watch", action="store_true", help="fica observando src/ e atualiza o relatório a cada save")
+    parser.add_argument("--polling", action="store_true", help="no --watch, usa polling em vez de inotify")
+    parser.add_argument("--since", metavar="REF", help="audita só o que mudou desde REF (git) e mostra os achados novos em relação ao baseline (pre-commit/PR)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"audita tudo e grava o baseline em {BASELINE_FILE}")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="caminho do baseline usado por --since/--save-baseline")
+    parser.add_argument("--stream", action="store_true", help="escreve achados e progresso em NDJSON no stdout (usado pela API)")
+    parser.add_argument("--profile", action="store_true", help="mede fases, regras e arquivos mais lentos (serial, sem cache) e grava a seção perf no JSON")
+    args = parser.parse_args()
+    if args.watch:
+        vigiar(jobs=args.jobs, forcar_polling=args.polling)
+        sys.exit(0)
+    if args.since:
+        sys.exit(auditar_desde(args.since, args.baseline))
+    if args.save_baseline:
+        cache = CacheAuditoria(versao_regras(PADROES)) if not args.no_cache else None
+        salvar_baseline(auditar_com_cache(listar_arquivos(PASTA_SRC), cache, args.jobs), NOMES_REGRAS, args.baseline)
+        print(f"📌 Baseline salvo em: {args.baseline}")
+        sys.exit(0)
+    try:
+        auditar_unico(usar_cache=not args.no_cache, jobs=args.jobs, perfilar=args.profile, stream=args.stream)
+    except TravaOcupada as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
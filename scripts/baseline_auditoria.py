@@ -0,0 +1,112 @@
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+
+from indice_fontes import PASTA_SRC, EXTENSOES
+
+# CONFIGURAÇÃO
+BASELINE_FILE = os.path.join(".cache", "audit", "baseline.json")
+DELTA_FILE = os.path.join(".cache", "audit", "delta.json")
+VERSAO_BASELINE = 1
+
+RE_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar(texto_linha):
+    return RE_ESPACOS.sub(" ", texto_linha).strip()
+
+
+def impressao(regra, caminho_rel, normalizado, ordem=0):
+    """
+    Fingerprint estável de um achado: regra + caminho + texto da linha
+    normalizado. Não depende do número da linha, então sobrevive a linhas
+    inseridas/removidas acima. `ordem` separa linhas idênticas no mesmo
+    arquivo (a 1ª, a 2ª...).
+    """
+    chave = f"{regra}\0{caminho_rel}\0{normalizado}\0{ordem}"
+    return hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16]
+
+
+def carregar_baseline(caminho=BASELINE_FILE):
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return dados if dados.get("versao") == VERSAO_BASELINE else None
+
+
+def _ref_atual():
+    # subprocess só é importado aqui: a auditoria normal não chama o git
+    import subprocess
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _entradas(problemas, regras):
+    """Achados compactos (índice da regra, linha, início, fim, impressão) no formato do baseline"""
+    return [{"regra": regras[p[0]], "linha": p[1], "impressao": p[4]} for p in problemas]
+
+
+def salvar_baseline(resultados, regras, caminho=BASELINE_FILE):
+    """resultados: [(arquivo, problemas)] de uma auditoria completa; regras: nomes por índice"""
+    arquivos = {}
+    for arquivo, problemas in resultados:
+        if problemas:
+            arquivos[arquivo.caminho_rel] = _entradas(problemas, regras)
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temp = caminho + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump({
+            "versao": VERSAO_BASELINE,
+            "criado_em": datetime.now().isoformat(),
+            "ref": _ref_atual(),
+            "arquivos": arquivos,
+        }, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temp, caminho)
+
+
+def _git_z(*args):
+    import subprocess
+    saida = subprocess.run(["git", *args], capture_output=True, check=True).stdout
+    return [os.fsdecode(c) for c in saida.split(b"\0") if c]
+
+
+def arquivos_alterados(ref, pasta=PASTA_SRC, extensoes=EXTENSOES):
+    """
+    Caminhos (relativos à raiz, com /) alterados desde `ref`: o que difere entre
+    ref e a working tree (staged ou não) e os arquivos novos ainda não rastreados.
+    Inclui arquivos apagados, para que seus achados saiam do baseline.
+    """
+    alterados = set(_git_z("diff", "--name-only", "-z", "--no-renames", ref, "--", pasta))
+    alterados.update(_git_z("ls-files", "--others", "--exclude-standard", "-z", "--", pasta))
+    return sorted(c for c in alterados if os.path.splitext(c)[1] in extensoes)
+
+
+def comparar(baseline, auditados, regras):
+    """
+    auditados: {caminho_rel: problemas | None (apagado)} só dos arquivos alterados.
+    regras: nomes das regras por índice (os achados guardam o índice).
+    Retorna (novos, resolvidos, mesclado): achados que não estavam no baseline,
+    achados do baseline que sumiram, e o baseline com os arquivos alterados
+    substituídos pelo resultado atual.
+    """
+    mesclado = dict(baseline["arquivos"])
+    novos, resolvidos = [], []
+    for caminho, problemas in auditados.items():
+        anteriores = baseline["arquivos"].get(caminho, [])
+        conhecidas = {p["impressao"] for p in anteriores}
+        atuais = {p[4] for p in problemas or []}
+        novos.extend((caminho, p) for p in problemas or [] if p[4] not in conhecidas)
+        resolvidos.extend((caminho, p) for p in anteriores if p["impressao"] not in atuais)
+        if problemas:
+            mesclado[caminho] = _entradas(problemas, regras)
+        else:
+            mesclado.pop(caminho, None)
+    return novos, resolvidos, mesclado
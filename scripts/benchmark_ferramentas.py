@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+from datetime import datetime
+
+# CONFIGURAÇÃO
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(RAIZ_REPO, "scripts")
+AUDIT_DIR = os.path.join(RAIZ_REPO, "audit")
+ESCALAS = [1000, 10000, 100000]
+RESULTADO_FILE = os.path.join(".cache", "benchmark", "resultado.json")
+LIMIAR_PADRAO = 0.15       # 15% mais lento = regressão
+PISO_ABSOLUTO_MS = 25      # diferenças menores que isso são ruído
+
+# Densidade das ocorrências dos PADROES (por arquivo)
+DENSIDADES = {
+    "console_log": 0.06,
+    "todo_comment": 0.05,
+    "localhost": 0.02,
+    "botao_vazio": 0.01,
+    "href_vazio": 0.01,
+    "mock_data": 0.01,
+    "router_push_vazio": 0.005,
+}
+
+# (comando relativo à raiz do repo, stdin) — rodam com cwd na árvore sintética.
+# fix_localhost modifica os arquivos, então roda por último e uma vez só.
+FERRAMENTAS = [
+    ("auditor", ["scripts/auditor_funcional.py", "--no-cache"], None),
+    ("auditor_cache_quente", ["scripts/auditor_funcional.py"], None),
+    ("faxineiro_plan", ["scripts/faxineiro.py", "plan"], None),
+    ("cacador_zumbis", ["scripts/cacador_zumbis.py"], "n\n"),
+    ("scan_client_imports", ["audit/scan_client_imports.py"], None),
+    ("fix_localhost", ["scripts/fix_localhost.py"], None),
+]
+SO_UMA_VEZ = {"fix_localhost"}
+AQUECER = {"auditor_cache_quente"}   # uma rodada fora do cronômetro antes de medir
+
+
+def _linhas_de_ruido(rng, n):
+    modelos = [
+        "  const [state{i}, setState{i}] = useState(null)",
+        "  const value{i} = useMemo(() => compute(props.item{i}), [props.item{i}])",
+        "  if (!data{i}) return null",
+        "  // comentário comum número {i}",
+        "  const handle{i} = async () => {{ await save({i}) }}",
+        "  return items.filter((item) => item.id !== {i})",
+    ]
+    return [rng.choice(modelos).format(i=i) for i in range(n)]
+
+
+def _ocorrencias(rng):
+    linhas = []
+    if rng.random() < DENSIDADES["console_log"]:
+        linhas.append("  console.log('debug', props)")
+    if rng.random() < DENSIDADES["todo_comment"]:
+        linhas.append("  // TODO: implementar de verdade")
+    if rng.random() < DENSIDADES["localhost"]:
+        linhas.append("  const url = 'http://localhost:3000/api/items'")
+    if rng.random() < DENSIDADES["botao_vazio"]:
+        linhas.append("  const b = <button onClick={() => {}}>x</button>")
+    if rng.random() < DENSIDADES["href_vazio"]:
+        linhas.append('  const a = <a href="#">link</a>')
+    if rng.random() < DENSIDADES["mock_data"]:
+        linhas.append("  const mockItems = [{ id: 1 }]")
+    if rng.random() < DENSIDADES["router_push_vazio"]:
+        linhas.append("  router.push('')")
+    return linhas
+
+
+def gerar_arvore(destino, n_arquivos, semente=42):
+    """
+    Gera uma árvore src/ sintética com o formato do projeto: páginas e
+    route.ts do app router, componentes "use client", módulos @/lib (alguns
+    server-only), imports @/ entre eles e ocorrências dos PADROES com densidade
+    fixa. Mesma semente = mesma árvore.
+    """
+    rng = random.Random(semente)
+    n_rotas = max(1, n_arquivos * 7 // 100)
+    n_paginas = max(1, n_arquivos * 20 // 100)
+    n_libs = max(2, n_arquivos * 25 // 100)
+    n_componentes = max(1, n_arquivos - n_rotas - n_paginas - n_libs - 1)
+
+    libs, componentes = [], []
+
+    def escrever(caminho, linhas):
+        completo = os.path.join(destino, caminho)
+        os.makedirs(os.path.dirname(completo), exist_ok=True)
+        with open(completo, "w", encoding="utf-8") as f:
+            f.write("\n".join(linhas) + "\n")
+
+    # Módulos @/lib (os primeiros são server-only)
+    for i in range(n_libs):
+        modulo = f"lib/dominio{i % 40}/modulo{i}"
+        linhas = []
+        if i < max(1, n_libs // 50):
+            linhas.append("import { cookies } from 'next/headers'")
+        for dep in rng.sample(libs, min(len(libs), rng.randint(0, 2))):
+            linhas.append(f"import {{ fn{dep[1]} }} from '@/{dep[0]}'")
+        linhas.append(f"export function fn{i}(props: any) {{")
+        linhas += _linhas_de_ruido(rng, rng.randint(10, 40)) + _ocorrencias(rng)
+        linhas.append("}")
+        escrever(f"src/{modulo}.ts", linhas)
+        libs.append((modulo, i))
+
+    # Componentes (metade "use client")
+    for i in range(n_componentes):
+        modulo = f"components/area{i % 60}/Componente{i}"
+        linhas = ["'use client'", ""] if i % 2 == 0 else []
+        linhas.append("import { useState, useMemo } from 'react'")
+        for dep in rng.sample(libs, min(len(libs), rng.randint(1, 3))):
+            linhas.append(f"import {{ fn{dep[1]} }} from '@/{dep[0]}'")
+        for dep in rng.sample(componentes, min(len(componentes), rng.randint(0, 2))):
+            linhas.append(f"import Componente{dep[1]} from '@/{dep[0]}'")
+        linhas.append(f"export default function Componente{i}(props: any) {{")
+        linhas += _linhas_de_ruido(rng, rng.randint(20, 60)) + _ocorrencias(rng)
+        linhas.append("  return <div />")
+        linhas.append("}")
+        escrever(f"src/{modulo}.tsx", linhas)
+        componentes.append((modulo, i))
+
+    # Páginas do app router (grupos de rota e segmentos dinâmicos)
+    for i in range(n_paginas):
+        grupo = ["(public)", "(super-admin)/admin", "[slug]/dashboard"][i % 3]
+        linhas = []
+        # ~10% das árvores de componentes ficam inalcançáveis (zumbis)
+        for dep in rng.sample(componentes[: len(componentes) * 9 // 10] or componentes, min(len(componentes), 2)):
+            linhas.append(f"import Componente{dep[1]} from '@/{dep[0]}'")
+        linhas.append(f"export default function Pagina{i}() {{")
+        linhas += _linhas_de_ruido(rng, rng.randint(10, 30)) + _ocorrencias(rng)
+        linhas.append("  return <main />")
+        linhas.append("}")
+        escrever(f"src/app/{grupo}/secao{i}/page.tsx", linhas)
+
+    # Rotas de API
+    for i in range(n_rotas):
+        dep = rng.choice(libs)
+        linhas = [
+            "import { NextResponse } from 'next/server'",
+            f"import {{ fn{dep[1]} }} from '@/{dep[0]}'",
+            "export async function GET(request: Request) {",
+        ]
+        linhas += _linhas_de_ruido(rng, rng.randint(5, 20)) + _ocorrencias(rng)
+        linhas += ["  return NextResponse.json({ ok: true })", "}"]
+        escrever(f"src/app/api/recurso{i}/route.ts", linhas)
+
+    escrever("src/app/layout.tsx", ["export default function RootLayout({ children }: any) {", "  return children", "}"])
+    escrever("middleware.ts", ["export function middleware() {}"])
+    with open(os.path.join(destino, "tsconfig.json"), "w", encoding="utf-8") as f:
+        json.dump({"compilerOptions": {"paths": {"@/*": ["./src/*"]}}}, f)
+    os.makedirs(os.path.join(destino, "public"), exist_ok=True)
+    os.makedirs(os.path.join(destino, "audit"), exist_ok=True)
+
+
+def _cronometrar(raiz, comando, entrada):
+    script = os.path.join(RAIZ_REPO, comando[0])
+    inicio = time.perf_counter()
+    subprocess.run(
+        [sys.executable, script] + comando[1:],
+        cwd=raiz, input=entrada, text=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+    )
+    return (time.perf_counter() - inicio) * 1000
+
+
+def medir(escalas, repeticoes, semente):
+    resultado = {
+        "criado_em": datetime.now().isoformat(),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "repeticoes": repeticoes,
+        "medidas": {},
+    }
+    for escala in escalas:
+        raiz = tempfile.mkdtemp(prefix=f"bench-{escala}-")
+        try:
+            print(f"🏗️  Gerando árvore sintética com {escala} arquivos...")
+            inicio = time.perf_counter()
+            gerar_arvore(raiz, escala, semente)
+            print(f"   pronta em {time.perf_counter() - inicio:.1f}s")
+
+            medidas = {}
+            for nome, comando, entrada in FERRAMENTAS:
+                n = 1 if nome in SO_UMA_VEZ else repeticoes
+                if nome in AQUECER:
+                    _cronometrar(raiz, comando, entrada)
+                tempos = [_cronometrar(raiz, comando, entrada) for _ in range(n)]
+                medidas[nome] = {"mediana_ms": round(statistics.median(tempos), 1), "tempos_ms": [round(t, 1) for t in tempos]}
+                print(f"   ⏱️  {nome:<22} {medidas[nome]['mediana_ms']:>10.1f} ms")
+            resultado["medidas"][str(escala)] = medidas
+        finally:
+            shutil.rmtree(raiz, ignore_errors=True)
+    return resultado
+
+
+def comparar(base, atual, limiar=LIMIAR_PADRAO):
+    """Retorna a lista de regressões (escala, ferramenta, base_ms, atual_ms)"""
+    regressoes = []
+    print(f"\n📊 Comparação com a baseline (limiar {limiar:.0%}):")
+    for escala, medidas in atual["medidas"].items():
+        for nome, medida in medidas.items():
+            anterior = base.get("medidas", {}).get(escala, {}).get(nome)
+            if anterior is None:
+                continue
+            b, a = anterior["mediana_ms"], medida["mediana_ms"]
+            variacao = (a - b) / b if b else 0.0
+            regrediu = a > b * (1 + limiar) and a - b > PISO_ABSOLUTO_MS
+            marcador = "🔴" if regrediu else "🟢"
+            print(f"   {marcador} {escala:>7} {nome:<22} {b:>10.1f} → {a:>10.1f} ms ({variacao:+.0%})")
+            if regrediu:
+                regressoes.append((escala, nome, b, a))
+    return regressoes
+
+
+def _carregar(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das ferramentas de auditoria em árvores sintéticas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_run = sub.add_parser("run", help="gera as árvores, mede e salva o resultado")
+    p_run.add_argument("--sizes", type=int, nargs="+", default=ESCALAS)
+    p_run.add_argument("--repeat", type=int, default=3)
+    p_run.add_argument("--seed", type=int, default=42)
+    p_run.add_argument("--output", default=RESULTADO_FILE)
+    p_run.add_argument("--baseline", help="compara com esta baseline ao final")
+    p_run.add_argument("--threshold", type=float, default=LIMIAR_PADRAO)
+
+    p_cmp = sub.add_parser("compare", help="compara dois resultados já salvos")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("atual")
+    p_cmp.add_argument("--threshold", type=float, default=LIMIAR_PADRAO)
+
+    p_gen = sub.add_parser("generate", help="só gera uma árvore sintética")
+    p_gen.add_argument("destino")
+    p_gen.add_argument("--size", type=int, default=1000)
+    p_gen.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args()
+
+    if args.comando == "generate":
+        gerar_arvore(args.destino, args.size, args.seed)
+        print(f"✅ Árvore com {args.size} arquivos gerada em {args.destino}")
+        sys.exit(0)
+
+    if args.comando == "run":
+        atual = medir(args.sizes, args.repeat, args.seed)
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(atual, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultado salvo em: {args.output}")
+        if not args.baseline:
+            sys.exit(0)
+        base = _carregar(args.baseline)
+    else:
+        base, atual = _carregar(args.baseline), _carregar(args.atual)
+
+    regressoes = comparar(base, atual, args.threshold)
+    if regressoes:
+        print(f"\n❌ {len(regressoes)} regressões acima de {args.threshold:.0%}")
+        sys.exit(1)
+    print("\n✅ Nenhuma regressão")
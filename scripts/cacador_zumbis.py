@@ -1,94 +1,88 @@
 import os
-import shutil
+import time
 
-# CONFIGURAÇÃO
-PASTA_SRC = "src"
-EXTENSOES = {".ts", ".tsx", ".js", ".jsx", ".css", ".scss"}
-IGNORE_DIRS = {"node_modules", ".next", "dist", "build", ".git", "scripts"}
-BACKUP_DIR = "_BACKUP_ZUMBIS"
+from cofre_backup import COFRE_DIR, Execucao
+from indice_fontes import PASTA_SRC
+from grafo_imports import GrafoImports
+from trava_execucao import trava_exclusiva
 
+# CONFIGURAÇÃO
 # Arquivos que são pontos de entrada e nunca são importados, mas são vitais
-PONTOS_DE_ENTRADA = ["page.tsx", "layout.tsx", "loading.tsx", "error.tsx", "not-found.tsx", "route.ts", "middleware.ts", "global.css", "globals.css"]
+PONTOS_DE_ENTRADA = [
+    "page.tsx", "layout.tsx", "loading.tsx", "error.tsx", "not-found.tsx", "route.ts",
+    "template.tsx", "default.tsx", "global-error.tsx", "sitemap.ts", "robots.ts", "manifest.ts",
+    "middleware.ts", "instrumentation.ts", "global.css", "globals.css",
+]
+# Fora de src/, mas também raiz do grafo
+ENTRADAS_EXTRAS = ["middleware.ts", "instrumentation.ts"]
 
-def listar_arquivos(pasta):
-    arquivos_codigo = []
-    todos_arquivos = []
-    
-    for root, dirs, files in os.walk(pasta):
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        
-        for file in files:
-            path = os.path.join(root, file)
-            _, ext = os.path.splitext(file)
-            
-            todos_arquivos.append(path)
-            if ext in EXTENSOES:
-                arquivos_codigo.append(path)
-                
-    return arquivos_codigo, todos_arquivos
+def listar_pontos_de_entrada(grafo):
+    raizes = [c for c in grafo.arquivos if os.path.basename(c) in PONTOS_DE_ENTRADA]
+    return sorted(raizes)
 
-def ler_conteudo_projeto(arquivos_codigo):
-    conteudo_total = ""
-    print("📖 Lendo todo o código do projeto...")
-    for arq in arquivos_codigo:
-        try:
-            with open(arq, "r", encoding="utf-8") as f:
-                conteudo_total += f.read() + "\n"
-        except:
-            pass
-    return conteudo_total
+def listar_zumbis(grafo):
+    """Arquivos de src/ que nenhum ponto de entrada alcança pelo grafo de imports"""
+    vivos = grafo.alcancaveis(listar_pontos_de_entrada(grafo))
+    return [
+        caminho for caminho, arquivo in grafo.arquivos.items()
+        if caminho not in vivos
+        and caminho.startswith(os.path.normpath(PASTA_SRC) + os.sep)
+        # Declarações globais (.d.ts) não são importadas explicitamente
+        and not caminho.endswith(".d.ts")
+    ]
 
-def caçar_zumbis():
+def _perguntar(pergunta):
+    return input(pergunta).lower() == 's'
+
+def caçar_zumbis(confirmar=_perguntar):
+    """
+    confirmar: pergunta -> bool antes de mover (a CLI troca o input() por --yes/--dry-run).
+    Retorna um dict com "status" (limpo, pendente ou aplicado), os zumbis e os imports não resolvidos.
+    """
     print("🧟‍♂️ INICIANDO CAÇADA DE CÓDIGO ZUMBI...")
     
-    codigos, todos = listar_arquivos(PASTA_SRC)
-    conteudao = ler_conteudo_projeto(codigos)
+    inicio = time.perf_counter()
+    grafo = GrafoImports(PASTA_SRC, extras=ENTRADAS_EXTRAS)
+    total_arestas = sum(len(a) for a in grafo.arestas.values())
+    print(f"🔍 Grafo de imports: {len(grafo.arquivos)} arquivos, {total_arestas} imports resolvidos")
     
-    zumbis = []
+    zumbis = listar_zumbis(grafo)
+    for zumbi in zumbis:
+        print(f"🧟 ZUMBI DETECTADO: {zumbi}")
     
-    print(f"🔍 Analisando {len(todos)} arquivos...")
+    for origem, especificadores in sorted(grafo.nao_resolvidos.items()):
+        for especificador in especificadores:
+            print(f"⚠️  Import não resolvido em {origem}: {especificador}")
     
-    for arquivo_path in todos:
-        nome_arquivo = os.path.basename(arquivo_path)
-        nome_sem_ext, _ = os.path.splitext(nome_arquivo)
-        
-        # Se for arquivo de sistema do Next.js, ignora (não é zumbi)
-        if nome_arquivo in PONTOS_DE_ENTRADA:
-            continue
-            
-        # Lógica de detecção:
-        # Se o nome do arquivo (ex: "Button.tsx" ou apenas "Button") NÃO aparece no conteudão,
-        # ninguém está importando ele.
-        
-        # Verifica o nome com e sem extensão
-        if (nome_arquivo not in conteudao) and (nome_sem_ext not in conteudao):
-            # Filtro extra: ignora index.ts pois geralmente é só export
-            if nome_arquivo == "index.ts": continue
-            
-            print(f"🧟 ZUMBI DETECTADO: {arquivo_path}")
-            zumbis.append(arquivo_path)
+    print(f"⏱️  Análise concluída em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+    resultado = {
+        "status": "limpo",
+        "zombies": [c.replace("\\", "/") for c in zumbis],
+        "unresolved": {c.replace("\\", "/"): e for c, e in sorted(grafo.nao_resolvidos.items())},
+        "backup": None,
+    }
 
     if not zumbis:
         print("\n✨ Parabéns! Nenhum zumbi encontrado.")
-        return
+        return resultado
 
     print(f"\n🏹 Encontrei {len(zumbis)} arquivos que parecem não estar sendo usados.")
-    resp = input(f"Deseja mover esses zumbis para a quarentena em '{BACKUP_DIR}'? (s/n): ")
+    if not confirmar(f"Deseja mover esses zumbis para a quarentena no cofre '{COFRE_DIR}'? (s/n): "):
+        resultado["status"] = "pendente"
+        return resultado
     
-    if resp.lower() == 's':
-        if not os.path.exists(BACKUP_DIR):
-            os.makedirs(BACKUP_DIR)
-            
+    with trava_exclusiva("fix"):
+        execucao = Execucao("cacador_zumbis")
         for zumbi in zumbis:
-            # Mantém a estrutura de pastas no backup para saber de onde veio
-            caminho_relativo = os.path.relpath(zumbi, ".")
-            destino = os.path.join(BACKUP_DIR, caminho_relativo)
-            
-            os.makedirs(os.path.dirname(destino), exist_ok=True)
-            shutil.move(zumbi, destino)
+            # O manifesto guarda o caminho original para saber de onde veio
+            execucao.mover(zumbi)
             print(f"⚰️  Enterrado: {zumbi}")
-            
-        print("\n🧹 Limpeza concluída! Se quebrou algo, basta restaurar do backup.")
+        execucao.finalizar()
+        
+    print("\n🧹 Limpeza concluída! Se quebrou algo, basta restaurar do backup:")
+    print(f"   python scripts/cofre_backup.py restore {execucao.id}")
+    resultado.update(status="aplicado", backup=execucao.id)
+    return resultado
 
 if __name__ == "__main__":
     caçar_zumbis()
@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+
+from indice_fontes import hash_conteudo
+from lexico_ts import VERSAO_LEXICO
+
+# CONFIGURAÇÃO
+CACHE_DIR = os.path.join(".cache", "audit")
+CACHE_FILE = os.path.join(CACHE_DIR, "achados.json")
+
+# Incrementar quando o formato dos achados ou o motor de varredura mudar
+VERSAO_FORMATO = 5
+
+
+def versao_regras(padroes):
+    """
+    Hash do conjunto de regras: qualquer mudança em PADROES (inclusive na ordem,
+    já que os achados guardam o índice da regra) ou no léxico (que decide o
+    contexto de cada ocorrência) invalida o cache inteiro
+    """
+    serializado = json.dumps([VERSAO_FORMATO, VERSAO_LEXICO, list(padroes), padroes], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(serializado.encode("utf-8")).hexdigest()
+
+
+class CacheAuditoria:
+    """
+    Cache em disco dos achados por arquivo, chaveado por caminho + tamanho +
+    mtime + hash do conteúdo + versão das regras.
+
+    Se tamanho e mtime batem, o arquivo nem é lido. Se mudaram mas o hash do
+    conteúdo é o mesmo (ex: git checkout), a entrada é reaproveitada.
+    """
+
+    def __init__(self, versao, caminho=CACHE_FILE):
+        self.versao = versao
+        self.caminho = caminho
+        self.entradas = {}
+        self.hits = 0
+        self.misses = 0
+        self._alterado = False
+        self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return
+        if dados.get("versao") == self.versao:
+            self.entradas = dados.get("arquivos", {})
+        else:
+            self._alterado = True
+
+    def obter(self, arquivo):
+        """Achados em cache para o arquivo, ou None se precisar reauditar"""
+        entrada = self.entradas.get(arquivo.caminho_rel)
+        if entrada is not None:
+            if entrada["tamanho"] == arquivo.tamanho and entrada["mtime"] == arquivo.mtime:
+                self.hits += 1
+                return entrada["achados"]
+            conteudo = arquivo.conteudo
+            if conteudo is not None and entrada["hash"] == hash_conteudo(conteudo):
+                entrada["tamanho"], entrada["mtime"] = arquivo.tamanho, arquivo.mtime
+                self._alterado = True
+                self.hits += 1
+                return entrada["achados"]
+        self.misses += 1
+        return None
+
+    def guardar(self, arquivo, achados, hash_arquivo=None):
+        """hash_arquivo pode vir pronto (ex: calculado num processo do pool)"""
+        if hash_arquivo is None:
+            conteudo = arquivo.conteudo
+            if conteudo is None:
+                return
+            hash_arquivo = hash_conteudo(conteudo)
+        self.entradas[arquivo.caminho_rel] = {
+            "tamanho": arquivo.tamanho,
+            "mtime": arquivo.mtime,
+            "hash": hash_arquivo,
+            "achados": achados,
+        }
+        self._alterado = True
+
+    def podar(self, caminhos_vivos):
+        """Remove entradas de arquivos que não existem mais"""
+        for caminho in set(self.entradas) - set(caminhos_vivos):
+            del self.entradas[caminho]
+            self._alterado = True
+
+    def salvar(self):
+        if not self._alterado:
+            return
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temp = self.caminho + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"versao": self.versao, "arquivos": self.entradas}, f, ensure_ascii=False)
+        os.replace(temp, self.caminho)
+        self._alterado = False
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from trava_execucao import trava_exclusiva
+
+# CONFIGURAÇÃO
+COFRE_DIR = "_BACKUP_STORE"
+OBJETOS_DIR = os.path.join(COFRE_DIR, "objetos")
+EXECUCOES_DIR = os.path.join(COFRE_DIR, "execucoes")
+FICLONE = 0x40049409  # ioctl de reflink (btrfs, xfs, ...)
+
+
+def hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def caminho_objeto(hash_hex):
+    return os.path.join(OBJETOS_DIR, hash_hex[:2], hash_hex[2:])
+
+
+def _clonar(origem, destino):
+    """Reflink quando o sistema de arquivos suporta; senão cópia normal"""
+    if fcntl is not None:
+        try:
+            with open(origem, "rb") as fo, open(destino, "wb") as fd:
+                fcntl.ioctl(fd.fileno(), FICLONE, fo.fileno())
+            return
+        except OSError:
+            pass
+    shutil.copyfile(origem, destino)
+
+
+def _gravar_objeto(origem, hash_hex, mover=False):
+    """
+    Grava o blob uma única vez. Ao mover, usa hardlink (o original some em
+    seguida, então não há risco de o blob ser alterado depois). Ao copiar,
+    usa reflink/cópia: o original ainda vai ser reescrito pelo script.
+    Retorna True se o blob é novo.
+    """
+    destino = caminho_objeto(hash_hex)
+    if os.path.exists(destino):
+        return False
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temp = f"{destino}.{os.getpid()}.tmp"
+    if mover:
+        try:
+            os.link(origem, temp)
+        except OSError:
+            _clonar(origem, temp)
+    else:
+        _clonar(origem, temp)
+    os.replace(temp, destino)
+    return True
+
+
+class Execucao:
+    """
+    Uma execução de ferramenta: registra os arquivos salvos num manifesto.
+
+    O manifesto é regravado (de forma atômica) a cada arquivo, antes de o
+    original ser removido ou reescrito: se o script morrer no meio, restore
+    acha o que já foi salvo e o gc não apaga esses blobs. Até finalizar(),
+    o manifesto fica marcado como "em_andamento".
+    """
+
+    def __init__(self, ferramenta):
+        self.ferramenta = ferramenta
+        self.criado_em = datetime.now()
+        self.id = self._novo_id()
+        self.arquivos = []
+        self.objetos_novos = 0
+        self.bytes_novos = 0
+
+    def _novo_id(self):
+        base = f"{self.criado_em.strftime('%Y%m%d-%H%M%S')}-{self.ferramenta}"
+        candidato, n = base, 1
+        while os.path.exists(os.path.join(EXECUCOES_DIR, candidato + ".json")):
+            n += 1
+            candidato = f"{base}-{n}"
+        return candidato
+
+    def _registrar(self, caminho, acao, mover):
+        st = os.stat(caminho)
+        hash_hex = hash_arquivo(caminho)
+        if _gravar_objeto(caminho, hash_hex, mover=mover):
+            self.objetos_novos += 1
+            self.bytes_novos += st.st_size
+        self.arquivos.append({
+            "caminho": os.path.relpath(caminho, ".").replace("\\", "/"),
+            "hash": hash_hex,
+            "tamanho": st.st_size,
+            "modo": st.st_mode & 0o777,
+            "acao": acao,
+        })
+        self._salvar_manifesto(em_andamento=True)
+
+    def guardar(self, caminho):
+        """Backup de um arquivo que vai ser modificado"""
+        self._registrar(caminho, "backup", mover=False)
+
+    def mover(self, caminho):
+        """Quarentena: guarda o arquivo no cofre e o remove da árvore"""
+        self._registrar(caminho, "movido", mover=True)
+        os.remove(caminho)
+
+    def mover_pasta(self, pasta):
+        for root, _, files in os.walk(pasta):
+            for nome in sorted(files):
+                self.mover(os.path.join(root, nome))
+        shutil.rmtree(pasta)
+
+    def _salvar_manifesto(self, em_andamento):
+        os.makedirs(EXECUCOES_DIR, exist_ok=True)
+        manifesto = os.path.join(EXECUCOES_DIR, self.id + ".json")
+        temp = manifesto + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({
+                "id": self.id,
+                "ferramenta": self.ferramenta,
+                "criado_em": self.criado_em.isoformat(),
+                "em_andamento": em_andamento,
+                "arquivos": self.arquivos,
+            }, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, manifesto)
+        return manifesto
+
+    def finalizar(self):
+        """Marca o manifesto como concluído (execuções sem arquivos não deixam rastro)"""
+        if not self.arquivos:
+            return None
+        return self._salvar_manifesto(em_andamento=False)
+
+
+def carregar_execucoes():
+    execucoes = []
+    if not os.path.isdir(EXECUCOES_DIR):
+        return execucoes
+    for nome in sorted(os.listdir(EXECUCOES_DIR)):
+        if nome.endswith(".json"):
+            with open(os.path.join(EXECUCOES_DIR, nome), "r", encoding="utf-8") as f:
+                execucoes.append(json.load(f))
+    execucoes.sort(key=lambda ex: ex["criado_em"])
+    return execucoes
+
+
+def listar():
+    execucoes = carregar_execucoes()
+    if not execucoes:
+        print("📭 Nenhuma execução no cofre.")
+        return
+    for ex in execucoes:
+        total = sum(a["tamanho"] for a in ex["arquivos"])
+        incompleta = " ⚠️ interrompida" if ex.get("em_andamento") else ""
+        print(f"📦 {ex['id']}  ({ex['ferramenta']}, {len(ex['arquivos'])} arquivos, {total / 1024:.1f} KB){incompleta}")
+
+
+def restaurar(id_execucao):
+    manifesto = os.path.join(EXECUCOES_DIR, id_execucao + ".json")
+    if not os.path.exists(manifesto):
+        print(f"❌ Execução não encontrada: {id_execucao}")
+        return False
+    with open(manifesto, "r", encoding="utf-8") as f:
+        execucao = json.load(f)
+
+    with trava_exclusiva("restore"):
+        for item in execucao["arquivos"]:
+            destino = item["caminho"]
+            os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+            temp = destino + ".restore.tmp"
+            shutil.copyfile(caminho_objeto(item["hash"]), temp)
+            os.chmod(temp, item["modo"])
+            os.replace(temp, destino)
+            print(f"♻️  {destino}")
+    print(f"✅ {len(execucao['arquivos'])} arquivos restaurados de {id_execucao}")
+    return True
+
+
+def coletar_lixo(manter=None):
+    """Remove execuções antigas (se manter=N) e blobs que nenhum manifesto referencia"""
+    # Com a trava, nenhuma execução grava um blob entre a leitura dos manifestos e a remoção
+    with trava_exclusiva("gc"):
+        _coletar_lixo(manter)
+
+
+def _coletar_lixo(manter):
+    execucoes = carregar_execucoes()
+    if manter is not None and len(execucoes) > manter:
+        for ex in execucoes[:len(execucoes) - manter]:
+            os.remove(os.path.join(EXECUCOES_DIR, ex["id"] + ".json"))
+            print(f"🗑️  Execução removida: {ex['id']}")
+        execucoes = execucoes[len(execucoes) - manter:]
+
+    vivos = {a["hash"] for ex in execucoes for a in ex["arquivos"]}
+    removidos, liberados = 0, 0
+    if os.path.isdir(OBJETOS_DIR):
+        for prefixo in os.listdir(OBJETOS_DIR):
+            pasta = os.path.join(OBJETOS_DIR, prefixo)
+            for resto in os.listdir(pasta):
+                if prefixo + resto not in vivos:
+                    caminho = os.path.join(pasta, resto)
+                    liberados += os.path.getsize(caminho)
+                    os.remove(caminho)
+                    removidos += 1
+            if not os.listdir(pasta):
+                os.rmdir(pasta)
+    print(f"🧹 {removidos} blobs removidos ({liberados / 1024:.1f} KB liberados)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cofre de backups (deduplicado por conteúdo) dos scripts de correção")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("list", help="lista as execuções salvas")
+    p_restore = sub.add_parser("restore", help="restaura os arquivos de uma execução")
+    p_restore.add_argument("execucao")
+    p_gc = sub.add_parser("gc", help="remove blobs sem referência")
+    p_gc.add_argument("--keep", type=int, default=None, help="mantém só as N execuções mais recentes")
+    args = parser.parse_args()
+
+    if args.comando == "list":
+        listar()
+    elif args.comando == "restore":
+        sys.exit(0 if restaurar(args.execucao) else 1)
+    elif args.comando == "gc":
+        coletar_lixo(args.keep)
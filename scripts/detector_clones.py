@@ -0,0 +1,315 @@
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import hashlib
+from bisect import bisect_right
+from collections import deque
+
+from indice_fontes import PASTA_SRC, EXTENSOES, ArquivoFonte, obter_indice
+from cache_auditoria import CACHE_DIR, CacheAuditoria
+
+# CONFIGURAÇÃO
+K_TOKENS = 40          # tamanho do k-grama: trechos menores que isso são ruído
+JANELA = 20            # winnowing: todo trecho igual com K + JANELA - 1 tokens é achado
+MIN_TOKENS = 120       # tamanho mínimo de um clone reportado
+MIN_LINHAS = 8
+MAX_OCORRENCIAS = 50   # impressões mais repetidas que isso são boilerplate (imports, tipos)
+CLONES_CACHE_FILE = os.path.join(CACHE_DIR, "clones.json")
+IGNORAR_SUFIXOS = (".d.ts",)
+LIMIAR_PARALELO = 64   # arquivos sem impressão em cache a partir dos quais o pool compensa
+LOTES_POR_PROCESSO = 4
+
+# Incrementar quando a tokenização ou a normalização mudar
+VERSAO_CLONES = 1
+
+# Hash rolante com módulo de 31 bits: os valores cabem num int pequeno do
+# Python (bem mais rápido). Colisões isoladas não viram clone: uma região
+# precisa de várias impressões seguidas na mesma diagonal.
+BASE = 65_599
+MODULO = (1 << 31) - 1
+BASE_K = pow(BASE, K_TOKENS - 1, MODULO)
+
+# Comentários (grupo 1) são descartados; espaços nem chegam a casar.
+# Strings, números, nomes e símbolos são os grupos 2 a 5.
+TOKEN = re.compile(
+    r"""(//[^\n]*|/\*.*?\*/)"""
+    r"""|("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)"""
+    r"""|(\d[\w.]*)"""
+    r"""|([A-Za-z_$][\w$]*)"""
+    r"""|(=>|===|!==|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\.\.\.|[^\s\w;,])""",
+    re.S,
+)
+COMENTARIO, STRING, NUMERO = 1, 2, 3
+
+# Palavras que mantêm a estrutura do código; os demais nomes viram "$"
+PALAVRAS_CHAVE = {
+    "abstract", "as", "async", "await", "break", "case", "catch", "class", "const", "continue",
+    "default", "delete", "do", "else", "enum", "export", "extends", "false", "finally", "for",
+    "from", "function", "if", "implements", "import", "in", "instanceof", "interface", "let",
+    "new", "null", "of", "private", "protected", "public", "readonly", "return", "static",
+    "super", "switch", "this", "throw", "true", "try", "type", "typeof", "undefined", "var",
+    "void", "while", "yield",
+}
+
+
+def _id_estavel(texto):
+    """Id estável entre execuções (as impressões ficam em cache no disco)"""
+    return zlib.crc32(texto.encode("utf-8")) & 0xFFFF
+
+
+_ids_token = {}
+
+
+def tokens_normalizados(conteudo):
+    """
+    (ids, offsets) dos tokens sem comentários, ';' e ','; nomes, strings e
+    números normalizados, para que um trecho copiado e renomeado ainda seja
+    clone.
+    """
+    ids, offsets = [], []
+    ids_token = _ids_token
+    for m in TOKEN.finditer(conteudo):
+        tipo = m.lastindex
+        if tipo == COMENTARIO:
+            continue
+        texto = m.group()
+        if tipo == STRING:
+            texto = texto[0]
+        elif tipo == NUMERO:
+            texto = "0"
+        tid = ids_token.get(texto)
+        if tid is None:
+            normalizado = "$" if tipo == 4 and texto not in PALAVRAS_CHAVE else texto
+            tid = ids_token[texto] = _id_estavel(normalizado)
+        ids.append(tid)
+        offsets.append(m.start())
+    return ids, offsets
+
+
+def impressoes(ids, offsets, offsets_linhas):
+    """
+    Winnowing sobre o hash rolante dos k-gramas: de cada janela de JANELA
+    hashes fica o menor (o mais à direita em empate). Retorna
+    [(hash, posição do token, linha inicial, linha final)].
+    """
+    if len(ids) < K_TOKENS:
+        return []
+    hashes = []
+    adicionar = hashes.append
+    h = 0
+    # Sai do k-grama o token que entrou K posições antes (zeros no começo)
+    for novo, velho in zip(ids, [0] * K_TOKENS + ids):
+        h = ((h - velho * BASE_K) * BASE + novo) % MODULO
+        adicionar(h)
+    del hashes[:K_TOKENS - 1]
+
+    selecionadas = []
+    janela = deque()   # índices com hashes crescentes (mínimo na frente)
+    ultimo = -1
+    for i, valor in enumerate(hashes):
+        while janela and hashes[janela[-1]] >= valor:
+            janela.pop()
+        janela.append(i)
+        if janela[0] <= i - JANELA:
+            janela.popleft()
+        if janela[0] != ultimo and i >= JANELA - 1:
+            ultimo = janela[0]
+            selecionadas.append((
+                hashes[ultimo], ultimo,
+                bisect_right(offsets_linhas, offsets[ultimo]),
+                bisect_right(offsets_linhas, offsets[ultimo + K_TOKENS - 1]),
+            ))
+    return selecionadas
+
+
+def impressoes_do_arquivo(arquivo):
+    conteudo = arquivo.conteudo
+    if not conteudo:
+        return []
+    ids, offsets = tokens_normalizados(conteudo)
+    return impressoes(ids, offsets, arquivo.offsets)
+
+
+def _impressoes_lote(lote):
+    """Roda dentro do pool: impressões de um lote de (caminho, tamanho, mtime)"""
+    return [impressoes_do_arquivo(ArquivoFonte(*item)) for item in lote]
+
+
+def _impressoes_em_paralelo(arquivos, jobs):
+    """Impressões dos arquivos, na ordem de entrada, em lotes num ProcessPoolExecutor"""
+    if jobs <= 1 or len(arquivos) < LIMIAR_PARALELO:
+        return [impressoes_do_arquivo(a) for a in arquivos]
+    tamanho_lote = max(1, -(-len(arquivos) // (jobs * LOTES_POR_PROCESSO)))
+    lotes = [
+        [(a.caminho, a.tamanho, a.mtime) for a in arquivos[i:i + tamanho_lote]]
+        for i in range(0, len(arquivos), tamanho_lote)
+    ]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return [lista for resultado in pool.map(_impressoes_lote, lotes) for lista in resultado]
+
+
+class _Conjuntos:
+    """Union-find simples para agrupar os fragmentos"""
+
+    def __init__(self):
+        self.pai = {}
+
+    def achar(self, x):
+        self.pai.setdefault(x, x)
+        while self.pai[x] != x:
+            self.pai[x] = self.pai[self.pai[x]]
+            x = self.pai[x]
+        return x
+
+    def unir(self, a, b):
+        self.pai[self.achar(a)] = self.achar(b)
+
+
+def _regioes(casamentos):
+    """
+    casamentos: [(pos_a, pos_b, impressão_a, impressão_b)] de um par de
+    arquivos na mesma diagonal (pos_b - pos_a constante). Junta os que estão
+    a menos de uma janela + k-grama de distância em regiões contínuas.
+    """
+    casamentos.sort()
+    atual = [casamentos[0]]
+    for item in casamentos[1:]:
+        if item[0] - atual[-1][0] <= JANELA + K_TOKENS:
+            atual.append(item)
+        else:
+            yield atual
+            atual = [item]
+    yield atual
+
+
+def agrupar_clones(por_arquivo):
+    """
+    por_arquivo: {caminho_rel: impressões}. Cada impressão repetida liga a
+    primeira ocorrência às demais (estrela, linear no nº de ocorrências);
+    os casamentos de um par de arquivos na mesma diagonal viram regiões e as
+    regiões que se sobrepõem no mesmo arquivo viram um grupo.
+    """
+    ocorrencias = {}
+    for caminho, lista in por_arquivo.items():
+        for fp in lista:
+            ocorrencias.setdefault(fp[0], []).append((caminho, fp))
+
+    diagonais = {}
+    for lista in ocorrencias.values():
+        if len(lista) < 2 or len(lista) > MAX_OCORRENCIAS:
+            continue
+        caminho_a, fp_a = lista[0]
+        for caminho_b, fp_b in lista[1:]:
+            if caminho_a == caminho_b and abs(fp_b[1] - fp_a[1]) < K_TOKENS:
+                continue
+            chave = (caminho_a, caminho_b, fp_b[1] - fp_a[1])
+            diagonais.setdefault(chave, []).append((fp_a[1], fp_b[1], fp_a, fp_b))
+
+    # Fragmento: (caminho, token inicial, token final, linha inicial, linha final)
+    fragmentos = []
+    for (caminho_a, caminho_b, _), casamentos in diagonais.items():
+        for regiao in _regioes(casamentos):
+            tokens = regiao[-1][0] - regiao[0][0] + K_TOKENS
+            if tokens < MIN_TOKENS:
+                continue
+            primeiro, ultimo = regiao[0], regiao[-1]
+            a = (caminho_a, primeiro[0], ultimo[0] + K_TOKENS, primeiro[2][2], ultimo[2][3])
+            b = (caminho_b, primeiro[1], ultimo[1] + K_TOKENS, primeiro[3][2], ultimo[3][3])
+            if a[4] - a[3] + 1 < MIN_LINHAS:
+                continue
+            if caminho_a == caminho_b and a[1] < b[2] and b[1] < a[2]:
+                continue   # o trecho se repete dentro dele mesmo (listas, tabelas)
+            fragmentos.append((a, b))
+
+    conjuntos = _Conjuntos()
+    por_caminho = {}
+    for a, b in fragmentos:
+        conjuntos.unir(a, b)
+        por_caminho.setdefault(a[0], []).append(a)
+        por_caminho.setdefault(b[0], []).append(b)
+    # Fragmentos sobrepostos no mesmo arquivo são o mesmo trecho visto por pares diferentes
+    for lista in por_caminho.values():
+        lista.sort(key=lambda f: f[1])
+        for anterior, atual in zip(lista, lista[1:]):
+            if atual[1] < anterior[2]:
+                conjuntos.unir(anterior, atual)
+
+    componentes = {}
+    for lista in por_caminho.values():
+        for fragmento in lista:
+            componentes.setdefault(conjuntos.achar(fragmento), []).append(fragmento)
+
+    grupos = []
+    for membros in componentes.values():
+        trechos = {}
+        for caminho, t_ini, t_fim, l_ini, l_fim in sorted(membros, key=lambda f: (f[0], f[1])):
+            anteriores = trechos.setdefault(caminho, [])
+            if anteriores and t_ini < anteriores[-1][1]:
+                ant = anteriores[-1]
+                anteriores[-1] = [ant[0], max(ant[1], t_fim), ant[2], max(ant[3], l_fim)]
+            else:
+                anteriores.append([t_ini, t_fim, l_ini, l_fim])
+        ocorrencias_grupo = [
+            {"file": caminho, "start_line": l_ini, "end_line": l_fim, "tokens": t_fim - t_ini}
+            for caminho, lista in sorted(trechos.items())
+            for t_ini, t_fim, l_ini, l_fim in lista
+        ]
+        if len(ocorrencias_grupo) < 2:
+            continue
+        grupos.append({
+            "tokens": min(o["tokens"] for o in ocorrencias_grupo),
+            "lines": min(o["end_line"] - o["start_line"] + 1 for o in ocorrencias_grupo),
+            "occurrences": ocorrencias_grupo,
+        })
+    grupos.sort(key=lambda g: (-g["tokens"] * (len(g["occurrences"]) - 1), g["occurrences"][0]["file"]))
+    return grupos
+
+
+def versao_clones():
+    parametros = [VERSAO_CLONES, K_TOKENS, JANELA]
+    return hashlib.sha1(json.dumps(parametros).encode("utf-8")).hexdigest()
+
+
+def detectar_clones(arquivos, cache=None, jobs=1):
+    """
+    Grupos de código duplicado em `arquivos` (do índice compartilhado). As
+    impressões de cada arquivo ficam em cache como os achados da auditoria:
+    só os arquivos alterados são tokenizados de novo (em paralelo se jobs > 1).
+    """
+    arquivos = [a for a in arquivos if not a.caminho.endswith(IGNORAR_SUFIXOS)]
+    cacheadas = [cache.obter(a) if cache else None for a in arquivos]
+    faltando = [a for a, lista in zip(arquivos, cacheadas) if lista is None]
+    novas = iter(_impressoes_em_paralelo(faltando, jobs))
+    # Mesma ordem da varredura com ou sem cache: o agrupamento sai igual
+    por_arquivo = {}
+    for arquivo, lista in zip(arquivos, cacheadas):
+        if lista is None:
+            lista = next(novas)
+            if cache:
+                cache.guardar(arquivo, lista)
+        por_arquivo[arquivo.caminho_rel] = lista
+    if cache:
+        cache.podar(por_arquivo)
+        cache.salvar()
+    return agrupar_clones(por_arquivo)
+
+
+def carregar_cache_clones():
+    return CacheAuditoria(versao_clones(), CLONES_CACHE_FILE)
+
+
+if __name__ == "__main__":
+    inicio = time.perf_counter()
+    usar_cache = "--no-cache" not in sys.argv
+    grupos = detectar_clones(obter_indice(PASTA_SRC).arquivos(EXTENSOES), carregar_cache_clones() if usar_cache else None)
+    print("🧬 DETECTOR DE CÓDIGO DUPLICADO")
+    print("=" * 60)
+    for grupo in grupos:
+        print(f"\n🧬 {len(grupo['occurrences'])} cópias, ~{grupo['tokens']} tokens / {grupo['lines']} linhas")
+        for o in grupo["occurrences"]:
+            print(f"   {o['file']}:{o['start_line']}-{o['end_line']}")
+    print(f"\n📊 {len(grupos)} grupos de clones em {(time.perf_counter() - inicio) * 1000:.0f}ms")
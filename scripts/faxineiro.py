@@ -1,13 +1,18 @@
 import os
-import re
-import shutil
+import sys
+import json
 from datetime import datetime
 
+from cofre_backup import Execucao
+from indice_fontes import PASTA_SRC, EXTENSOES, obter_indice
+from motor_reescrita import CODEMODS, VERSAO_PLANO, gerar_plano, aplicar_plano
+from trava_execucao import trava_exclusiva
+
 # CONFIGURAÇÃO
-PASTA_SRC = "src"
-EXTENSOES = {".ts", ".tsx", ".js", ".jsx"}
-IGNORE_DIRS = {"node_modules", ".next", "dist", "build", ".git", "_BACKUP_LIXO", "_BACKUP_ZUMBIS", "_BACKUP_BEFORE_FIX"}
-BACKUP_DIR = "_BACKUP_BEFORE_FIX"
+PLANO_DIR = os.path.join(".cache", "faxina")
+PLANO_FILE = os.path.join(PLANO_DIR, "plano.json")
+DIFF_FILE = os.path.join(PLANO_DIR, "plano.diff")
+REGRAS = ["localhost", "console"]
 
 # Contadores
 stats = {
@@ -17,178 +22,83 @@ stats = {
     "backups_criados": 0
 }
 
-def criar_backup(filepath):
-    """Cria backup do arquivo antes de modificá-lo"""
-    caminho_relativo = os.path.relpath(filepath, ".")
-    destino = os.path.join(BACKUP_DIR, caminho_relativo)
-    
-    os.makedirs(os.path.dirname(destino), exist_ok=True)
-    shutil.copy2(filepath, destino)
-    stats["backups_criados"] += 1
-    return destino
-
-def corrigir_localhost(linha):
-    """
-    Substitui http://localhost:3000 por variável de ambiente.
-    Retorna a linha corrigida e se houve mudança.
-    """
-    original = linha
-    
-    # Padrão 1: Dentro de template string `${...}`
-    # Ex: `${baseUrl}` onde baseUrl = "http://localhost:3000"
-    
-    # Padrão 2: String simples com aspas
-    # "http://localhost:3000/api" -> `${process.env.NEXT_PUBLIC_APP_URL || ''}/api`
-    
-    # Detecta se está dentro de aspas simples ou duplas
-    patterns = [
-        # "http://localhost:3000" ou 'http://localhost:3000'
-        (r'["\']http://localhost:3000([^"\']*)["\']', r'`${process.env.NEXT_PUBLIC_APP_URL || ""}\1`'),
-        # http://localhost:3000 sem aspas (raro, mas pode acontecer em comentários - ignorar)
-    ]
-    
-    for pattern, replacement in patterns:
-        linha = re.sub(pattern, replacement, linha)
-    
-    changed = linha != original
-    return linha, changed
-
-def comentar_console(linha):
-    """
-    Comenta linhas com console.log (não apaga por segurança).
-    Retorna a linha modificada e se houve mudança.
-    """
-    # Ignora linhas já comentadas
-    stripped = linha.lstrip()
-    if stripped.startswith("//") or stripped.startswith("/*"):
-        return linha, False
-    
-    # Verifica se tem console.log
-    if "console.log(" in linha:
-        # Pega a indentação original
-        indentacao = len(linha) - len(linha.lstrip())
-        espacos = linha[:indentacao]
-        
-        # Adiciona comentário
-        linha_comentada = f"{espacos}// [FAXINEIRO] {linha.lstrip()}"
-        return linha_comentada, True
-    
-    return linha, False
+def salvar_plano(plano, diff):
+    os.makedirs(PLANO_DIR, exist_ok=True)
+    with open(PLANO_FILE, "w", encoding="utf-8") as f:
+        json.dump(plano, f, ensure_ascii=False, indent=2)
+    with open(DIFF_FILE, "w", encoding="utf-8", newline="") as f:
+        f.write(diff)
 
-def processar_arquivo(filepath):
-    """Processa um arquivo aplicando todas as correções"""
+def carregar_plano():
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            linhas = f.readlines()
-    except Exception as e:
-        print(f"  ❌ Erro ao ler: {e}")
-        return False
-    
-    modificado = False
-    novas_linhas = []
-    localhost_count = 0
-    console_count = 0
-    
-    for linha in linhas:
-        linha_atual = linha
-        
-        # 1. Corrigir localhost
-        linha_atual, localhost_changed = corrigir_localhost(linha_atual)
-        if localhost_changed:
-            localhost_count += 1
-        
-        # 2. Comentar console.log
-        linha_atual, console_changed = comentar_console(linha_atual)
-        if console_changed:
-            console_count += 1
-        
-        novas_linhas.append(linha_atual)
-        
-        if localhost_changed or console_changed:
-            modificado = True
-    
-    if modificado:
-        # Criar backup antes de salvar
-        criar_backup(filepath)
-        
-        # Salvar arquivo modificado
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.writelines(novas_linhas)
-        
-        stats["arquivos_modificados"] += 1
-        stats["localhost_corrigidos"] += localhost_count
-        stats["console_comentados"] += console_count
-        
-        return True
-    
-    return False
+        with open(PLANO_FILE, "r", encoding="utf-8") as f:
+            plano = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return plano if plano.get("versao") == VERSAO_PLANO else None
 
 def listar_arquivos(pasta):
     """Lista todos os arquivos elegíveis para correção"""
-    arquivos = []
-    for root, dirs, files in os.walk(pasta):
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        for file in files:
-            _, ext = os.path.splitext(file)
-            if ext in EXTENSOES:
-                arquivos.append(os.path.join(root, file))
-    return arquivos
+    return obter_indice(pasta).arquivos(EXTENSOES)
 
-def faxina():
+def cabecalho():
     print("🧹 FAXINEIRO - Correção Automática de Código")
     print("=" * 60)
     print(f"📅 {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
     print("=" * 60)
     print()
     print("📋 O que será corrigido:")
-    print("   🏠 localhost:3000 → process.env.NEXT_PUBLIC_APP_URL")
-    print("   🐛 console.log → comentado com // [FAXINEIRO]")
+    for nome in REGRAS:
+        print(f"   • {CODEMODS[nome].descricao}")
     print()
-    
+
+def planejar():
+    """Gera o plano, salva em disco e mostra o preview. Retorna o plano."""
     arquivos = listar_arquivos(PASTA_SRC)
     print(f"📁 Encontrados {len(arquivos)} arquivos para analisar")
     print()
     
-    # Primeira passada: contar o que será alterado
-    preview_localhost = 0
-    preview_console = 0
-    
-    for arquivo in arquivos:
-        try:
-            with open(arquivo, "r", encoding="utf-8") as f:
-                conteudo = f.read()
-                preview_localhost += len(re.findall(r'http://localhost:3000', conteudo))
-                # Conta console.log não comentados
-                for linha in conteudo.split('\n'):
-                    stripped = linha.lstrip()
-                    if 'console.log(' in linha and not stripped.startswith('//') and not stripped.startswith('/*'):
-                        preview_console += 1
-        except:
-            pass
+    plano, diff = gerar_plano(arquivos, REGRAS)
+    salvar_plano(plano, diff)
     
+    totais = plano["totais"]
     print(f"🔍 Preview das correções:")
-    print(f"   🏠 {preview_localhost} URLs localhost encontradas")
-    print(f"   🐛 {preview_console} console.logs encontrados")
+    print(f"   📁 {totais['arquivos']} arquivos serão modificados")
+    print(f"   🏠 {totais.get('localhost', 0)} URLs localhost encontradas")
+    print(f"   🐛 {totais.get('console', 0)} console.logs encontrados")
+    print(f"   📝 Plano salvo em: {PLANO_FILE} (diff em {DIFF_FILE})")
     print()
+    return plano
+
+def aplicar(plano):
+    """Aplica o plano com backup no cofre. Retorna (aplicados, pulados, id do backup)."""
+    print("🚀 Aplicando correções...")
+    print("-" * 60)
     
-    if preview_localhost == 0 and preview_console == 0:
-        print("✨ Nada para corrigir! Código já está limpo.")
-        return
+    # Zera os contadores (o daemon de auditoria reaproveita o processo)
+    for chave in stats:
+        stats[chave] = 0
     
-    resp = input(f"⚠️  Deseja aplicar as correções? (s/n): ")
-    if resp.lower() != 's':
-        print("❌ Operação cancelada.")
-        return
+    # Não reescreve arquivos enquanto uma auditoria ou outra correção os lê
+    with trava_exclusiva("fix"):
+        execucao = Execucao("faxineiro")
+        aplicados, pulados, contagem = aplicar_plano(plano, execucao)
+        id_backup = execucao.id if execucao.finalizar() else None
     
-    print()
-    print("🚀 Aplicando correções...")
-    print("-" * 60)
+    stats["arquivos_modificados"] += len(aplicados)
+    stats["backups_criados"] += len(aplicados)
+    stats["localhost_corrigidos"] += contagem.get("localhost", 0)
+    stats["console_comentados"] += contagem.get("console", 0)
+    
+    for caminho in aplicados:
+        print(f"✅ {caminho}")
+    for caminho in pulados:
+        print(f"⚠️  {caminho} mudou desde o plano, não foi alterado (gere um novo plano)")
     
-    for arquivo in arquivos:
-        caminho_rel = os.path.relpath(arquivo, ".")
-        resultado = processar_arquivo(arquivo)
-        if resultado:
-            print(f"✅ {caminho_rel}")
+    # O plano já foi consumido
+    for arquivo_plano in (PLANO_FILE, DIFF_FILE):
+        if os.path.exists(arquivo_plano):
+            os.remove(arquivo_plano)
     
     print("-" * 60)
     print()
@@ -196,12 +106,67 @@ def faxina():
     print(f"   📁 Arquivos modificados: {stats['arquivos_modificados']}")
     print(f"   🏠 Localhost corrigidos: {stats['localhost_corrigidos']}")
     print(f"   🐛 Console.logs comentados: {stats['console_comentados']}")
-    print(f"   💾 Backups criados em: {BACKUP_DIR}/")
+    if id_backup:
+        print(f"   💾 Backups no cofre: execução {id_backup}")
     print()
     print("✨ Faxina concluída!")
+    if id_backup:
+        print()
+        print("💡 DICA: Se algo quebrou, restaure do backup:")
+        print(f"   python scripts/cofre_backup.py restore {id_backup}")
+    return aplicados, pulados, id_backup
+
+def _perguntar(pergunta):
+    return input(pergunta).lower() == 's'
+
+def faxina(modo=None, confirmar=_perguntar):
+    """
+    Modos:
+      (nenhum) planeja, pede confirmação e aplica o plano em memória
+      plan     só gera o plano (.cache/faxina/plano.json + plano.diff)
+      apply    aplica o último plano salvo, sem varrer a árvore
+    confirmar: pergunta -> bool (a CLI troca o input() por --yes/--dry-run).
+    Retorna um dict com "status": limpo, pendente, aplicado ou erro.
+    """
+    cabecalho()
+    
+    if modo == "apply":
+        plano = carregar_plano()
+        if plano is None:
+            print(f"❌ Nenhum plano encontrado em {PLANO_FILE}. Rode primeiro: python scripts/faxineiro.py plan")
+            return {"status": "erro", "message": f"Nenhum plano em {PLANO_FILE}"}
+        if not plano["arquivos"]:
+            print("✨ Nada para corrigir! Código já está limpo.")
+            return {"status": "limpo"}
+        return _resultado_aplicacao(plano, aplicar(plano))
+    
+    plano = planejar()
+    
+    if not plano["arquivos"]:
+        print("✨ Nada para corrigir! Código já está limpo.")
+        return {"status": "limpo"}
+    
+    pendente = {"status": "pendente", "planned": plano["totais"], "plan": PLANO_FILE, "diff": DIFF_FILE}
+    if modo == "plan":
+        print("💡 Para aplicar: python scripts/faxineiro.py apply")
+        return pendente
+    
+    if not confirmar(f"⚠️  Deseja aplicar as correções? (s/n): "):
+        print("❌ Operação cancelada.")
+        return pendente
+    
     print()
-    print("💡 DICA: Se algo quebrou, restaure do backup:")
-    print(f"   xcopy /E /Y {BACKUP_DIR}\\* .")
+    return _resultado_aplicacao(plano, aplicar(plano))
+
+def _resultado_aplicacao(plano, resultado):
+    aplicados, pulados, id_backup = resultado
+    return {
+        "status": "aplicado",
+        "planned": plano["totais"],
+        "applied": aplicados,
+        "skipped": pulados,
+        "backup": id_backup,
+    }
 
 if __name__ == "__main__":
-    faxina()
+    faxina(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,13 +1,13 @@
 import os
-import re
-import shutil
-from datetime import datetime
+
+from cofre_backup import Execucao
+from indice_fontes import PASTA_SRC, EXTENSOES, obter_indice
+from motor_reescrita import gerar_plano, aplicar_plano
+from trava_execucao import trava_exclusiva
 
 # CONFIGURAÇÃO
-PASTA_SRC = "src"
-EXTENSOES = {".ts", ".tsx", ".js", ".jsx"}
-IGNORE_DIRS = {"node_modules", ".next", "dist", "build", ".git", "_BACKUP_LIXO", "_BACKUP_ZUMBIS", "_BACKUP_BEFORE_FIX"}
-BACKUP_DIR = "_BACKUP_BEFORE_FIX"
+# Mesmo codemod "localhost" do faxineiro, rodando no motor de reescrita
+REGRAS = ["localhost"]
 
 # Contadores
 stats = {
@@ -16,106 +16,73 @@ stats = {
     "backups_criados": 0
 }
 
-def criar_backup(filepath):
-    """Cria backup do arquivo antes de modificá-lo"""
-    caminho_relativo = os.path.relpath(filepath, ".")
-    destino = os.path.join(BACKUP_DIR, caminho_relativo)
-    
-    os.makedirs(os.path.dirname(destino), exist_ok=True)
-    shutil.copy2(filepath, destino)
-    stats["backups_criados"] += 1
-    return destino
+def listar_arquivos(pasta):
+    """Lista todos os arquivos elegíveis"""
+    return obter_indice(pasta).arquivos(EXTENSOES)
 
-def corrigir_localhost(conteudo):
+def executar(confirmar=None):
     """
-    Substitui http://localhost:3000 por variável de ambiente.
-    Retorna o conteúdo corrigido e quantidade de substituições.
+    Executa a correção de localhost.
+    confirmar: pergunta -> bool chamada antes de aplicar (None aplica direto,
+    como a API sempre fez; a CLI passa --yes/--dry-run por aqui).
     """
-    count = 0
-    
-    # Padrão: "http://localhost:3000..." ou 'http://localhost:3000...'
-    def replacer(match):
-        nonlocal count
-        count += 1
-        path = match.group(1) or ""
-        return f'`${{process.env.NEXT_PUBLIC_APP_URL || ""}}{path}`'
-    
-    # Substitui strings com aspas simples ou duplas
-    novo_conteudo = re.sub(
-        r'["\']http://localhost:3000([^"\']*)["\']',
-        replacer,
-        conteudo
-    )
-    
-    return novo_conteudo, count
-
-def processar_arquivo(filepath):
-    """Processa um arquivo corrigindo localhost"""
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            conteudo = f.read()
-    except Exception as e:
-        return False, 0
-    
-    novo_conteudo, count = corrigir_localhost(conteudo)
+    print("🔗 FIX LOCALHOST - Correção de URLs")
+    print("=" * 50)
     
-    if count > 0:
-        # Criar backup antes de salvar
-        criar_backup(filepath)
-        
-        # Salvar arquivo modificado
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(novo_conteudo)
+    with trava_exclusiva("fix"):
+        arquivos = listar_arquivos(PASTA_SRC)
+        plano, _ = gerar_plano(arquivos, REGRAS)
         
-        stats["arquivos_modificados"] += 1
-        stats["localhost_corrigidos"] += count
+        encontradas = plano["totais"]["localhost"]
+        if not plano["arquivos"]:
+            print("✨ Nenhuma URL localhost para corrigir.")
+            return {"success": True, "status": "limpo", "arquivos_modificados": 0, "urls_corrigidas": 0,
+                    "backup": None, "detalhes": []}
+        if confirmar is not None and not confirmar(
+            f"⚠️  {encontradas} URLs em {len(plano['arquivos'])} arquivos. Corrigir? (s/n): "
+        ):
+            print("❌ Nada foi alterado.")
+            return {"success": True, "status": "pendente", "arquivos_modificados": 0, "urls_corrigidas": 0,
+                    "urls_encontradas": encontradas, "backup": None,
+                    "detalhes": [{"arquivo": os.path.normpath(item["caminho"]), "correcoes": len(item["edicoes"])}
+                                 for item in plano["arquivos"]]}
         
-        return True, count
+        execucao = Execucao("fix_localhost")
+        aplicados, pulados, contagem = aplicar_plano(plano, execucao)
+        id_backup = execucao.id if execucao.finalizar() else None
     
-    return False, 0
-
-def listar_arquivos(pasta):
-    """Lista todos os arquivos elegíveis"""
-    arquivos = []
-    for root, dirs, files in os.walk(pasta):
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        for file in files:
-            _, ext = os.path.splitext(file)
-            if ext in EXTENSOES:
-                arquivos.append(os.path.join(root, file))
-    return arquivos
-
-def executar():
-    """Executa a correção de localhost"""
-    print("🔗 FIX LOCALHOST - Correção de URLs")
-    print("=" * 50)
+    stats["arquivos_modificados"] += len(aplicados)
+    stats["backups_criados"] += len(aplicados)
+    stats["localhost_corrigidos"] += contagem["localhost"]
     
-    arquivos = listar_arquivos(PASTA_SRC)
+    correcoes = {item["caminho"]: len(item["edicoes"]) for item in plano["arquivos"]}
     arquivos_corrigidos = []
-    
-    for arquivo in arquivos:
-        caminho_rel = os.path.relpath(arquivo, ".")
-        modificado, count = processar_arquivo(arquivo)
-        if modificado:
-            arquivos_corrigidos.append({
-                "arquivo": caminho_rel,
-                "correcoes": count
-            })
-            print(f"✅ {caminho_rel} ({count} correções)")
+    for caminho in aplicados:
+        arquivos_corrigidos.append({
+            "arquivo": os.path.normpath(caminho),
+            "correcoes": correcoes[caminho]
+        })
+        print(f"✅ {os.path.normpath(caminho)} ({correcoes[caminho]} correções)")
+    for caminho in pulados:
+        print(f"⚠️  {caminho} mudou durante a correção, não foi alterado")
     
     print()
     print("=" * 50)
     print(f"📊 RESUMO:")
     print(f"   Arquivos modificados: {stats['arquivos_modificados']}")
     print(f"   URLs corrigidas: {stats['localhost_corrigidos']}")
-    print(f"   Backups criados em: {BACKUP_DIR}/")
+    if id_backup:
+        print(f"   Backups no cofre: execução {id_backup}")
+        print(f"   Para desfazer: python scripts/cofre_backup.py restore {id_backup}")
     print("=" * 50)
     
     # Retorna JSON para a API
     return {
         "success": True,
+        "status": "aplicado",
         "arquivos_modificados": stats["arquivos_modificados"],
         "urls_corrigidas": stats["localhost_corrigidos"],
+        "backup": id_backup,
         "detalhes": arquivos_corrigidos
     }
 
@@ -0,0 +1,166 @@
+import re
+
+from indice_fontes import PASTA_SRC
+from grafo_imports import GrafoImports
+
+# CONFIGURAÇÃO
+RE_USE_CLIENT = re.compile(r"^[\"']use client[\"']", re.M)
+RE_USE_SERVER = re.compile(r"^[\"']use server[\"']", re.M)
+
+# Sinais de que o módulo só pode rodar no servidor
+RE_SERVER_ONLY = re.compile(
+    r"""import\s+['"]server-only['"]"""
+    r"""|from\s+['"](?:next/headers|fs|fs/promises|child_process|node:[\w/]+)['"]"""
+    r"""|process\.env\.SUPABASE_SERVICE_ROLE_KEY"""
+)
+
+# Prefixos que o scan antigo marcava como risco quando importados direto
+PREFIXOS_DIRETOS = ("@/lib", "@/modules")
+
+
+class AnaliseFronteira:
+    """
+    Para cada arquivo "use client", calcula o fecho transitivo de módulos
+    server-only que ele puxa para o bundle, com a cadeia completa de imports.
+
+    O grafo considera só imports de valor (import type é apagado no build) e
+    não atravessa arquivos "use server" (o client recebe apenas stubs RPC).
+    O fecho é memoizado por componente fortemente conexo (Tarjan), então
+    arquivos client que compartilham subárvores não refazem a travessia.
+    """
+
+    def __init__(self, grafo=None):
+        self.grafo = grafo or GrafoImports(PASTA_SRC)
+        conteudos = {c: (a.conteudo or "") for c, a in self.grafo.arquivos.items()}
+        self.clientes = sorted(c for c, t in conteudos.items() if RE_USE_CLIENT.search(t))
+        self.acoes_servidor = {c for c, t in conteudos.items() if RE_USE_SERVER.search(t)}
+        self.server_only = {c for c, t in conteudos.items() if RE_SERVER_ONLY.search(t)}
+
+        self.sucessores = {}
+        for origem, arestas in self.grafo.arestas.items():
+            vistos = []
+            for _, destino, so_tipo in arestas:
+                if so_tipo or destino in self.acoes_servidor or destino in vistos:
+                    continue
+                vistos.append(destino)
+            self.sucessores[origem] = vistos
+
+        # caminho -> {módulo server-only alcançável: próximo salto da cadeia (None = ele mesmo)}
+        self.proximo = {}
+        self._calcular()
+
+    def _componentes(self):
+        """Tarjan iterativo: devolve os SCCs em ordem topológica reversa (sumidouros primeiro)"""
+        indice, baixo, na_pilha = {}, {}, set()
+        pilha, componentes = [], []
+        contador = 0
+        for raiz in self.sucessores:
+            if raiz in indice:
+                continue
+            trabalho = [(raiz, 0)]
+            while trabalho:
+                no, i = trabalho.pop()
+                if i == 0:
+                    indice[no] = baixo[no] = contador
+                    contador += 1
+                    pilha.append(no)
+                    na_pilha.add(no)
+                sucs = self.sucessores.get(no, ())
+                if i < len(sucs):
+                    trabalho.append((no, i + 1))
+                    viz = sucs[i]
+                    if viz not in indice:
+                        trabalho.append((viz, 0))
+                    elif viz in na_pilha:
+                        baixo[no] = min(baixo[no], indice[viz])
+                    continue
+                if baixo[no] == indice[no]:
+                    componente = []
+                    while True:
+                        membro = pilha.pop()
+                        na_pilha.discard(membro)
+                        componente.append(membro)
+                        if membro == no:
+                            break
+                    componentes.append(componente)
+                if trabalho:
+                    pai = trabalho[-1][0]
+                    baixo[pai] = min(baixo[pai], baixo[no])
+        return componentes
+
+    def _calcular(self):
+        for componente in self._componentes():
+            membros = set(componente)
+            for no in componente:
+                alvos = self.proximo.setdefault(no, {})
+                if no in self.server_only:
+                    alvos[no] = None
+                for viz in self.sucessores.get(no, ()):
+                    if viz not in membros:
+                        for alvo in self.proximo.get(viz, ()):
+                            alvos.setdefault(alvo, viz)
+            # Ciclo: propaga dentro do componente até estabilizar
+            mudou = len(componente) > 1
+            while mudou:
+                mudou = False
+                for no in componente:
+                    alvos = self.proximo[no]
+                    for viz in self.sucessores.get(no, ()):
+                        if viz in membros:
+                            for alvo in self.proximo[viz]:
+                                if alvo not in alvos:
+                                    alvos[alvo] = viz
+                                    mudou = True
+
+    def cadeia(self, origem, alvo):
+        """Cadeia de imports origem -> ... -> alvo"""
+        caminho = [origem]
+        atual = origem
+        while self.proximo[atual][alvo] is not None:
+            atual = self.proximo[atual][alvo]
+            caminho.append(atual)
+        return caminho
+
+    def diretos(self, cliente):
+        """
+        Imports @/lib e @/modules diretos (o que o scan antigo reportava),
+        inclusive os que não resolvem para nenhum arquivo
+        """
+        resolvidos = [e for e, _, _ in self.grafo.arestas.get(cliente, ())]
+        especificadores = resolvidos + self.grafo.nao_resolvidos.get(cliente, [])
+        return [e for e in dict.fromkeys(especificadores) if e.startswith(PREFIXOS_DIRETOS)]
+
+    def violacoes(self):
+        """[(arquivo client, [(módulo server-only, cadeia)])] em ordem de caminho"""
+        saida = []
+        for cliente in self.clientes:
+            alvos = sorted(self.proximo.get(cliente, {}))
+            if alvos:
+                saida.append((cliente, [(alvo, self.cadeia(cliente, alvo)) for alvo in alvos]))
+        return saida
+
+
+def violacoes_json(analise):
+    """Violações no formato do JSON da API: uma entrada por par (client, módulo server-only)"""
+    return [
+        {
+            "client": cliente.replace("\\", "/"),
+            "server_only": alvo.replace("\\", "/"),
+            "chain": [c.replace("\\", "/") for c in cadeia],
+        }
+        for cliente, alvos in analise.violacoes()
+        for alvo, cadeia in alvos
+    ]
+
+
+def verificar_fronteira(analise=None):
+    """Imprime os arquivos "use client" que puxam código server-only e retorna o resultado"""
+    print("🧱 FRONTEIRA CLIENT/SERVER")
+    print("=" * 60)
+    analise = analise or AnaliseFronteira()
+    violacoes = violacoes_json(analise)
+    for v in violacoes:
+        print(f"🚨 {v['client']} → {v['server_only']}")
+        print(f"      {' → '.join(v['chain'])}")
+    print(f"\n📊 {len(analise.clientes)} arquivos client, {len(violacoes)} imports server-only no bundle")
+    return {"status": "pendente" if violacoes else "limpo", "violations": violacoes}
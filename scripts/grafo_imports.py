@@ -0,0 +1,134 @@
+import os
+import re
+import json
+from collections import deque
+
+from indice_fontes import PASTA_SRC, ArquivoFonte, obter_indice
+
+# CONFIGURAÇÃO
+TSCONFIG_FILE = "tsconfig.json"
+EXTENSOES_RESOLUCAO = [".ts", ".tsx", ".js", ".jsx", ".json", ".css", ".scss"]
+EXTENSOES_GRAFO = {".ts", ".tsx", ".js", ".jsx", ".css", ".scss"}
+
+# import x from 'y' | import 'y' | export { x } from 'y' | import('y') | require('y')
+RE_IMPORT = re.compile(
+    r"""\b(?:import|export)\s+(type\s+)?(?:[\w*{}\s,$]+?\s+from\s+)?['"]([^'"\n]+)['"]"""
+    r"""|\bimport\s*\(\s*['"]([^'"\n]+)['"]\s*\)"""
+    r"""|\brequire\s*\(\s*['"]([^'"\n]+)['"]\s*\)"""
+)
+RE_IMPORT_CSS = re.compile(r"""@import\s+(?:url\(\s*)?['"]([^'"\n]+)['"]""")
+RE_COMENTARIO_JSON = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.S)
+
+
+def extrair_especificadores(arquivo):
+    """
+    Especificadores de import/export/import()/require de um arquivo (uma passada).
+    Retorna [(especificador, so_tipo)]; so_tipo = import type/export type (apagado no build).
+    """
+    conteudo = arquivo.conteudo
+    if not conteudo:
+        return []
+    if arquivo.ext in (".css", ".scss"):
+        return [(e, False) for e in RE_IMPORT_CSS.findall(conteudo)]
+    return [(a or b or c, bool(tipo)) for tipo, a, b, c in RE_IMPORT.findall(conteudo)]
+
+
+def carregar_aliases(tsconfig=TSCONFIG_FILE):
+    """Lê compilerOptions.paths do tsconfig: [(prefixo, [destinos])], mais específico primeiro"""
+    try:
+        with open(tsconfig, "r", encoding="utf-8") as f:
+            texto = f.read()
+    except OSError:
+        return []
+    # tsconfig aceita comentários; remove-os sem mexer em strings
+    texto = RE_COMENTARIO_JSON.sub(lambda m: m.group() if m.group().startswith('"') else "", texto)
+    try:
+        opcoes = json.loads(texto).get("compilerOptions", {})
+    except ValueError:
+        return []
+
+    base = os.path.join(os.path.dirname(tsconfig), opcoes.get("baseUrl", "."))
+    aliases = []
+    for padrao, destinos in opcoes.get("paths", {}).items():
+        prefixo = padrao[:-1] if padrao.endswith("*") else padrao
+        alvos = [os.path.normpath(os.path.join(base, d[:-1] if d.endswith("*") else d)) for d in destinos]
+        aliases.append((prefixo, padrao.endswith("*"), alvos))
+    aliases.sort(key=lambda a: -len(a[0]))
+    return aliases
+
+
+class GrafoImports:
+    """
+    Grafo de imports de src/ (mais arquivos extras, ex: middleware.ts na raiz).
+    Cada arquivo é parseado uma vez; arestas guardam o especificador original.
+    """
+
+    def __init__(self, pasta=PASTA_SRC, extras=(), tsconfig=TSCONFIG_FILE):
+        self.indice = obter_indice(pasta)
+        self.aliases = carregar_aliases(tsconfig)
+
+        self.arquivos = {}
+        for arquivo in self.indice.arquivos(None):
+            self.arquivos[os.path.normpath(arquivo.caminho)] = arquivo
+        for caminho in extras:
+            if os.path.isfile(caminho):
+                self.arquivos[os.path.normpath(caminho)] = self.indice.obter(caminho) or ArquivoFonte.de_caminho(caminho)
+
+        # caminho -> [(especificador, destino resolvido, so_tipo)]
+        self.arestas = {}
+        self.nao_resolvidos = {}
+        for caminho, arquivo in self.arquivos.items():
+            if arquivo.ext not in EXTENSOES_GRAFO:
+                continue
+            saida = []
+            for especificador, so_tipo in extrair_especificadores(arquivo):
+                destino = self.resolver(caminho, especificador)
+                if destino is not None:
+                    saida.append((especificador, destino, so_tipo))
+                elif especificador.startswith(".") or self._alias(especificador):
+                    self.nao_resolvidos.setdefault(caminho, []).append(especificador)
+            self.arestas[caminho] = saida
+
+    def _alias(self, especificador):
+        for prefixo, curinga, alvos in self.aliases:
+            if curinga and especificador.startswith(prefixo):
+                return [os.path.join(alvo, especificador[len(prefixo):]) for alvo in alvos]
+            if not curinga and especificador == prefixo:
+                return alvos
+        return None
+
+    def _arquivo_existente(self, base):
+        if base in self.arquivos:
+            return base
+        for ext in EXTENSOES_RESOLUCAO:
+            if base + ext in self.arquivos:
+                return base + ext
+        for ext in EXTENSOES_RESOLUCAO:
+            candidato = os.path.join(base, "index" + ext)
+            if candidato in self.arquivos:
+                return candidato
+        return None
+
+    def resolver(self, origem, especificador):
+        """Resolve um especificador para um arquivo do grafo (None para pacotes externos)"""
+        if especificador.startswith("."):
+            bases = [os.path.join(os.path.dirname(origem), especificador)]
+        else:
+            bases = self._alias(especificador) or []
+        for base in bases:
+            destino = self._arquivo_existente(os.path.normpath(base))
+            if destino is not None:
+                return destino
+        return None
+
+    def alcancaveis(self, raizes):
+        """BFS a partir das raízes: O(nós + arestas)"""
+        vistos = set(raizes)
+        fila = deque(raizes)
+        while fila:
+            atual = fila.popleft()
+            for _, destino, _ in self.arestas.get(atual, ()):
+                if destino not in vistos:
+                    vistos.add(destino)
+                    fila.append(destino)
+        return vistos
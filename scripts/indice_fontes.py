@@ -0,0 +1,243 @@
+import os
+import mmap
+import stat
+import hashlib
+from bisect import bisect_right
+from contextlib import contextmanager
+
+# CONFIGURAÇÃO UNIFICADA (usada por todos os scripts de auditoria/correção)
+PASTA_SRC = "src"
+EXTENSOES = {".ts", ".tsx", ".js", ".jsx"}
+IGNORE_DIRS = {
+    "node_modules", ".next", "dist", "build", ".git", "scripts",
+    "_BACKUP_LIXO", "_BACKUP_ZUMBIS", "_BACKUP_BEFORE_FIX", "_BACKUP_HEALTH", "_BACKUP_STORE",
+}
+
+
+# A partir deste tamanho o conteúdo cru é mapeado em memória em vez de lido
+LIMIAR_MMAP = 64 * 1024
+
+
+def hash_conteudo(conteudo):
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+
+def hash_bytes(dados):
+    """Mesmo valor de hash_conteudo para UTF-8 válido, sem decodificar"""
+    return hashlib.sha1(dados).hexdigest()
+
+
+class ArquivoFonte:
+    """Arquivo do índice, com conteúdo e tabela de offsets de linha em cache"""
+
+    __slots__ = ("caminho", "ext", "tamanho", "mtime", "_conteudo", "_offsets", "erro")
+
+    def __init__(self, caminho, tamanho, mtime):
+        self.caminho = caminho
+        self.ext = os.path.splitext(caminho)[1]
+        self.tamanho = tamanho
+        self.mtime = mtime
+        self._conteudo = None
+        self._offsets = None
+        self.erro = None
+
+    @classmethod
+    def de_caminho(cls, caminho):
+        """Entrada avulsa, fora de uma varredura (ex: arquivos listados num plano)"""
+        st = os.stat(caminho)
+        return cls(caminho, st.st_size, st.st_mtime)
+
+    @property
+    def caminho_rel(self):
+        return os.path.relpath(self.caminho, ".").replace("\\", "/")
+
+    @property
+    def conteudo(self):
+        """Conteúdo decodificado (lido do disco uma única vez). None se ilegível."""
+        if self._conteudo is None and self.erro is None:
+            try:
+                with open(self.caminho, "rb") as f:
+                    self._conteudo = f.read().decode("utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                self.erro = e
+        return self._conteudo
+
+    @contextmanager
+    def bytes_brutos(self):
+        """Conteúdo cru, sem decodificar: mmap para arquivos grandes, read() para os pequenos"""
+        with open(self.caminho, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= LIMIAR_MMAP:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    yield mm
+            else:
+                yield f.read()
+
+    @property
+    def hash(self):
+        conteudo = self.conteudo
+        return hash_conteudo(conteudo) if conteudo is not None else None
+
+    @property
+    def linhas(self):
+        """Linhas com o terminador preservado (quebra apenas em \\n, como readlines)"""
+        conteudo = self.conteudo
+        if not conteudo:
+            return []
+        offsets = self.offsets
+        linhas = [conteudo[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+        if offsets[-1] < len(conteudo):
+            linhas.append(conteudo[offsets[-1]:])
+        return linhas
+
+    @property
+    def offsets(self):
+        """Offset de início de cada linha (índice 0 = linha 1)"""
+        if self._offsets is None:
+            conteudo = self.conteudo or ""
+            offsets = [0]
+            pos = conteudo.find("\n")
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = conteudo.find("\n", pos + 1)
+            self._offsets = offsets
+        return self._offsets
+
+    def linha_do_offset(self, pos):
+        """Converte um offset no buffer para o número da linha (1-based)"""
+        return bisect_right(self.offsets, pos)
+
+    def texto_da_linha(self, num_linha):
+        offsets = self.offsets
+        inicio = offsets[num_linha - 1]
+        fim = offsets[num_linha] if num_linha < len(offsets) else len(self.conteudo or "")
+        return self.conteudo[inicio:fim]
+
+    def invalidar(self):
+        """Descarta o cache (ex: depois que um script reescreveu o arquivo)"""
+        self._conteudo = None
+        self._offsets = None
+        self.erro = None
+        try:
+            st = os.stat(self.caminho)
+            self.tamanho, self.mtime = st.st_size, st.st_mtime
+        except OSError:
+            pass
+
+
+class IndiceFontes:
+    """Varredura única de uma pasta com os.scandir, compartilhada entre as ferramentas"""
+
+    def __init__(self, pasta=PASTA_SRC, ignore_dirs=IGNORE_DIRS):
+        self.pasta = pasta
+        self.ignore_dirs = set(ignore_dirs)
+        self.entradas = []
+        self._por_caminho = {}
+        self._varrer()
+
+    def _varrer(self, anteriores=None):
+        # DFS em pré-ordem com nomes ordenados: mesma ordem que os.walk, mas determinística
+        anteriores = anteriores or {}
+        pilha = [self.pasta]
+        while pilha:
+            atual = pilha.pop()
+            try:
+                with os.scandir(atual) as it:
+                    itens = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            subpastas = []
+            for item in itens:
+                if item.is_dir(follow_symlinks=False):
+                    if item.name not in self.ignore_dirs:
+                        subpastas.append(item.path)
+                elif item.is_file():
+                    st = item.stat()
+                    arquivo = anteriores.get(item.path)
+                    # Arquivo inalterado mantém o conteúdo e os offsets já carregados
+                    if arquivo is None or (arquivo.tamanho, arquivo.mtime) != (st.st_size, st.st_mtime):
+                        arquivo = ArquivoFonte(item.path, st.st_size, st.st_mtime)
+                    self.entradas.append(arquivo)
+                    self._por_caminho[item.path] = arquivo
+            pilha.extend(reversed(subpastas))
+
+    def atualizar(self):
+        """
+        Varre a pasta de novo (processos de vida longa, ex: o daemon de auditoria).
+        Retorna True se algum arquivo foi criado, removido ou modificado.
+        """
+        anteriores = self._por_caminho
+        self.entradas = []
+        self._por_caminho = {}
+        self._varrer(anteriores)
+        if len(anteriores) != len(self._por_caminho):
+            return True
+        return any(anteriores.get(c) is not a for c, a in self._por_caminho.items())
+
+    def _chave_ordem(self, arquivo):
+        # Mesma ordem do _varrer: arquivos de uma pasta antes das subpastas, por nome
+        partes = os.path.relpath(arquivo.caminho, self.pasta).split(os.sep)
+        return [(1, p) for p in partes[:-1]] + [(0, partes[-1])]
+
+    def atualizar_caminhos(self, caminhos):
+        """
+        Atualiza só os caminhos informados (ex: eventos do vigia), sem revarrer
+        a árvore. Retorna True se algum deles foi criado, removido ou modificado.
+        """
+        mudou, novos = False, False
+        prefixo = os.path.join(self.pasta, "")
+        for caminho in caminhos:
+            partes = os.path.relpath(caminho, self.pasta).split(os.sep)
+            if not caminho.startswith(prefixo) or self.ignore_dirs.intersection(partes[:-1]):
+                continue
+            anterior = self._por_caminho.get(caminho)
+            try:
+                st = os.stat(caminho)
+                existe = stat.S_ISREG(st.st_mode)
+            except OSError:
+                existe = False
+
+            if not existe:
+                if anterior is not None:
+                    del self._por_caminho[caminho]
+                    self.entradas.remove(anterior)
+                    mudou = True
+                continue
+            if anterior is not None and (anterior.tamanho, anterior.mtime) == (st.st_size, st.st_mtime):
+                continue
+
+            arquivo = ArquivoFonte(caminho, st.st_size, st.st_mtime)
+            self._por_caminho[caminho] = arquivo
+            if anterior is None:
+                self.entradas.append(arquivo)
+                novos = True
+            else:
+                self.entradas[self.entradas.index(anterior)] = arquivo
+            mudou = True
+
+        if novos:
+            self.entradas.sort(key=self._chave_ordem)
+        return mudou
+
+    def arquivos(self, extensoes=EXTENSOES):
+        """Arquivos com as extensões pedidas (None = todos)"""
+        if extensoes is None:
+            return list(self.entradas)
+        return [a for a in self.entradas if a.ext in extensoes]
+
+    def caminhos(self, extensoes=EXTENSOES):
+        return [a.caminho for a in self.arquivos(extensoes)]
+
+    def obter(self, caminho):
+        return self._por_caminho.get(caminho)
+
+
+_indices = {}
+
+
+def obter_indice(pasta=PASTA_SRC, recarregar=False):
+    """Índice compartilhado por processo: a árvore é varrida uma única vez"""
+    chave = os.path.abspath(pasta)
+    if recarregar or chave not in _indices:
+        _indices[chave] = IndiceFontes(pasta)
+    return _indices[chave]
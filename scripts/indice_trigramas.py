@@ -0,0 +1,415 @@
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from array import array
+
+from indice_fontes import IGNORE_DIRS, IndiceFontes
+
+# CONFIGURAÇÃO
+PASTAS_INDICE = ["src", "supabase"]
+EXTENSOES_INDICE = {".ts", ".tsx", ".js", ".jsx", ".sql"}
+# supabase/scripts tem SQL de manutenção que também interessa às consultas
+IGNORE_DIRS_INDICE = IGNORE_DIRS - {"scripts"}
+INDICE_FILE = os.path.join(".cache", "audit", "trigramas.sqlite")
+
+# Incrementar quando o esquema ou a extração de trigramas mudar
+VERSAO_INDICE = 1
+LOTE_SQL = 500   # parâmetros por cláusula IN (o SQLite limita a quantidade)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE IF NOT EXISTS arquivos (id INTEGER PRIMARY KEY, caminho TEXT UNIQUE, tamanho INTEGER, mtime REAL, trigramas TEXT);
+CREATE TABLE IF NOT EXISTS postings (trigrama TEXT PRIMARY KEY, arquivos BLOB) WITHOUT ROWID;
+"""
+
+
+def trigramas(texto):
+    """Trigramas em minúsculas: o mesmo índice atende consultas com e sem -i"""
+    texto = texto.lower()
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+# PLANO DA CONSULTA
+# Um regex vira uma árvore de literais obrigatórios: str (o literal precisa
+# aparecer), ("e", [...]), ("ou", [...]) ou None (não restringe nada).
+# Na dúvida a árvore fica mais frouxa: candidatos a mais, nunca a menos.
+
+class _SemPlano(Exception):
+    pass
+
+
+QUANTIFICADOR_CHAVES = re.compile(r"\{(\d*)(,\d*)?\}")
+ESCAPES_LITERAIS = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v"}
+
+
+def _e(partes):
+    partes = [p for p in partes if p is not None and (not isinstance(p, str) or len(p) >= 3)]
+    if not partes:
+        return None
+    return partes[0] if len(partes) == 1 else ("e", partes)
+
+
+def _ou(ramos):
+    if any(r is None for r in ramos):
+        return None
+    return ramos[0] if len(ramos) == 1 else ("ou", ramos)
+
+
+def _quantificador(p, i):
+    """(é opcional, próximo índice) do quantificador em p[i], ou (None, i) se não houver"""
+    if i >= len(p):
+        return None, i
+    if p[i] in "*?+":
+        opcional, i = p[i] != "+", i + 1
+    else:
+        m = QUANTIFICADOR_CHAVES.match(p, i)
+        if not m:
+            return None, i
+        opcional, i = m.group(1) in ("", "0"), m.end()
+    if i < len(p) and p[i] in "?+":
+        i += 1
+    return opcional, i
+
+
+def _grupo(p, i):
+    """Grupo aberto em p[i - 1]; retorna (nó ou "flags", índice depois do ')')"""
+    ignorar = False
+    if p.startswith("?", i):
+        if p.startswith("?:", i):
+            i += 2
+        elif p.startswith("?P<", i) or (p.startswith("?<", i) and not p.startswith(("?<=", "?<!"), i)):
+            i = p.index(">", i) + 1
+        elif p.startswith(("?=", "?!"), i):
+            i, ignorar = i + 2, True
+        elif p.startswith(("?<=", "?<!"), i):
+            i, ignorar = i + 3, True
+        else:
+            m = re.compile(r"\?([aiLmsux]*)(?:-[imsx]+)?([:)])").match(p, i)
+            if not m or "x" in m.group(1):
+                raise _SemPlano()
+            if m.group(2) == ")":
+                return "flags", m.end()
+            i = m.end()
+    no, i = _alternativa(p, i)
+    if i >= len(p) or p[i] != ")":
+        raise _SemPlano()
+    return (None if ignorar else no), i + 1
+
+
+def _sequencia(p, i):
+    partes, atual = [], []
+
+    def fechar():
+        if atual:
+            partes.append("".join(atual))
+            atual.clear()
+
+    while i < len(p) and p[i] not in "|)":
+        c = p[i]
+        literal, grupo = None, None
+        if c == "(":
+            grupo, i = _grupo(p, i + 1)
+            if grupo == "flags":
+                continue
+        elif c == "[":
+            j = i + 1
+            if p.startswith("^", j):
+                j += 1
+            if p.startswith("]", j):
+                j += 1
+            while p[j] != "]":
+                j += 2 if p[j] == "\\" else 1
+            i = j + 1
+        elif c == "\\":
+            proximo = p[i + 1]
+            if proximo in ESCAPES_LITERAIS:
+                literal = ESCAPES_LITERAIS[proximo]
+            elif not proximo.isalnum():
+                literal = proximo
+            i += 2
+        elif c in ".^$":
+            i += 1
+        else:
+            literal, i = c, i + 1
+
+        opcional, i = _quantificador(p, i)
+        if literal is not None and not opcional:
+            atual.append(literal)
+            if opcional is None:
+                continue
+        fechar()
+        if grupo is not None and not opcional:
+            partes.append(grupo)
+    fechar()
+    return _e(partes), i
+
+
+def _alternativa(p, i):
+    no, i = _sequencia(p, i)
+    ramos = [no]
+    while i < len(p) and p[i] == "|":
+        no, i = _sequencia(p, i + 1)
+        ramos.append(no)
+    return _ou(ramos), i
+
+
+def planejar(padrao):
+    """Literais que toda ocorrência de `padrao` contém (None = qualquer arquivo pode casar)"""
+    try:
+        no, i = _alternativa(padrao, 0)
+    except (_SemPlano, IndexError, ValueError):
+        return None
+    return no if i == len(padrao) else None
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido trigrama → arquivos de src/ e supabase/, persistido em
+    SQLite. Cada trigrama guarda a lista de ids dos arquivos num blob, e cada
+    arquivo guarda os próprios trigramas, para que uma atualização reescreva
+    só as listas dos trigramas dos arquivos alterados. Só os arquivos com
+    tamanho/mtime diferentes do que está gravado são relidos; uma consulta lê
+    apenas as listas dos trigramas que o regex exige e roda o regex de
+    verdade só nos arquivos candidatos.
+    """
+
+    def __init__(self, caminho=INDICE_FILE, pastas=PASTAS_INDICE):
+        self.caminho = caminho
+        self.pastas = pastas
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self.db = sqlite3.connect(caminho)
+        self.db.executescript(ESQUEMA)
+        versao = self.db.execute("SELECT valor FROM meta WHERE chave = 'versao'").fetchone()
+        if versao is None or versao[0] != str(VERSAO_INDICE):
+            with self.db:
+                self.db.execute("DELETE FROM postings")
+                self.db.execute("DELETE FROM arquivos")
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('versao', ?)", (str(VERSAO_INDICE),))
+
+    def fechar(self):
+        self.db.close()
+
+    def _arquivos_em_disco(self):
+        atuais = {}
+        for pasta in self.pastas:
+            for arquivo in IndiceFontes(pasta, IGNORE_DIRS_INDICE).arquivos(EXTENSOES_INDICE):
+                atuais[arquivo.caminho_rel] = arquivo
+        return atuais
+
+    def _postings(self, lista):
+        """{trigrama: set(ids)} das linhas gravadas para os trigramas pedidos"""
+        postings = {}
+        for i in range(0, len(lista), LOTE_SQL):
+            lote = lista[i:i + LOTE_SQL]
+            for trigrama, blob in self.db.execute(
+                f"SELECT trigrama, arquivos FROM postings WHERE trigrama IN ({','.join('?' * len(lote))})", lote
+            ):
+                postings[trigrama] = set(array("I", blob))
+        return postings
+
+    def atualizar(self):
+        """Sincroniza o índice com o disco. Retorna (indexados, removidos)."""
+        atuais = self._arquivos_em_disco()
+        gravados = {
+            c: (i, t, m, tri)
+            for i, c, t, m, tri in self.db.execute("SELECT id, caminho, tamanho, mtime, trigramas FROM arquivos")
+        }
+        removidos = gravados.keys() - atuais.keys()
+        alterados = [
+            a for c, a in atuais.items()
+            if c not in gravados or gravados[c][1:3] != (a.tamanho, a.mtime)
+        ]
+        if not removidos and not alterados:
+            return 0, 0
+
+        saem, entram = {}, {}   # id -> trigramas antigos / novos
+        with self.db:
+            for caminho in removidos:
+                id_arquivo, _, _, antigos = gravados[caminho]
+                saem[id_arquivo] = antigos
+                self.db.execute("DELETE FROM arquivos WHERE id = ?", (id_arquivo,))
+            for arquivo in alterados:
+                try:
+                    with arquivo.bytes_brutos() as dados:
+                        novos = trigramas(bytes(dados).decode("utf-8", errors="replace"))
+                except OSError as e:
+                    print(f"⚠️  Não foi possível ler {arquivo.caminho_rel}: {e}", file=sys.stderr)
+                    continue
+                # Trigramas têm sempre 3 caracteres: concatenados, sem separador
+                serializados = "".join(novos)
+                anterior = gravados.get(arquivo.caminho_rel)
+                if anterior is not None:
+                    id_arquivo = anterior[0]
+                    saem[id_arquivo] = anterior[3]
+                    self.db.execute(
+                        "UPDATE arquivos SET tamanho = ?, mtime = ?, trigramas = ? WHERE id = ?",
+                        (arquivo.tamanho, arquivo.mtime, serializados, id_arquivo),
+                    )
+                else:
+                    id_arquivo = self.db.execute(
+                        "INSERT INTO arquivos (caminho, tamanho, mtime, trigramas) VALUES (?, ?, ?, ?)",
+                        (arquivo.caminho_rel, arquivo.tamanho, arquivo.mtime, serializados),
+                    ).lastrowid
+                entram[id_arquivo] = novos
+
+            antigos = {id_arquivo: {t[i:i + 3] for i in range(0, len(t), 3)} for id_arquivo, t in saem.items()}
+            afetados = set().union(*antigos.values(), *entram.values())
+            postings = self._postings(list(afetados)) if gravados else {}
+            for id_arquivo, tris in antigos.items():
+                for trigrama in tris:
+                    postings.get(trigrama, set()).discard(id_arquivo)
+            for id_arquivo, tris in entram.items():
+                for trigrama in tris:
+                    postings.setdefault(trigrama, set()).add(id_arquivo)
+
+            vazios = [(t,) for t in afetados if not postings.get(t)]
+            self.db.executemany("DELETE FROM postings WHERE trigrama = ?", vazios)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO postings VALUES (?, ?)",
+                ((t, array("I", sorted(ids)).tobytes()) for t, ids in postings.items() if ids),
+            )
+        return len(alterados), len(removidos)
+
+    def _com_trigramas(self, literal):
+        """Ids dos arquivos que contêm todos os trigramas do literal"""
+        tris = list(trigramas(literal))
+        postings = self._postings(tris)
+        if len(postings) < len(tris):
+            return set()
+        return set.intersection(*postings.values())
+
+    def _avaliar(self, no):
+        if isinstance(no, str):
+            return self._com_trigramas(no)
+        tipo, filhos = no
+        conjuntos = [self._avaliar(f) for f in filhos]
+        if tipo == "e":
+            return set.intersection(*conjuntos)
+        return set.union(*conjuntos)
+
+    def candidatos(self, padrao):
+        """Caminhos que podem conter uma ocorrência de `padrao`, em ordem alfabética"""
+        plano = planejar(padrao)
+        if plano is None:
+            return sorted(c for (c,) in self.db.execute("SELECT caminho FROM arquivos"))
+        ids = list(self._avaliar(plano))
+        caminhos = []
+        for i in range(0, len(ids), LOTE_SQL):
+            lote = ids[i:i + LOTE_SQL]
+            caminhos.extend(c for (c,) in self.db.execute(
+                f"SELECT caminho FROM arquivos WHERE id IN ({','.join('?' * len(lote))})", lote
+            ))
+        return sorted(caminhos)
+
+    def total_arquivos(self):
+        return self.db.execute("SELECT COUNT(*) FROM arquivos").fetchone()[0]
+
+    def buscar(self, padrao, ignorar_caixa=False, candidatos=None):
+        """Gera (caminho, num_linha, linha, ocorrências) para cada linha que casa"""
+        regex = re.compile(padrao, re.IGNORECASE if ignorar_caixa else 0)
+        for caminho in self.candidatos(padrao) if candidatos is None else candidatos:
+            try:
+                with open(caminho, "rb") as f:
+                    texto = f.read().decode("utf-8", errors="replace")
+            except OSError:
+                continue
+            for num_linha, linha in enumerate(texto.split("\n"), 1):
+                ocorrencias = sum(1 for _ in regex.finditer(linha))
+                if ocorrencias:
+                    yield caminho, num_linha, linha.rstrip("\r"), ocorrencias
+
+
+def consultar(padrao, ignorar_caixa=False, contar=False, saida=None, titulo=None, como_json=False):
+    inicio = time.perf_counter()
+    indice = IndiceTrigramas()
+    try:
+        indexados, removidos = indice.atualizar()
+        atualizado = time.perf_counter()
+        candidatos = indice.candidatos(padrao)
+        resultados = list(indice.buscar(padrao, ignorar_caixa, candidatos))
+        total = indice.total_arquivos()
+    finally:
+        indice.fechar()
+    fim = time.perf_counter()
+
+    if como_json:
+        print(json.dumps({
+            "pattern": padrao,
+            "files_indexed": total,
+            "files_reindexed": indexados,
+            "candidates": len(candidatos),
+            "matches": [{"file": c, "line": n, "text": l, "count": o} for c, n, l, o in resultados],
+            "elapsed_ms": round((fim - inicio) * 1000, 1),
+        }, ensure_ascii=False, indent=2))
+        return resultados
+
+    if contar:
+        por_arquivo = {}
+        for caminho, _, _, ocorrencias in resultados:
+            por_arquivo[caminho] = por_arquivo.get(caminho, 0) + ocorrencias
+        ordenados = sorted(por_arquivo.items(), key=lambda x: (-x[1], x[0]))
+        linhas = [f"{c} ({n} {'match' if n == 1 else 'matches'})" for c, n in ordenados]
+    else:
+        linhas = [f"{c}:{n}:{l}" for c, n, l, _ in resultados]
+
+    if saida:
+        with open(saida, "w", encoding="utf-8") as f:
+            f.write(f"{titulo or padrao}:\n\n")
+            f.write("".join(l + "\n" for l in linhas))
+    else:
+        for linha in linhas:
+            print(linha)
+
+    print(
+        f"🔎 {len(resultados)} linha(s) em {len(candidatos)}/{total} arquivo(s) candidato(s) "
+        f"| índice: {indexados} reindexado(s), {removidos} removido(s) em {(atualizado - inicio) * 1000:.0f}ms "
+        f"| total {(fim - inicio) * 1000:.0f}ms",
+        file=sys.stderr,
+    )
+    if saida:
+        print(f"💾 Resultado salvo em: {saida}", file=sys.stderr)
+    return resultados
+
+
+def construir():
+    print("🗂️  ÍNDICE DE TRIGRAMAS")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    indice = IndiceTrigramas()
+    try:
+        indexados, removidos = indice.atualizar()
+        total = indice.total_arquivos()
+    finally:
+        indice.fechar()
+    print(f"📁 {total} arquivos em {', '.join(PASTAS_INDICE)}")
+    print(f"♻️  {indexados} (re)indexado(s), {removidos} removido(s) em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+    print(f"💾 Índice em: {INDICE_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice de trigramas de src/ e supabase/ para buscas por regex")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sub.add_parser("build", help="cria ou atualiza o índice")
+
+    p_query = sub.add_parser("query", help="busca um regex usando o índice para escolher os arquivos")
+    p_query.add_argument("padrao")
+    p_query.add_argument("-i", "--ignore-case", action="store_true")
+    p_query.add_argument("--count", action="store_true", help="só o número de ocorrências por arquivo")
+    p_query.add_argument("--output", help="grava no formato de audit/*_hits.txt")
+    p_query.add_argument("--title", help="cabeçalho do arquivo gerado com --output")
+    p_query.add_argument("--json", action="store_true")
+
+    args = parser.parse_args()
+    if args.comando == "build":
+        construir()
+    else:
+        try:
+            consultar(args.padrao, args.ignore_case, args.count, args.output, args.title, args.json)
+        except re.error as e:
+            print(f"❌ Regex inválido: {e}", file=sys.stderr)
+            sys.exit(2)
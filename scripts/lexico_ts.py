@@ -0,0 +1,151 @@
+import re
+from array import array
+from bisect import bisect_right
+
+# Contexto léxico de cada posição do arquivo
+CODIGO, COMENTARIO, STRING, TEMPLATE, REGEX = range(5)
+CONTEXTOS = {
+    "codigo": CODIGO,
+    "comentario": COMENTARIO,
+    "string": STRING,
+    "template": TEMPLATE,
+    "regex": REGEX,
+}
+
+# Incrementar quando as regras de segmentação mudarem (invalida o cache de achados)
+VERSAO_LEXICO = 2
+
+# Fonte dos padrões: o mesmo texto é compilado para str e para bytes (todos os
+# delimitadores são ASCII, e em UTF-8 nenhum byte de um caractere multibyte é
+# ASCII, então os offsets em bytes saem certos sem decodificar o arquivo).
+# {PALAVRA} é um caractere de identificador: aspas logo depois dele não abrem
+# string (JS não permite), são apóstrofos de texto JSX (<p>Don't</p>).
+def _fonte_codigo(chaves):
+    # O padrão começa por uma classe de caracteres (o primeiro caractere de
+    # qualquer token): assim o sre pula direto entre candidatos em C. Cada
+    # alternativa confere em lookbehind qual caractere foi consumido.
+    return (
+        ("[/\"'`{}]" if chaves else "[/\"'`]") + "(?:"
+        # 1: comentário. "//" logo depois de ":" é URL em texto JSX, não comentário
+        r"(?<=/)(/(?<!://)[^\n]*|\*.*?(?:\*/|\Z))"
+        # 2 e 3: string entre aspas; sem fechamento, termina no fim da linha
+        r"""|(?<=")((?<!{PALAVRA}")(?:[^"\\\n]|\\.)*"?)"""
+        r"""|(?<=')((?<!{PALAVRA}')(?:[^'\\\n]|\\.)*'?)"""
+        # 4: início de template literal
+        r"|(?<=`)((?<!{PALAVRA}`))"
+        # 5: regex literal, só logo depois de operador (senão "/" é divisão ou </tag>).
+        # ++ e -- pós-fixos terminam uma expressão: "a++ / 2" é divisão
+        r"|(?<=/)((?<!\+\+/)(?<!--/)(?<!\+\+[ \t]/)(?<!--[ \t]/)"
+        r"(?:(?<={OPERADOR}/)|(?<={OPERADOR}[ \t]/))(?![*/])(?:[^/\\\n\[]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*)"
+        # 6 e 7: dentro de ${...} as chaves são contadas para achar o fim da expressão
+        + (r"|(?<=\{)()|(?<=\})()" if chaves else "")
+        + ")"
+    ).replace("{OPERADOR}", r"[(,=:\[!&|?{;+\-*%~^]")
+
+
+# Texto do template até "`" (fim) ou "${" (expressão); sem nenhum dos dois, vai até o fim do arquivo
+_FONTE_TEMPLATE = r"(?:[^`\\$]+|\\.|\$(?!\{))*(`|\$\{)?"
+
+COMENTARIO_G, ASPAS_G, APOSTROFO_G, TEMPLATE_G, REGEX_G, ABRE_G, FECHA_G = range(1, 8)
+
+
+def _compilar(palavra, texto):
+    return tuple(
+        re.compile(texto(fonte.replace("{PALAVRA}", palavra)), re.S)
+        for fonte in (_fonte_codigo(False), _fonte_codigo(True), _FONTE_TEMPLATE)
+    )
+
+
+_PADROES_STR = _compilar(r"[\w$]", str)
+_PADROES_BYTES = _compilar(r"[\w$\x80-\xff]", lambda fonte: fonte.encode("ascii"))
+
+
+class Lexico:
+    """
+    Segmentação léxica de um arquivo TS/TSX/JS em uma passada linear:
+    comentários, strings, template literals (com ${...} aninhados, que voltam
+    a ser código) e regex literais. O resto é código, inclusive JSX.
+
+    Funciona sobre str, bytes ou mmap; os offsets são do próprio buffer.
+    As regras da auditoria e os codemods perguntam o contexto da posição de
+    cada ocorrência (contexto(pos)) em vez de adivinhar pela linha.
+    """
+
+    __slots__ = ("inicios", "fins", "tipos")
+
+    def __init__(self, dados):
+        # Só os trechos que não são código; código é o que sobra entre eles
+        self.inicios = array("Q")
+        self.fins = array("Q")
+        self.tipos = bytearray()
+        self._segmentar(dados)
+
+    def _adicionar(self, inicio, fim, tipo):
+        if fim > inicio:
+            self.inicios.append(inicio)
+            self.fins.append(fim)
+            self.tipos.append(tipo)
+
+    def _segmentar(self, dados):
+        codigo, chaves, template = _PADROES_STR if isinstance(dados, str) else _PADROES_BYTES
+        adicionar = self._adicionar
+        pilha = []   # chaves abertas em cada ${...} em que estamos
+        em_template = False
+        inicio_template = pos = 0
+        while True:
+            if em_template:
+                m = template.match(dados, pos)
+                adicionar(inicio_template, m.end(), TEMPLATE)
+                pos = m.end()
+                fim = m.group(1)
+                if fim is None:
+                    return
+                if len(fim) == 2:
+                    pilha.append(0)
+                em_template = False
+                continue
+
+            m = (chaves if pilha else codigo).search(dados, pos)
+            if m is None:
+                return
+            grupo = m.lastindex
+            pos = m.end()
+            if grupo == COMENTARIO_G:
+                adicionar(m.start(), pos, COMENTARIO)
+            elif grupo == ASPAS_G or grupo == APOSTROFO_G:
+                adicionar(m.start(), pos, STRING)
+            elif grupo == TEMPLATE_G:
+                # O "`" de abertura faz parte do template
+                inicio_template = m.start()
+                em_template = True
+            elif grupo == REGEX_G:
+                adicionar(m.start(), pos, REGEX)
+            elif grupo == ABRE_G:
+                pilha[-1] += 1
+            elif pilha[-1]:
+                pilha[-1] -= 1
+            else:
+                # "}" que fecha o ${...}: volta para o texto do template
+                pilha.pop()
+                inicio_template = m.start()
+                em_template = True
+
+    def segmento(self, pos):
+        """(contexto, início, fim) do trecho que contém pos"""
+        i = bisect_right(self.inicios, pos) - 1
+        if i >= 0 and pos < self.fins[i]:
+            return self.tipos[i], self.inicios[i], self.fins[i]
+        inicio = self.fins[i] if i >= 0 else 0
+        fim = self.inicios[i + 1] if i + 1 < len(self.inicios) else None
+        return CODIGO, inicio, fim
+
+    def contexto(self, pos):
+        i = bisect_right(self.inicios, pos) - 1
+        if i >= 0 and pos < self.fins[i]:
+            return self.tipos[i]
+        return CODIGO
+
+
+def contextos(nomes):
+    """Nomes de contexto ("codigo", "comentario", ...) -> conjunto de contextos"""
+    return frozenset(CONTEXTOS[nome] for nome in nomes)
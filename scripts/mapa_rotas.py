@@ -0,0 +1,659 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime, timezone
+
+from cache_auditoria import CACHE_DIR
+from lexico_ts import CODIGO, Lexico
+
+# CONFIGURAÇÃO
+PASTA_APP = os.path.join("src", "app")
+PASTA_SRC = "src"
+ROTAS_JSON = os.path.join("audit", "09_snapshot", "09_routes.json")
+ROTAS_CACHE_FILE = os.path.join(CACHE_DIR, "rotas.json")
+EXTENSOES_CODIGO = (".tsx", ".ts", ".jsx", ".js")
+# Arquivos com significado para o App Router (sem extensão)
+ARQUIVOS_ESPECIAIS = {"page", "route", "layout", "template", "loading", "error", "not-found", "default"}
+METODOS_HTTP = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+ALIAS_APP = "@/app/"
+# Middlewares com checagens por caminho (src/middleware.ts delega para updateSession)
+ARQUIVOS_MIDDLEWARE = [
+    os.path.join("src", "middleware.ts"),
+    os.path.join("src", "lib", "supabase", "middleware.ts"),
+]
+
+# Incrementar quando o formato das entradas do cache ou a leitura das pastas mudar
+VERSAO_INDEXADOR = 2
+
+# Guardas reconhecidas no código (fora de comentários/strings) de page, route
+# e layouts server-side. Em arquivos 'use client' a checagem roda no navegador
+# e não protege a rota, então não conta.
+GUARDAS = [
+    ("requireAuth", re.compile(r"\bauth\.getUser\s*\(|\bauth\.getSession\s*\(|\bredirect\([^)]*['\"]/login['\"]")),
+    ("requireSuperAdmin", re.compile(
+        r"\bisSuperAdmin\s*\(|\brequireSuperAdmin\s*\(|\bSUPER_ADMIN_EMAILS\.includes\s*\("
+        r"|\bcheckIsSuperAdmin\s*\(|\bgetSuperAdminUser\s*\("
+    )),
+    ("requireStoreAccess", re.compile(r"""\.from\(\s*['"]store_users['"]\s*\)""")),
+    ("module", re.compile(r"\bgetStoreModules\s*\(|\bhasModule\s*\(")),
+    ("requireInternalAuth", re.compile(r"\brequireInternalAuth\s*\(")),
+    ("blockInProduction", re.compile(r"\bblockInProduction\s*\(")),
+    ("cron_secret", re.compile(r"\brequireCronAuth\s*\(|\bCRON_SECRET\b")),
+    ("webhook_secret", re.compile(r"\bconstructEvent\s*\(|x-signature|stripe-signature")),
+]
+
+# Categoria do JSON: a primeira regra que casar com o caminho da rota
+CATEGORIAS = [
+    ("api_routes", "api", True, lambda url, pastas: url == "/api" or url.startswith("/api/")),
+    ("super_admin", "admin", False, lambda url, pastas: "(super-admin)" in pastas),
+    ("auth", "public", True, lambda url, pastas: "(auth)" in pastas),
+    ("merchant_dashboard", "merchant", True, lambda url, pastas: url.startswith("/[slug]/dashboard")),
+    ("driver", "driver", True, lambda url, pastas: url.startswith(("/driver", "/[slug]/motorista"))),
+    ("menu_publico", "public", True, lambda url, pastas: url.startswith(("/[slug]", "/s/[slug]"))),
+    ("billing_pages", "public", True, lambda url, pastas: url.startswith("/billing")),
+    ("public", "public", True, lambda url, pastas: True),
+]
+# Campos escritos à mão no JSON que sobrevivem à regeneração. "guard" só é
+# mantido quando nenhuma guarda foi detectada (o código pode checar de um jeito
+# que GUARDAS não reconhece; "none" ali seria falso)
+CAMPOS_MANUAIS = ("note", "mobile_first", "guard")
+
+RE_USE_CLIENT = re.compile(r"""^\s*(?:/[/*][^\n]*\n\s*)*['"]use client['"]""")
+RE_METODO = re.compile(
+    r"\bexport\s+(?:async\s+)?function\s+(" + "|".join(METODOS_HTTP) + r")\b"
+    r"|\bexport\s+(?:const|let|var)\s+(" + "|".join(METODOS_HTTP) + r")\b"
+)
+# Matchers de caminho no middleware: const m = path.match(/.../), x.startsWith('/...')
+_FONTE_REGEX_JS = r"/((?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+)/[a-z]*"
+RE_MATCH_VARIAVEL = re.compile(r"\b(?:const|let|var)\s+(\w+)\s*=\s*[\w.]+\.match\(\s*" + _FONTE_REGEX_JS + r"\s*\)")
+RE_MATCH_INLINE = re.compile(r"(!?)\s*[\w.]+\.match\(\s*" + _FONTE_REGEX_JS + r"\s*\)")
+RE_PREFIXO = re.compile(r"""(!?)\s*[\w.]+\.startsWith\(\s*['"](/[^'"]*)['"]\s*\)""")
+RE_IF = re.compile(r"\bif\s*\(")
+RE_EXPORT_LISTA = re.compile(r"\bexport\s*\{([^}]*)\}")
+RE_IMPORT = re.compile(
+    r"""\b(?:import|export)\s+(?:type\s+)?(?:[\w*{}\s,$]+?\s+from\s+)?['"]([^'"\n]+)['"]"""
+    r"""|\bimport\s*\(\s*['"]([^'"\n]+)['"]\s*\)"""
+)
+
+
+# SEGMENTOS
+
+def grupo(nome):
+    """(auth), (super-admin): organizam pastas sem entrar na URL"""
+    return nome.startswith("(") and nome.endswith(")")
+
+
+def fora_da_url(nome):
+    """Grupos e slots paralelos (@modal) não aparecem na URL"""
+    return grupo(nome) or nome.startswith("@")
+
+
+def privada(nome):
+    """_pasta: o App Router ignora a pasta e tudo dentro dela"""
+    return nome.startswith("_")
+
+
+def url_de(partes):
+    segmentos = [p for p in partes if not fora_da_url(p)]
+    return "/" + "/".join(segmentos)
+
+
+# LEITURA DE UMA PASTA
+
+def _em_codigo(conteudo, padrao, lexico):
+    for m in padrao.finditer(conteudo):
+        if lexico.contexto(m.start()) == CODIGO:
+            return m
+    return None
+
+
+def _guardas(conteudo):
+    if RE_USE_CLIENT.match(conteudo):
+        return []
+    lexico = None
+    achadas = []
+    for nome, padrao in GUARDAS:
+        if not padrao.search(conteudo):
+            continue
+        lexico = lexico or Lexico(conteudo)
+        if _em_codigo(conteudo, padrao, lexico):
+            achadas.append(nome)
+    # Junto com store_users, isSuperAdmin é a exceção (super admin entra em qualquer loja), não outra exigência
+    if "requireStoreAccess" in achadas and "requireSuperAdmin" in achadas:
+        achadas.remove("requireSuperAdmin")
+    return achadas
+
+
+def _metodos(conteudo):
+    lexico = Lexico(conteudo)
+    metodos = set()
+    for m in RE_METODO.finditer(conteudo):
+        if lexico.contexto(m.start()) == CODIGO:
+            metodos.add(m.group(1) or m.group(2))
+    # export { handler as GET, POST }
+    for m in RE_EXPORT_LISTA.finditer(conteudo):
+        if lexico.contexto(m.start()) != CODIGO:
+            continue
+        for item in m.group(1).split(","):
+            nome = item.split(" as ")[-1].strip()
+            if nome in METODOS_HTTP:
+                metodos.add(nome)
+    return [metodo for metodo in METODOS_HTTP if metodo in metodos]
+
+
+def _imports_locais(conteudo):
+    """Especificadores relativos ou @/app/ (os únicos que podem apontar para src/app)"""
+    return sorted({
+        a or b for a, b in RE_IMPORT.findall(conteudo)
+        if (a or b).startswith((".", ALIAS_APP))
+    })
+
+
+def ler_pasta(caminho, entradas):
+    """
+    Resumo de uma pasta de src/app: arquivos especiais, guardas, métodos
+    HTTP do route.ts e imports locais de todos os arquivos de código.
+    """
+    dados = {"especiais": {}, "codigo": 0, "arquivos": 0, "guardas": {}, "cliente": {}, "metodos": [], "imports": []}
+    imports = set()
+    for nome, _, _ in entradas:
+        dados["arquivos"] += 1
+        base, ext = os.path.splitext(nome)
+        if ext not in EXTENSOES_CODIGO:
+            continue
+        dados["codigo"] += 1
+        try:
+            with open(os.path.join(caminho, nome), "r", encoding="utf-8", errors="replace") as f:
+                conteudo = f.read()
+        except OSError:
+            continue
+        imports.update(_imports_locais(conteudo))
+        if base not in ARQUIVOS_ESPECIAIS or nome.endswith(".d.ts"):
+            continue
+        dados["especiais"][base] = nome
+        if base in ("page", "route", "layout"):
+            dados["guardas"][base] = _guardas(conteudo)
+            dados["cliente"][base] = bool(RE_USE_CLIENT.match(conteudo))
+        if base == "route":
+            dados["metodos"] = _metodos(conteudo)
+    dados["imports"] = sorted(imports)
+    return dados
+
+
+# MIDDLEWARE
+
+def _fechamento(texto, inicio, abre, fecha):
+    """Posição logo depois do delimitador que fecha o aberto em texto[inicio]"""
+    nivel = 0
+    for i in range(inicio, len(texto)):
+        if texto[i] == abre:
+            nivel += 1
+        elif texto[i] == fecha:
+            nivel -= 1
+            if nivel == 0:
+                return i + 1
+    return len(texto)
+
+
+def _regex_js(fonte):
+    try:
+        return re.compile(fonte.replace("\\/", "/"))
+    except re.error:
+        return None
+
+
+def guardas_middleware(arquivos=ARQUIVOS_MIDDLEWARE):
+    """
+    Blocos if (<matcher de caminho>) { ... } dos middlewares que contêm uma
+    guarda: [(arquivo, descrição, teste(caminho) -> bool, guardas)].
+    Matchers negados (!path.startsWith) não contam: o bloco roda fora do caminho.
+    """
+    regras = []
+    for caminho in arquivos:
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                conteudo = f.read()
+        except OSError:
+            continue
+        lexico = Lexico(conteudo)
+        variaveis = {}
+        for m in RE_MATCH_VARIAVEL.finditer(conteudo):
+            if lexico.contexto(m.start()) == CODIGO and _regex_js(m.group(2)):
+                variaveis[m.group(1)] = (m.group(2), _regex_js(m.group(2)))
+        for m in RE_IF.finditer(conteudo):
+            if lexico.contexto(m.start()) != CODIGO:
+                continue
+            fim_condicao = _fechamento(conteudo, m.end() - 1, "(", ")")
+            condicao = conteudo[m.end():fim_condicao - 1]
+            resto = conteudo[fim_condicao:].lstrip()
+            if not resto.startswith("{"):
+                continue
+            inicio_bloco = len(conteudo) - len(resto)
+            guardas = _guardas(conteudo[inicio_bloco:_fechamento(conteudo, inicio_bloco, "{", "}")])
+            if not guardas:
+                continue
+            testes = []
+            for nome, (fonte, padrao) in variaveis.items():
+                if re.search(r"(?<![!\w])" + nome + r"\b", condicao):
+                    testes.append((f"/{fonte}/", lambda url, p=padrao: bool(p.search(url))))
+            for negado, fonte in RE_MATCH_INLINE.findall(condicao):
+                padrao = _regex_js(fonte)
+                if not negado and padrao:
+                    testes.append((f"/{fonte}/", lambda url, p=padrao: bool(p.search(url))))
+            for negado, prefixo in RE_PREFIXO.findall(condicao):
+                if not negado:
+                    testes.append((prefixo, lambda url, p=prefixo: url.startswith(p)))
+            for descricao, teste in testes:
+                regras.append((caminho.replace("\\", "/"), descricao, teste, guardas))
+    return regras
+
+
+def caminho_exemplo(url):
+    """/[slug]/dashboard -> /exemplo/dashboard, para testar contra os matchers do middleware"""
+    return re.sub(r"\[\[?\.\.\.[^\]]+\]\]?", "exemplo/exemplo", re.sub(r"\[(?!\.)[^\]]+\]", "exemplo", url))
+
+
+# CACHE POR PASTA
+
+class CachePastas:
+    """
+    Resumo de cada pasta chaveado pelo mtime da pasta (arquivo criado, apagado
+    ou renomeado) e por nome/tamanho/mtime dos arquivos dela (arquivo editado).
+    Só as pastas que mudaram são lidas de novo; o resto vem do cache sem abrir
+    nenhum arquivo.
+    """
+
+    def __init__(self, caminho=ROTAS_CACHE_FILE):
+        self.caminho = caminho
+        regras = [VERSAO_INDEXADOR, [(nome, padrao.pattern) for nome, padrao in GUARDAS]]
+        self.versao = hashlib.sha1(json.dumps(regras).encode("utf-8")).hexdigest()
+        self.pastas = {}
+        self.hits = 0
+        self.misses = 0
+        self._alterado = False
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            if dados.get("versao") == self.versao:
+                self.pastas = dados.get("pastas", {})
+        except (OSError, ValueError):
+            pass
+
+    def obter(self, rel, chave):
+        entrada = self.pastas.get(rel)
+        if entrada is not None and entrada["chave"] == chave:
+            self.hits += 1
+            return entrada["dados"]
+        self.misses += 1
+        return None
+
+    def guardar(self, rel, chave, dados):
+        self.pastas[rel] = {"chave": chave, "dados": dados}
+        self._alterado = True
+
+    def podar(self, vivas):
+        for rel in set(self.pastas) - set(vivas):
+            del self.pastas[rel]
+            self._alterado = True
+
+    def salvar(self):
+        if not self._alterado:
+            return
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        with open(self.caminho + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"versao": self.versao, "pastas": self.pastas}, f, ensure_ascii=False)
+        os.replace(self.caminho + ".tmp", self.caminho)
+        self._alterado = False
+
+
+# ÁRVORE
+
+class Pasta:
+    __slots__ = ("rel", "partes", "dados", "filhas")
+
+    def __init__(self, rel, partes, dados):
+        self.rel = rel
+        self.partes = partes
+        self.dados = dados
+        self.filhas = []
+
+    @property
+    def caminho(self):
+        return os.path.join(PASTA_APP, *self.partes)
+
+    @property
+    def especiais(self):
+        return self.dados["especiais"]
+
+
+def indexar(pasta=PASTA_APP, cache=None):
+    """Percorre src/app uma vez (só scandir); lê os arquivos apenas das pastas alteradas"""
+    pastas = {}
+
+    def visitar(caminho, partes):
+        try:
+            with os.scandir(caminho) as it:
+                itens = list(it)
+        except OSError:
+            return None
+        arquivos = sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns) for e in itens if e.is_file())
+        subpastas = sorted(e.name for e in itens if e.is_dir() and not e.name.startswith("."))
+        rel = "/".join(partes)
+        chave = [os.stat(caminho).st_mtime_ns, [list(a) for a in arquivos]]
+        dados = cache.obter(rel, chave) if cache else None
+        if dados is None:
+            dados = ler_pasta(caminho, arquivos)
+            if cache:
+                cache.guardar(rel, chave, dados)
+        no = Pasta(rel, partes, dados)
+        pastas[rel] = no
+        for nome in subpastas:
+            filha = visitar(os.path.join(caminho, nome), partes + (nome,))
+            if filha is not None:
+                no.filhas.append(filha)
+        return no
+
+    raiz = visitar(pasta, ())
+    if cache:
+        cache.podar(pastas)
+        cache.salvar()
+    return raiz, pastas
+
+
+def _com_rota(no, memo):
+    """A pasta (ou alguma descendente) tem page ou route? Pastas _privadas nunca são rota"""
+    if no.rel not in memo:
+        memo[no.rel] = (not no.partes or not privada(no.partes[-1])) and (
+            "page" in no.especiais or "route" in no.especiais or any([_com_rota(f, memo) for f in no.filhas]))
+    return memo[no.rel]
+
+
+def _rotulo_layout(no):
+    return "/".join(no.partes) or "root"
+
+
+def rotas(raiz, middleware=()):
+    """Uma entrada por page/route, com a cadeia de layouts e as guardas herdadas deles e do middleware"""
+    saida = []
+
+    def visitar(no, layouts, guardas):
+        if no.partes and privada(no.partes[-1]):
+            return
+        if "layout" in no.especiais:
+            layouts = layouts + [no]
+            guardas = guardas + no.dados["guardas"].get("layout", [])
+        for tipo in ("page", "route"):
+            if tipo not in no.especiais:
+                continue
+            proprias = no.dados["guardas"].get(tipo, [])
+            # route.ts não passa pelos layouts
+            herdadas = guardas if tipo == "page" else []
+            exemplo = caminho_exemplo(url_de(no.partes))
+            do_middleware = [g for _, _, teste, lista in middleware if teste(exemplo) for g in lista]
+            saida.append({
+                "no": no,
+                "tipo": tipo,
+                "url": url_de(no.partes),
+                "arquivo": os.path.join(no.caminho, no.especiais[tipo]).replace("\\", "/"),
+                "layouts": [_rotulo_layout(l) for l in layouts],
+                "guardas": list(dict.fromkeys(do_middleware + herdadas + proprias)),
+                "metodos": no.dados["metodos"] if tipo == "route" else [],
+            })
+        for filha in no.filhas:
+            visitar(filha, layouts, guardas)
+
+    visitar(raiz, [], [])
+    return saida
+
+
+def _usadas(pastas):
+    """Pastas de src/app apontadas por algum import (relativo ou @/app/) de dentro de src/app"""
+    usadas = set()
+    for no in pastas.values():
+        for especificador in no.dados["imports"]:
+            if especificador.startswith(ALIAS_APP):
+                alvo = especificador[len(ALIAS_APP):]
+            else:
+                alvo = os.path.normpath(os.path.join(*no.partes, especificador) if no.partes else especificador)
+            alvo = alvo.replace("\\", "/")
+            while alvo and not alvo.startswith(".."):
+                usadas.add(alvo)
+                alvo = alvo.rpartition("/")[0]
+    return usadas
+
+
+def _importadas_fora(candidatas, pasta_src=PASTA_SRC, pasta_app=PASTA_APP):
+    """
+    Das candidatas a órfã, as importadas via @/app/ de fora de src/app
+    (ex: src/components). Só roda quando há candidatas.
+    """
+    if not candidatas:
+        return set()
+    achadas = set()
+    for raiz, dirs, arquivos in os.walk(pasta_src):
+        if os.path.normpath(raiz) == os.path.normpath(pasta_app):
+            dirs[:] = []
+            continue
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "node_modules"]
+        for nome in arquivos:
+            if not nome.endswith(EXTENSOES_CODIGO):
+                continue
+            try:
+                with open(os.path.join(raiz, nome), "r", encoding="utf-8", errors="replace") as f:
+                    conteudo = f.read()
+            except OSError:
+                continue
+            if ALIAS_APP not in conteudo:
+                continue
+            for especificador in _imports_locais(conteudo):
+                if especificador.startswith(ALIAS_APP):
+                    alvo = especificador[len(ALIAS_APP):]
+                    achadas.update(c for c in candidatas if alvo == c or alvo.startswith(c + "/"))
+    return achadas
+
+
+def orfaos(raiz, pastas):
+    """
+    Pastas de src/app que não viram rota nem são usadas:
+    - vazia: nenhum arquivo na subárvore
+    - sem_pagina: tem layout/loading/error/... mas nenhuma page/route abaixo
+    - nao_importada: só arquivos comuns, e nenhum import aponta para lá
+    Só a pasta mais alta de cada subárvore órfã é listada.
+    """
+    com_rota = {}
+    usadas = _usadas(pastas)
+    candidatas = []
+
+    def total_arquivos(no):
+        return no.dados["arquivos"] + sum(total_arquivos(f) for f in no.filhas)
+
+    def especiais_abaixo(no):
+        return bool(no.especiais) or any(especiais_abaixo(f) for f in no.filhas)
+
+    def visitar(no):
+        if no.partes and not _com_rota(no, com_rota):
+            if not total_arquivos(no):
+                candidatas.append((no, "vazia", "nenhum arquivo na pasta"))
+            elif especiais_abaixo(no):
+                candidatas.append((no, "sem_pagina", "layout/loading/error sem nenhuma page.tsx ou route.ts abaixo"))
+            elif no.rel not in usadas:
+                candidatas.append((no, "nao_importada", "nenhum import aponta para a pasta e ela não é rota"))
+            return
+        for filha in no.filhas:
+            visitar(filha)
+
+    visitar(raiz)
+    fora = _importadas_fora([no.rel for no, tipo, _ in candidatas if tipo == "nao_importada"])
+    return [
+        {"path": no.caminho.replace("\\", "/"), "kind": tipo, "message": mensagem}
+        for no, tipo, mensagem in candidatas if no.rel not in fora
+    ]
+
+
+def conflitos(lista):
+    """URLs geradas por mais de um arquivo (o next build falha) e page + route na mesma pasta"""
+    achados = []
+    por_url = {}
+    for rota in lista:
+        por_url.setdefault(rota["url"], []).append(rota)
+    for url, mesmas in sorted(por_url.items()):
+        if len(mesmas) > 1:
+            arquivos = [r["arquivo"] for r in mesmas]
+            mesma_pasta = len({r["no"].rel for r in mesmas}) == 1
+            achados.append({
+                "path": url,
+                "kind": "page_e_route" if mesma_pasta else "url_duplicada",
+                "files": arquivos,
+            })
+    return achados
+
+
+# JSON
+
+def categoria(rota):
+    if rota["tipo"] == "route":
+        # route.ts fora de /api (ex: /auth/callback) também é endpoint
+        return "api_routes", "api", True
+    for nome, tipo, mobile_first, regra in CATEGORIAS:
+        if regra(rota["url"], rota["no"].partes):
+            return nome, tipo, mobile_first
+    return "public", "public", True
+
+
+def _entrada(rota, anteriores):
+    nome, tipo, mobile_first = categoria(rota)
+    if tipo == "api":
+        entrada = {"path": rota["url"], "type": tipo, "guard": "+".join(rota["guardas"]) or "none",
+                   "methods": rota["metodos"], "file": rota["arquivo"]}
+    else:
+        layouts = rota["layouts"]
+        entrada = {"path": rota["url"], "type": tipo, "layout": layouts[-1] if layouts else "root",
+                   "guard": "+".join(rota["guardas"]) or "none", "mobile_first": mobile_first,
+                   "layouts": layouts, "file": rota["arquivo"]}
+    anterior = anteriores.get(rota["url"], {})
+    for campo in CAMPOS_MANUAIS:
+        if campo not in anterior or anterior[campo] == "none":
+            continue
+        if campo == "guard" and entrada["guard"] != "none":
+            continue
+        if campo in entrada or campo == "note":
+            entrada[campo] = anterior[campo]
+    return nome, entrada
+
+
+def _carregar_anterior(caminho):
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def montar_json(lista, orfas, duplicadas, anterior):
+    """Mesmo formato do snapshot escrito à mão; seções que não vêm de src/app são mantidas"""
+    anteriores = {r["path"]: r for grupo_rotas in anterior.get("routes", {}).values() for r in grupo_rotas}
+    grupos = {nome: [] for nome, _, _, _ in CATEGORIAS}
+    for rota in sorted(lista, key=lambda r: r["url"]):
+        nome, entrada = _entrada(rota, anteriores)
+        grupos[nome].append(entrada)
+    saida = {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "generated_by": "scripts/mapa_rotas.py",
+        "total_routes": len(lista),
+        "routes": {nome: rotas_grupo for nome, rotas_grupo in grupos.items() if rotas_grupo},
+    }
+    for chave, valor in anterior.items():
+        if chave not in saida and chave not in ("orphans", "conflicts"):
+            saida[chave] = valor
+    saida["orphans"] = orfas
+    saida["conflicts"] = duplicadas
+    return saida
+
+
+def _formatar(saida):
+    """Uma rota por linha, como no snapshot original (diffs legíveis)"""
+    linhas = ["{"]
+    chaves = list(saida)
+    for i, chave in enumerate(chaves):
+        virgula = "," if i < len(chaves) - 1 else ""
+        valor = saida[chave]
+        if chave == "routes" or (isinstance(valor, list) and valor and isinstance(valor[0], dict)):
+            grupos = valor.items() if chave == "routes" else [(None, valor)]
+            linhas.append(f'  "{chave}": ' + ("{" if chave == "routes" else "["))
+            grupos = list(grupos)
+            for j, (nome, itens) in enumerate(grupos):
+                prefixo = "    "
+                if nome is not None:
+                    linhas.append(f'    "{nome}": [')
+                    prefixo = "      "
+                for k, item in enumerate(itens):
+                    fim = "," if k < len(itens) - 1 else ""
+                    linhas.append(prefixo + "{ " + json.dumps(item, ensure_ascii=False)[1:-1] + " }" + fim)
+                if nome is not None:
+                    linhas.append("    ]" + ("," if j < len(grupos) - 1 else ""))
+            linhas.append("  " + ("}" if chave == "routes" else "]") + virgula)
+        else:
+            texto = json.dumps(valor, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            linhas.append(f'  "{chave}": {texto}{virgula}')
+    linhas.append("}")
+    return "\n".join(linhas) + "\n"
+
+
+def gerar_mapa(pasta=PASTA_APP, saida=ROTAS_JSON, usar_cache=True, gravar=True):
+    inicio = time.perf_counter()
+    print("🗺️  MAPA DE ROTAS (src/app)")
+    print("=" * 60)
+    if not os.path.isdir(pasta):
+        print(f"❌ {pasta}/ não encontrado.")
+        return {"status": "erro", "message": f"{pasta} não encontrado"}
+
+    cache = CachePastas() if usar_cache else None
+    raiz, pastas = indexar(pasta, cache)
+    lista = rotas(raiz, guardas_middleware())
+    orfas = orfaos(raiz, pastas)
+    duplicadas = conflitos(lista)
+
+    paginas = sum(1 for r in lista if r["tipo"] == "page")
+    print(f"📂 {len(pastas)} pastas → {paginas} páginas, {len(lista) - paginas} route handlers")
+    if duplicadas:
+        print(f"\n🔴 {len(duplicadas)} URL(s) em conflito:")
+        for c in duplicadas:
+            print(f"   {c['path']} ({c['kind']}): {', '.join(c['files'])}")
+    if orfas:
+        print(f"\n🟡 {len(orfas)} pasta(s) órfã(s):")
+        for o in orfas:
+            print(f"   {o['path']} [{o['kind']}] — {o['message']}")
+
+    if gravar:
+        anterior = _carregar_anterior(saida)
+        novo = montar_json(lista, orfas, duplicadas, anterior)
+        # Só o generated_at mudou: não reescreve (evita diff de timestamp no git)
+        if {**novo, "generated_at": None} == {**anterior, "generated_at": None}:
+            print(f"\n✨ {saida} já está atualizado")
+        else:
+            os.makedirs(os.path.dirname(saida), exist_ok=True)
+            with open(saida + ".tmp", "w", encoding="utf-8") as f:
+                f.write(_formatar(novo))
+            os.replace(saida + ".tmp", saida)
+            print(f"\n📝 {saida}")
+    cache_info = f", cache {cache.hits}/{cache.hits + cache.misses} pastas" if cache else ""
+    print(f"📊 {len(lista)} rotas em {(time.perf_counter() - inicio) * 1000:.0f}ms{cache_info}")
+    return {
+        "status": "pendente" if orfas or duplicadas else "limpo",
+        "routes": len(lista),
+        "orphans": orfas,
+        "conflicts": duplicadas,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera audit/09_snapshot/09_routes.json a partir de src/app")
+    parser.add_argument("--no-cache", action="store_true", help="lê todas as pastas de novo")
+    parser.add_argument("--sem-json", action="store_true", help="só mostra órfãs e conflitos")
+    args = parser.parse_args()
+    resultado = gerar_mapa(usar_cache=not args.no_cache, gravar=not args.sem_json)
+    sys.exit({"limpo": 0, "pendente": 1}.get(resultado["status"], 2))
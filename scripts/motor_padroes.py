@@ -0,0 +1,138 @@
+import re
+
+from lexico_ts import CONTEXTOS, Lexico, contextos
+
+
+class MotorPadroes:
+    """
+    Compila todas as regras em um único regex e varre o buffer inteiro do
+    arquivo de uma vez, em vez de linhas × regras chamadas de re.search.
+    Os offsets das ocorrências são mapeados para linhas com a
+    tabela de offsets do índice (bisect).
+
+    Cada regra é um predicado sobre o léxico: além do regex, declara em que
+    "contexto" (código, comentário, string, template) a ocorrência precisa
+    começar. O arquivo é segmentado uma única vez (Lexico), só quando alguma
+    regra casa, e todas as regras consultam a mesma segmentação: console.log
+    dentro de string ou comentário não conta, TODO só conta em comentário.
+
+    Cada regra conta no máximo uma vez por linha. Ocorrências que atravessam
+    quebras de linha são descartadas, exceto nas regras "multilinha", que
+    rodam sobre o buffer inteiro e contam na linha em que começam.
+    """
+
+    def __init__(self, padroes):
+        self.nomes = list(padroes)
+        self.individuais = [re.compile(padroes[nome]["regex"]) for nome in self.nomes]
+        self.contextos = [contextos(padroes[nome].get("contexto", CONTEXTOS)) for nome in self.nomes]
+        self.multilinha = [bool(padroes[nome].get("multilinha")) for nome in self.nomes]
+        de_linha = [idx for idx, multi in enumerate(self.multilinha) if not multi]
+        self.de_linha = [(idx, self.individuais[idx]) for idx in de_linha]
+        # Regras multilinha rodam em bytes sobre o buffer inteiro (todas são ASCII)
+        self.de_buffer = [
+            (idx, re.compile(padroes[nome]["regex"].encode("utf-8")))
+            for idx, nome in enumerate(self.nomes) if self.multilinha[idx]
+        ]
+        # Alternância sem grupos de captura: o sre consegue montar o prefiltro de
+        # primeiro caractere, o que grupos nomeados impedem (~3x mais lento).
+        # A regra que casou é identificada depois, só nas posições com ocorrência.
+        self.combinado = re.compile(
+            "|".join(f"(?:{padroes[self.nomes[idx]]['regex']})" for idx in de_linha) or r"(?!)"
+        )
+        # Prefiltro em bytes: toda ocorrência de uma regra contém um dos seus
+        # "literais". Se alguma regra não declarar literais, não há prefiltro.
+        literais = [padroes[nome].get("literais") for nome in self.nomes]
+        self.prefiltro = None
+        if all(literais):
+            unicos = sorted({l for ls in literais for l in ls}, key=len, reverse=True)
+            self.prefiltro = re.compile(b"|".join(re.escape(l.encode("utf-8")) for l in unicos))
+
+    def _ocorrencias(self, conteudo):
+        """Gera (offset, índice da regra, texto) para cada regra de linha que casa em cada posição"""
+        busca = self.combinado.search
+        pos = 0
+        while True:
+            m = busca(conteudo, pos)
+            if m is None:
+                return
+            inicio = m.start()
+            for idx, regra in self.de_linha:
+                m2 = regra.match(conteudo, inicio)
+                if m2 is not None:
+                    yield inicio, idx, m2.group()
+            pos = inicio + 1
+
+    def _linhas_candidatas(self, dados):
+        """(início, fim) em bytes das linhas que contêm algum literal do prefiltro"""
+        busca = self.prefiltro.search
+        pos = 0
+        while True:
+            m = busca(dados, pos)
+            if m is None:
+                return
+            inicio = dados.rfind(b"\n", 0, m.start()) + 1
+            fim = dados.find(b"\n", m.end())
+            if fim == -1:
+                fim = len(dados)
+            yield inicio, fim
+            pos = fim + 1
+
+    def varrer_bytes(self, dados):
+        """
+        Varre o conteúdo cru (bytes ou mmap) sem decodificar o arquivo inteiro:
+        o prefiltro de literais roda direto nos bytes e só as linhas candidatas
+        são decodificadas (com substituição: bytes inválidos não escondem o
+        arquivo). O léxico também roda nos bytes, e só se houver ocorrência.
+        Retorna [(num_linha, índice da regra, início, fim, texto_da_linha)],
+        com início/fim da linha em bytes.
+        """
+        if self.prefiltro is None:
+            # Sem prefiltro: todas as linhas são candidatas
+            linhas = self._todas_as_linhas(dados)
+        else:
+            linhas = self._linhas_candidatas(dados)
+
+        achados = {}   # (num_linha, idx) -> (início, fim, texto da linha)
+        lexico = None
+        candidatas = False
+        num_linha, ultimo = 1, 0
+        for inicio, fim in linhas:
+            candidatas = True
+            num_linha += dados[ultimo:inicio].count(b"\n")
+            ultimo = inicio
+            linha = dados[inicio:fim].decode("utf-8", errors="replace")
+            for offset, idx, _ in self._ocorrencias(linha):
+                if (num_linha, idx) in achados:
+                    continue
+                if lexico is None:
+                    lexico = Lexico(dados)
+                pos = inicio + (offset if linha.isascii() else len(linha[:offset].encode("utf-8")))
+                if lexico.contexto(pos) in self.contextos[idx]:
+                    achados[num_linha, idx] = (inicio, fim, linha)
+
+        if self.de_buffer and candidatas:
+            # Só há o que procurar se o prefiltro achou alguma linha candidata
+            for idx, regra in self.de_buffer:
+                for m in regra.finditer(dados):
+                    if lexico is None:
+                        lexico = Lexico(dados)
+                    if lexico.contexto(m.start()) not in self.contextos[idx]:
+                        continue
+                    inicio = dados.rfind(b"\n", 0, m.start()) + 1
+                    fim = dados.find(b"\n", m.start())
+                    if fim == -1:
+                        fim = len(dados)
+                    chave = (dados[:inicio].count(b"\n") + 1, idx)
+                    achados.setdefault(chave, (inicio, fim, dados[inicio:fim].decode("utf-8", errors="replace")))
+
+        return [(num_linha, idx, *achados[num_linha, idx]) for num_linha, idx in sorted(achados)]
+
+    @staticmethod
+    def _todas_as_linhas(dados):
+        inicio = 0
+        while inicio < len(dados):
+            fim = dados.find(b"\n", inicio)
+            if fim == -1:
+                fim = len(dados)
+            yield inicio, fim
+            inicio = fim + 1
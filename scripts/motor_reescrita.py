@@ -0,0 +1,226 @@
+import re
+import difflib
+from datetime import datetime
+
+from indice_fontes import ArquivoFonte
+from lexico_ts import CODIGO, STRING, CONTEXTOS, Lexico, contextos
+
+VERSAO_PLANO = 2
+
+# Registro dos codemods: nome -> Codemod (na ordem de registro, que também
+# é a prioridade quando duas edições disputam o mesmo trecho)
+CODEMODS = {}
+
+
+class Edicao:
+    """Troca buffer[inicio:fim] por texto (inicio == fim é uma inserção)"""
+
+    __slots__ = ("inicio", "fim", "texto", "regra")
+
+    def __init__(self, inicio, fim, texto, regra):
+        self.inicio = inicio
+        self.fim = fim
+        self.texto = texto
+        self.regra = regra
+
+    def como_lista(self):
+        return [self.inicio, self.fim, self.texto, self.regra]
+
+
+class Codemod:
+    def __init__(self, nome, descricao, regex, substituir, flags=0, contexto=None):
+        self.nome = nome
+        self.descricao = descricao
+        self.regex = re.compile(regex, flags)
+        self.substituir = substituir
+        self.contextos = contextos(contexto or CONTEXTOS)
+
+    def edicoes(self, conteudo, lexico):
+        anterior = None
+        for m in self.regex.finditer(conteudo):
+            if lexico.contexto(m.start()) not in self.contextos:
+                continue
+            resultado = self.substituir(m, lexico)
+            # Duas ocorrências na mesma linha podem pedir a mesma edição
+            if resultado is None or resultado == anterior:
+                continue
+            anterior = resultado
+            inicio, fim, texto = resultado
+            yield Edicao(inicio, fim, texto, self.nome)
+
+
+def registrar_codemod(nome, descricao, regex, flags=0, contexto=None):
+    """
+    Decorador: registra uma função (match, léxico) -> (inicio, fim, texto) | None
+    como codemod. Só ocorrências que começam num dos contextos léxicos pedidos
+    ("codigo", "comentario", "string", ...) chegam à função.
+    Um codemod novo entra na mesma passada por arquivo, sem nova varredura da árvore.
+    """
+    def decorador(substituir):
+        CODEMODS[nome] = Codemod(nome, descricao, regex, substituir, flags, contexto)
+        return substituir
+    return decorador
+
+
+def resolver_conflitos(edicoes):
+    """
+    Ordena as edições e descarta as que se sobrepõem a uma já aceita.
+    Inserções (inicio == fim) no começo de um trecho substituído não conflitam.
+    Retorna (aceitas, descartadas).
+    """
+    prioridade = {nome: i for i, nome in enumerate(CODEMODS)}
+    ordenadas = sorted(edicoes, key=lambda e: (e.inicio, e.fim, prioridade.get(e.regra, len(prioridade))))
+    aceitas, descartadas = [], []
+    fim_anterior = 0
+    for edicao in ordenadas:
+        if edicao.inicio < fim_anterior:
+            descartadas.append(edicao)
+            continue
+        aceitas.append(edicao)
+        fim_anterior = max(fim_anterior, edicao.fim)
+    return aceitas, descartadas
+
+
+def planejar_edicoes(conteudo, regras):
+    """Segmenta o buffer uma vez, roda todos os codemods pedidos sobre ele e resolve os conflitos"""
+    lexico = Lexico(conteudo)
+    edicoes = []
+    for nome in regras:
+        edicoes.extend(CODEMODS[nome].edicoes(conteudo, lexico))
+    return resolver_conflitos(edicoes)
+
+
+def aplicar_edicoes(conteudo, edicoes):
+    """Aplica edições já ordenadas e sem sobreposição, montando o buffer novo de uma vez"""
+    partes = []
+    pos = 0
+    for inicio, fim, texto, _ in edicoes:
+        partes.append(conteudo[pos:inicio])
+        partes.append(texto)
+        pos = fim
+    partes.append(conteudo[pos:])
+    return "".join(partes)
+
+
+def planejar_arquivo(arquivo, regras):
+    """
+    Calcula as edições de um arquivo sem escrever nada.
+    Retorna {"caminho", "hash", "edicoes": [[inicio, fim, texto, regra]]} ou None.
+    """
+    conteudo = arquivo.conteudo
+    if conteudo is None:
+        print(f"  ❌ Erro ao ler {arquivo.caminho}: {arquivo.erro}")
+        return None
+    aceitas, descartadas = planejar_edicoes(conteudo, regras)
+    for edicao in descartadas:
+        print(f"  ⚠️  {arquivo.caminho_rel}: edição '{edicao.regra}' em conflito no offset {edicao.inicio}, ignorada")
+    if not aceitas:
+        return None
+    return {
+        "caminho": arquivo.caminho_rel,
+        "hash": arquivo.hash,
+        "edicoes": [e.como_lista() for e in aceitas],
+    }
+
+
+def gerar_plano(arquivos, regras):
+    """Uma única passada pela árvore, com todos os codemods: edições por arquivo + diff unificado"""
+    plano = {
+        "versao": VERSAO_PLANO,
+        "criado_em": datetime.now().isoformat(),
+        "regras": list(regras),
+        "arquivos": [],
+        "totais": {"arquivos": 0, **{nome: 0 for nome in regras}},
+    }
+    diffs = []
+
+    for arquivo in arquivos:
+        item = planejar_arquivo(arquivo, regras)
+        if item is None:
+            continue
+        plano["arquivos"].append(item)
+        plano["totais"]["arquivos"] += 1
+        for _, _, _, regra in item["edicoes"]:
+            plano["totais"][regra] += 1
+
+        antes = arquivo.conteudo
+        depois = aplicar_edicoes(antes, item["edicoes"])
+        diffs.extend(difflib.unified_diff(
+            antes.splitlines(keepends=True), depois.splitlines(keepends=True),
+            f"a/{item['caminho']}", f"b/{item['caminho']}",
+        ))
+
+    return plano, "".join(diffs)
+
+
+def aplicar_plano(plano, execucao=None):
+    """
+    Escreve exatamente o que está no plano, sem varrer a árvore de novo: só
+    os arquivos do plano são lidos, e cada um é escrito uma única vez. Se um
+    arquivo mudou desde o planejamento (hash diferente), ele é pulado para
+    não sobrescrever edições mais novas.
+    Retorna (aplicados, pulados, contagem por regra).
+    """
+    aplicados, pulados = [], []
+    contagem = {nome: 0 for nome in plano["regras"]}
+
+    for item in plano["arquivos"]:
+        caminho = item["caminho"]
+        try:
+            arquivo = ArquivoFonte.de_caminho(caminho)
+        except OSError:
+            pulados.append(caminho)
+            continue
+        if arquivo.hash != item["hash"]:
+            pulados.append(caminho)
+            continue
+
+        novo_conteudo = aplicar_edicoes(arquivo.conteudo, item["edicoes"])
+
+        # Backup antes de salvar
+        if execucao is not None:
+            execucao.guardar(caminho)
+
+        # newline="" preserva as quebras de linha originais
+        with open(caminho, "w", encoding="utf-8", newline="") as f:
+            f.write(novo_conteudo)
+
+        for _, _, _, regra in item["edicoes"]:
+            contagem[regra] += 1
+        aplicados.append(caminho)
+
+    return aplicados, pulados, contagem
+
+
+# CODEMODS PADRÃO
+
+@registrar_codemod(
+    "localhost",
+    "localhost:3000 → process.env.NEXT_PUBLIC_APP_URL",
+    r'["\']http://localhost:3000([^"\'\n]*)["\']',
+    contexto=["string"],
+)
+def _corrigir_localhost(m, lexico):
+    # Só a string inteira: aspas dentro de outra string não são o token
+    if lexico.segmento(m.start()) != (STRING, m.start(), m.end()):
+        return None
+    # "http://localhost:3000/api" -> `${process.env.NEXT_PUBLIC_APP_URL || ""}/api`
+    return m.start(), m.end(), f'`${{process.env.NEXT_PUBLIC_APP_URL || ""}}{m.group(1)}`'
+
+
+@registrar_codemod(
+    "console",
+    "console.log → comentado com // [FAXINEIRO]",
+    r'console\.log\(',
+    contexto=["codigo"],
+)
+def _comentar_console(m, lexico):
+    # Comenta a linha a partir da indentação (não apaga por segurança). Se a
+    # linha começa dentro de um template, string ou comentário, não mexe.
+    conteudo = m.string
+    inicio = conteudo.rfind("\n", 0, m.start()) + 1
+    while conteudo[inicio] in " \t":
+        inicio += 1
+    if lexico.contexto(inicio) != CODIGO:
+        return None
+    return inicio, inicio, "// [FAXINEIRO] "
@@ -0,0 +1,91 @@
+import time
+
+from lexico_ts import Lexico
+
+# CONFIGURAÇÃO
+TOP_ARQUIVOS = 15
+FASES = ("walk", "read", "scan", "clones", "serialize")
+
+
+class PerfilAuditoria:
+    """
+    Instrumentação do --profile: tempo por fase, custo de cada regra e os
+    arquivos mais lentos. Cada regra é medida isoladamente sobre o buffer
+    inteiro (no modo normal elas rodam juntas no regex combinado, e o custo
+    de uma regra com backtracking some no total).
+    """
+
+    def __init__(self, motor, top_n=TOP_ARQUIVOS):
+        self.motor = motor
+        self.top_n = top_n
+        self.fases = {fase: 0.0 for fase in FASES}
+        self.regras = {nome: {"tempo": 0.0, "linhas": 0, "hits": 0} for nome in motor.nomes}
+        self.arquivos = []
+
+    def registrar_arquivo(self, arquivo, leitura, varredura):
+        self.fases["read"] += leitura
+        self.fases["scan"] += varredura
+        self.arquivos.append((varredura + leitura, arquivo.caminho_rel, leitura, varredura, arquivo.tamanho))
+
+    def medir_regras(self, arquivo):
+        """
+        Roda cada regra sozinha no arquivo e acumula tempo, linhas examinadas e
+        linhas com ocorrência (no contexto léxico da regra; o léxico não entra no tempo)
+        """
+        conteudo = arquivo.conteudo
+        if not conteudo:
+            return
+        n_linhas = len(arquivo.offsets)
+        lexico = Lexico(conteudo)
+        motor = self.motor
+        for nome, regra, contextos, multilinha in zip(motor.nomes, motor.individuais, motor.contextos, motor.multilinha):
+            inicio = time.perf_counter()
+            ocorrencias = [m.start() for m in regra.finditer(conteudo) if multilinha or "\n" not in m.group()]
+            decorrido = time.perf_counter() - inicio
+            medida = self.regras[nome]
+            medida["tempo"] += decorrido
+            medida["linhas"] += n_linhas
+            medida["hits"] += len({
+                arquivo.linha_do_offset(pos) for pos in ocorrencias if lexico.contexto(pos) in contextos
+            })
+
+    def como_json(self):
+        regras = sorted(self.regras.items(), key=lambda item: item[1]["tempo"], reverse=True)
+        lentos = sorted(self.arquivos, reverse=True)[:self.top_n]
+        return {
+            "phases_ms": {fase: round(t * 1000, 2) for fase, t in self.fases.items()},
+            "files_profiled": len(self.arquivos),
+            "rules": [
+                {
+                    "rule": nome,
+                    "time_ms": round(m["tempo"] * 1000, 2),
+                    "lines": m["linhas"],
+                    "hits": m["hits"],
+                    "us_per_1k_lines": round(m["tempo"] * 1e9 / m["linhas"], 2) if m["linhas"] else 0,
+                }
+                for nome, m in regras
+            ],
+            "slowest_files": [
+                {
+                    "file": caminho,
+                    "read_ms": round(leitura * 1000, 3),
+                    "scan_ms": round(varredura * 1000, 3),
+                    "bytes": tamanho,
+                }
+                for _, caminho, leitura, varredura, tamanho in lentos
+            ],
+        }
+
+    def imprimir(self):
+        dados = self.como_json()
+        print("\n⏱️  PERFIL DA AUDITORIA")
+        print("-" * 60)
+        for fase, t in self.fases.items():
+            print(f"   {fase:<10} {t * 1000:>10.1f} ms")
+        print("\n   Regra                      tempo (ms)     linhas    hits")
+        for item in dados["rules"]:
+            print(f"   {item['rule']:<24} {item['time_ms']:>12.1f} {item['lines']:>10} {item['hits']:>7}")
+        print(f"\n   {self.top_n} arquivos mais lentos:")
+        for item in dados["slowest_files"]:
+            print(f"   {item['read_ms'] + item['scan_ms']:>8.2f} ms  {item['file']}")
+        print("-" * 60)
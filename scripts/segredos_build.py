@@ -0,0 +1,475 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import base64
+import argparse
+from collections import Counter
+from urllib.parse import urlsplit
+
+# CONFIGURAÇÃO
+PASTA_BUILD = ".next"
+IGNORAR_PASTAS = {"cache"}   # .next/cache é o cache do webpack: não é publicado
+PASTA_CLIENTE = "static"     # .next/static vai para o navegador
+EXTENSOES = {".js", ".mjs", ".cjs", ".json", ".html", ".rsc", ".body", ".txt", ".css"}
+JANELA = 1 << 20             # bytes lidos por vez
+SOBREPOSICAO = 8 << 10       # maior token casável; ocorrências que cruzam a borda da janela não se perdem
+ENTROPIA_MINIMA = 3.5        # bits/caractere: abaixo disso é placeholder (sk_test_xxxxxxxx...)
+MIN_VALOR_ENV = 12           # valores curtos do .env dariam falso positivo em qualquer bundle
+ARQUIVOS_ENV = [".env", ".env.local", ".env.production", ".env.production.local"]
+PREFIXO_PUBLICO = "NEXT_PUBLIC_"  # embutidas no bundle de propósito
+LIMIAR_PARALELO = 16         # arquivos a partir dos quais o pool compensa
+LOTES_POR_PROCESSO = 4
+
+# Nomes de variáveis que nunca deveriam aparecer no bundle do cliente
+NOMES_SENSIVEIS = [
+    "SUPABASE_SERVICE_ROLE_KEY", "STRIPE_SECRET_KEY", "MP_ACCESS_TOKEN", "CRON_SECRET",
+    "INTERNAL_API_TOKEN", "GOOGLE_CLIENT_SECRET", "UPSTASH_REDIS_REST_TOKEN", "service_role",
+]
+
+# REGRAS
+# "literais": prefixos buscados pelo prefiltro; "regex": forma completa, casada
+# na posição do literal; "entropia": só conta se o token não for placeholder;
+# "so_cliente": só vale em .next/static (no servidor é uso legítimo).
+REGRAS = {
+    "jwt": {
+        "literais": ["eyJ"],
+        "regex": r"eyJ[\w-]{8,2000}\.eyJ[\w-]{8,4000}\.[\w-]{16,1000}",
+        "severidade": "alta",
+        "emoji": "🔑",
+        "desc": "JWT com role service_role (chave admin do Supabase)",
+    },
+    "stripe_secret": {
+        "literais": ["sk_live_", "rk_live_"],
+        "regex": r"[sr]k_live_[0-9A-Za-z]{16,256}",
+        "entropia": True,
+        "severidade": "alta",
+        "emoji": "💳",
+        "desc": "Chave secreta do Stripe (live)",
+    },
+    "stripe_teste": {
+        "literais": ["sk_test_"],
+        "regex": r"sk_test_[0-9A-Za-z]{16,256}",
+        "entropia": True,
+        "severidade": "aviso",
+        "emoji": "💳",
+        "desc": "Chave secreta do Stripe (teste)",
+    },
+    "stripe_webhook": {
+        "literais": ["whsec_"],
+        "regex": r"whsec_[0-9A-Za-z+/=]{16,256}",
+        "entropia": True,
+        "severidade": "alta",
+        "emoji": "💳",
+        "desc": "Segredo de webhook do Stripe",
+    },
+    "mercadopago": {
+        "literais": ["APP_USR-"],
+        "regex": r"APP_USR-[0-9a-f-]{16,256}",
+        "entropia": True,
+        "severidade": "alta",
+        "emoji": "💰",
+        "desc": "Access token do MercadoPago",
+    },
+    "supabase_pat": {
+        "literais": ["sbp_"],
+        "regex": r"sbp_[0-9a-f]{40}",
+        "severidade": "alta",
+        "emoji": "🔑",
+        "desc": "Token de acesso pessoal do Supabase",
+    },
+    "github": {
+        "literais": ["ghp_", "gho_", "ghu_", "ghs_", "ghr_", "github_pat_"],
+        "regex": r"(?:gh[pousr]_[0-9A-Za-z]{36}|github_pat_\w{40,255})",
+        "entropia": True,
+        "severidade": "alta",
+        "emoji": "🐙",
+        "desc": "Token do GitHub",
+    },
+    "aws": {
+        "literais": ["AKIA", "ASIA"],
+        "regex": r"(?:AKIA|ASIA)[0-9A-Z]{16}",
+        "entropia": True,
+        "severidade": "alta",
+        "emoji": "☁️",
+        "desc": "Access key da AWS",
+    },
+    "chave_privada": {
+        "literais": ["-----BEGIN"],
+        "regex": r"-----BEGIN (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----",
+        "severidade": "alta",
+        "emoji": "🔐",
+        "desc": "Chave privada PEM",
+    },
+    "nome_sensivel": {
+        "literais": NOMES_SENSIVEIS,
+        "regex": None,
+        "so_cliente": True,
+        "severidade": "aviso",
+        "emoji": "👀",
+        "desc": "Nome de variável secreta no bundle do cliente (código de servidor vazou?)",
+    },
+    "valor_env": {
+        "literais": [],   # preenchidos com os valores do .env em tempo de execução
+        "regex": None,
+        "severidade": "alta",
+        "emoji": "🚨",
+        "desc": "Valor de variável secreta do .env embutido no build",
+    },
+}
+
+
+def entropia(texto):
+    """Entropia de Shannon em bits por caractere"""
+    if not texto:
+        return 0.0
+    total = len(texto)
+    return -sum(n / total * math.log2(n / total) for n in Counter(texto).values())
+
+
+def _url_simples(valor):
+    """URL sem usuário/senha nem query (ex: SUPABASE_URL): endereço, não segredo"""
+    try:
+        partes = urlsplit(valor)
+    except ValueError:
+        return False
+    return bool(partes.scheme and partes.netloc) and "@" not in partes.netloc and not partes.query
+
+
+def valores_env(arquivos=ARQUIVOS_ENV):
+    """
+    {valor: nome} das variáveis secretas (sem NEXT_PUBLIC_) dos .env presentes.
+    Valores que também estão numa NEXT_PUBLIC_ (ex: SUPABASE_URL igual a
+    NEXT_PUBLIC_SUPABASE_URL) já vão para o bundle de propósito e ficam de fora.
+    """
+    secretos, publicos = {}, set()
+    for caminho in arquivos:
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                linhas = f.read().splitlines()
+        except OSError:
+            continue
+        for linha in linhas:
+            linha = linha.strip()
+            if not linha or linha.startswith("#") or "=" not in linha:
+                continue
+            nome, valor = linha.split("=", 1)
+            nome = nome.removeprefix("export ").strip()
+            valor = valor.strip().strip("'\"")
+            if nome.startswith(PREFIXO_PUBLICO):
+                publicos.add(valor)
+            elif len(valor) >= MIN_VALOR_ENV and not _url_simples(valor):
+                secretos[valor] = nome
+    return {valor: nome for valor, nome in secretos.items() if valor not in publicos}
+
+
+def _mascarar(token):
+    return token[:6] + "…" + token[-4:] if len(token) > 14 else token[:3] + "…"
+
+
+def _papel_jwt(token):
+    """role do payload do JWT, ou None se não decodificar"""
+    try:
+        parte = token.split(".")[1]
+        payload = json.loads(base64.urlsafe_b64decode(parte + "=" * (-len(parte) % 4)))
+        return payload.get("role") if isinstance(payload, dict) else None
+    except (ValueError, IndexError):
+        return None
+
+
+class VarredorSegredos:
+    """
+    Lê cada arquivo em janelas de JANELA bytes, com SOBREPOSICAO bytes de
+    sobra entre uma e a próxima. O prefiltro procura cada literal com
+    bytes.find (busca em C, ~2x mais rápida que um regex com todos eles em
+    alternância); só nos candidatos roda a regra completa, a checagem de
+    entropia e a decodificação do JWT. O arquivo nunca é carregado inteiro.
+    """
+
+    def __init__(self, valores=None):
+        self.valores = valores or {}
+        self.por_literal = {}
+        for nome, regra in REGRAS.items():
+            for literal in regra["literais"]:
+                self.por_literal.setdefault(literal.encode("utf-8"), []).append(nome)
+        for valor in self.valores:
+            self.por_literal.setdefault(valor.encode("utf-8"), []).insert(0, "valor_env")
+        self.regexes = {
+            nome: re.compile(regra["regex"].encode("ascii"))
+            for nome, regra in REGRAS.items() if regra["regex"]
+        }
+        # Literais mais longos primeiro: um valor do .env que começa com "eyJ" ganha da regra de JWT.
+        # No servidor os literais "so_cliente" ficam de fora (cada literal custa uma passada na janela).
+        literais = sorted(self.por_literal, key=len, reverse=True)
+        self.literais = {
+            True: literais,
+            False: [l for l in literais if not all(REGRAS[nome].get("so_cliente") for nome in self.por_literal[l])],
+        }
+
+    def _candidatos(self, janela, limite, cliente):
+        """(offset, literal) dos literais que começam antes de limite, por offset"""
+        candidatos = []
+        for ordem, literal in enumerate(self.literais[cliente]):
+            fim = limite + len(literal) - 1
+            i = janela.find(literal, 0, fim)
+            while i != -1:
+                candidatos.append((i, ordem, literal))
+                i = janela.find(literal, i + 1, fim)
+        candidatos.sort()
+        return [(i, literal) for i, _, literal in candidatos]
+
+    def _classificar(self, nome, janela, inicio, literal, cliente):
+        """(fim, token, severidade, detalhe) ou None se o candidato não se confirmar"""
+        regra = REGRAS[nome]
+        if regra.get("so_cliente") and not cliente:
+            return None
+        if nome == "valor_env":
+            return inicio + len(literal), literal.decode("utf-8"), "alta", self.valores[literal.decode("utf-8")]
+        if regra["regex"] is None:
+            return inicio + len(literal), literal.decode("utf-8"), regra["severidade"], None
+        m = self.regexes[nome].match(janela, inicio)
+        if m is None:
+            return None
+        token = m.group().decode("ascii")
+        if nome == "jwt":
+            papel = _papel_jwt(token)
+            # A anon key é pública por definição (vai no NEXT_PUBLIC_SUPABASE_ANON_KEY)
+            if papel is None or papel == "anon":
+                return None
+            return m.end(), token, "alta" if papel == "service_role" else "aviso", f"role={papel}"
+        if regra.get("entropia") and entropia(token[len(literal):]) < ENTROPIA_MINIMA:
+            return None
+        return m.end(), token, regra["severidade"], None
+
+    def varrer(self, caminho, cliente):
+        achados = []
+        with open(caminho, "rb") as f:
+            base = 0           # offset (no arquivo) do início da janela
+            linha = 1          # linha no início da janela
+            coluna = 0         # coluna no início da janela
+            resto = b""
+            fim_ultimo = 0     # offset absoluto do fim do último achado (tokens não se sobrepõem)
+            while True:
+                bloco = f.read(JANELA)
+                janela = resto + bloco
+                if not janela:
+                    break
+                final = len(bloco) < JANELA
+                # Candidatos que começam na sobra são vistos inteiros na próxima janela
+                limite = len(janela) if final else max(len(janela) - SOBREPOSICAO, 0)
+                for inicio, literal in self._candidatos(janela, limite, cliente):
+                    if base + inicio < fim_ultimo:
+                        continue
+                    for nome in self.por_literal[literal]:
+                        resultado = self._classificar(nome, janela, inicio, literal, cliente)
+                        if resultado is None:
+                            continue
+                        fim, token, severidade, detalhe = resultado
+                        quebra = janela.rfind(b"\n", 0, inicio)
+                        achados.append({
+                            "file": caminho.replace("\\", "/"),
+                            "line": linha + janela.count(b"\n", 0, inicio),
+                            "column": inicio - quebra - 1 if quebra >= 0 else coluna + inicio,
+                            "offset": base + inicio,
+                            "rule": nome,
+                            "severity": severidade,
+                            "match": _mascarar(token),
+                            "detail": detalhe,
+                            "client": cliente,
+                        })
+                        fim_ultimo = base + fim
+                        break
+                quebra = janela.rfind(b"\n", 0, limite)
+                coluna = limite - quebra - 1 if quebra >= 0 else coluna + limite
+                linha += janela.count(b"\n", 0, limite)
+                base += limite
+                resto = janela[limite:]
+                if final:
+                    break
+        return achados
+
+
+# Varredor de cada processo do pool (montado uma vez, no initializer)
+_VARREDOR = None
+
+
+def _preparar(valores):
+    global _VARREDOR
+    _VARREDOR = VarredorSegredos(valores)
+
+
+def _varrer_lote(lote):
+    return [_VARREDOR.varrer(caminho, cliente) for caminho, cliente in lote]
+
+
+def listar_arquivos(pasta=PASTA_BUILD):
+    """[(caminho, é_do_cliente)] do build, maiores primeiro (o pool equilibra melhor)"""
+    arquivos = []
+    pilha = [pasta]
+    while pilha:
+        atual = pilha.pop()
+        with os.scandir(atual) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    if entrada.name not in IGNORAR_PASTAS:
+                        pilha.append(entrada.path)
+                elif os.path.splitext(entrada.name)[1] in EXTENSOES:
+                    arquivos.append((entrada.stat().st_size, entrada.path))
+    arquivos.sort(reverse=True)
+    cliente = os.path.join(pasta, PASTA_CLIENTE) + os.sep
+    return [(caminho, caminho.startswith(cliente)) for _, caminho in arquivos]
+
+
+def varrer_build(arquivos, valores, jobs=1):
+    """Achados de todos os arquivos, em paralelo se jobs > 1"""
+    if jobs <= 1 or len(arquivos) < LIMIAR_PARALELO:
+        _preparar(valores)
+        return [a for caminho, cliente in arquivos for a in _VARREDOR.varrer(caminho, cliente)]
+    # Lotes intercalados: cada lote recebe arquivos grandes e pequenos
+    n_lotes = min(len(arquivos), jobs * LOTES_POR_PROCESSO)
+    lotes = [arquivos[i::n_lotes] for i in range(n_lotes)]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_preparar, initargs=(valores,)) as pool:
+        return [a for resultado in pool.map(_varrer_lote, lotes) for lista in resultado for a in lista]
+
+
+# SOURCE MAPS
+
+_BASE64_VLQ = {c: i for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+
+def _decodificar_vlq(segmento):
+    valores, valor, deslocamento = [], 0, 0
+    for c in segmento:
+        digito = _BASE64_VLQ[c]
+        valor += (digito & 31) << deslocamento
+        if digito & 32:
+            deslocamento += 5
+        else:
+            valores.append(-(valor >> 1) if valor & 1 else valor >> 1)
+            valor = deslocamento = 0
+    return valores
+
+
+def caminho_source_map(caminho):
+    """Arquivo .map do chunk: o vizinho <arquivo>.map ou o do comentário sourceMappingURL"""
+    if os.path.isfile(caminho + ".map"):
+        return caminho + ".map"
+    with open(caminho, "rb") as f:
+        f.seek(max(os.fstat(f.fileno()).st_size - 512, 0))
+        cauda = f.read()
+    m = re.search(rb"[#@] sourceMappingURL=([^\s'\"*]+\.map)\s*(?:\*/)?\s*$", cauda)
+    if m is None:
+        return None
+    alvo = os.path.join(os.path.dirname(caminho), m.group(1).decode("utf-8", "replace"))
+    return alvo if os.path.isfile(alvo) else None
+
+
+def origem(mapa, linha, coluna):
+    """(fonte, linha original) do trecho gerado em linha:coluna, ou None"""
+    fonte = linha_original = coluna_original = 0
+    for numero, trecho in enumerate(mapa.get("mappings", "").split(";")):
+        coluna_gerada, melhor = 0, None
+        for segmento in trecho.split(","):
+            if not segmento:
+                continue
+            v = _decodificar_vlq(segmento)
+            coluna_gerada += v[0]
+            if len(v) >= 4:
+                # Fonte, linha e coluna originais são deltas acumulados desde o começo do arquivo
+                fonte += v[1]
+                linha_original += v[2]
+                coluna_original += v[3]
+                if numero == linha - 1 and coluna_gerada <= coluna:
+                    melhor = (fonte, linha_original)
+        if numero == linha - 1:
+            if melhor is None:
+                return None
+            fontes = mapa.get("sources", [])
+            return (fontes[melhor[0]] if melhor[0] < len(fontes) else "?"), melhor[1] + 1
+    return None
+
+
+def anotar_origens(achados):
+    """Acrescenta "source" (arquivo:linha original) aos achados cujo chunk tem source map"""
+    mapas = {}
+    for achado in achados:
+        caminho = achado["file"]
+        if caminho not in mapas:
+            mapa = None
+            caminho_mapa = caminho_source_map(caminho)
+            if caminho_mapa:
+                try:
+                    with open(caminho_mapa, "r", encoding="utf-8") as f:
+                        mapa = json.load(f)
+                except (OSError, ValueError):
+                    mapa = None
+            mapas[caminho] = mapa
+        mapa = mapas[caminho]
+        resultado = origem(mapa, achado["line"], achado["column"]) if mapa else None
+        achado["source"] = f"{resultado[0]}:{resultado[1]}" if resultado else None
+
+
+def gravar_relatorio(caminho, pasta, achados, n_arquivos, total_bytes, decorrido):
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("Build Secret Scan Results:\n\n")
+        f.write(f"Pasta: {pasta}/ ({n_arquivos} arquivos, {total_bytes / (1 << 20):.1f} MiB, {decorrido:.2f}s)\n\n")
+        if not achados:
+            f.write("✅ Nenhum segredo encontrado.\n")
+        for a in achados:
+            onde = "cliente" if a["client"] else "servidor"
+            f.write(f"[{a['severity'].upper()}] {a['file']}:{a['line']}:{a['column']} ({onde}) {a['rule']}: {a['match']}")
+            if a["detail"]:
+                f.write(f" ({a['detail']})")
+            if a.get("source"):
+                f.write(f" <- {a['source']}")
+            f.write("\n")
+
+
+def varrer_segredos(pasta=PASTA_BUILD, jobs=1, saida=None):
+    if not os.path.isdir(pasta):
+        print(f"❌ {pasta}/ não encontrado. Rode 'npm run build' antes.")
+        return {"status": "erro", "message": f"{pasta}/ não encontrado"}
+    inicio = time.perf_counter()
+    arquivos = listar_arquivos(pasta)
+    total_bytes = sum(os.path.getsize(c) for c, _ in arquivos)
+    valores = valores_env()
+    achados = varrer_build(arquivos, valores, jobs)
+    achados.sort(key=lambda a: (a["severity"] != "alta", a["file"], a["offset"]))
+    anotar_origens(achados)
+    decorrido = time.perf_counter() - inicio
+
+    print("🔎 VARREDURA DE SEGREDOS NO BUILD")
+    print("=" * 60)
+    for a in achados:
+        regra = REGRAS[a["rule"]]
+        onde = "cliente" if a["client"] else "servidor"
+        print(f"{'🔴' if a['severity'] == 'alta' else '🟡'} {regra['emoji']} {a['file']}:{a['line']}:{a['column']} ({onde})")
+        print(f"      {regra['desc']}: {a['match']}" + (f" ({a['detail']})" if a["detail"] else ""))
+        if a["source"]:
+            print(f"      ↳ origem: {a['source']}")
+    altos = sum(1 for a in achados if a["severity"] == "alta")
+    print(f"\n📊 {len(arquivos)} arquivos ({total_bytes / (1 << 20):.1f} MiB) em {decorrido:.2f}s: "
+          f"{altos} achados graves, {len(achados) - altos} avisos ({len(valores)} valores do .env verificados)")
+    if saida:
+        gravar_relatorio(saida, pasta, achados, len(arquivos), total_bytes, decorrido)
+        print(f"📝 Relatório salvo em: {saida}")
+    return {
+        "status": "pendente" if altos else "limpo",
+        "files_scanned": len(arquivos),
+        "bytes_scanned": total_bytes,
+        "findings": achados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procura segredos vazados no output do next build")
+    parser.add_argument("--pasta", default=PASTA_BUILD, help="pasta do build (padrão: .next)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="processos em paralelo (padrão: nº de CPUs)")
+    parser.add_argument("--output", help="grava o relatório em texto (ex: audit/02e_next_build_secret_scan.txt)")
+    args = parser.parse_args()
+    resultado = varrer_segredos(args.pasta, args.jobs, args.output)
+    # Saída != 0 com achado grave: serve de portão no deploy
+    sys.exit({"limpo": 0, "pendente": 1}.get(resultado["status"], 2))
@@ -0,0 +1,252 @@
+import io
+import os
+import sys
+import hmac
+import json
+import time
+import inspect
+import signal
+import secrets
+import argparse
+import contextlib
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from indice_fontes import PASTA_SRC, obter_indice
+from cache_auditoria import CACHE_DIR, CacheAuditoria, versao_regras
+from grafo_imports import GrafoImports
+from fronteira_cliente import AnaliseFronteira, violacoes_json
+import auditor_funcional
+import faxineiro
+import cacador_zumbis
+
+# CONFIGURAÇÃO
+HOST = "127.0.0.1"  # só local: o daemon lê e reescreve o código do projeto
+PORTA = int(os.environ.get("AUDIT_DAEMON_PORT", "8765"))
+TAMANHO_MAXIMO_PEDIDO = 1 << 20
+# Segredo gerado a cada início; src/lib/audit/daemon-client.ts lê do mesmo arquivo
+TOKEN_FILE = os.path.join(CACHE_DIR, "daemon.token")
+
+
+class ErroRPC(Exception):
+    def __init__(self, codigo, mensagem):
+        super().__init__(mensagem)
+        self.codigo = codigo
+        self.mensagem = mensagem
+
+
+class EstadoAuditoria:
+    """
+    O que fica quente entre os pedidos: o índice de src/ (conteúdo e offsets
+    dos arquivos que não mudaram), os caches de achados e de clones e o grafo
+    de imports.
+    A cada pedido a árvore é revarrida com scandir; só o que mudou é relido.
+    """
+
+    def __init__(self):
+        self.iniciado_em = time.time()
+        self.indice = obter_indice(PASTA_SRC)
+        self.cache = CacheAuditoria(versao_regras(auditor_funcional.PADROES))
+        self.cache_clones = auditor_funcional.carregar_cache_clones()
+        self._grafo = None
+        self._fronteira = None
+        self.metodos = {
+            "ping": self.ping,
+            "audit": self.audit,
+            "plan-fix": self.plan_fix,
+            "apply-fix": self.apply_fix,
+            "zombies": self.zombies,
+            "boundaries": self.boundaries,
+        }
+
+    def atualizar(self):
+        if self.indice.atualizar():
+            self._grafo = None
+            self._fronteira = None
+
+    def grafo(self):
+        if self._grafo is None:
+            self._grafo = GrafoImports(PASTA_SRC, extras=cacador_zumbis.ENTRADAS_EXTRAS)
+        return self._grafo
+
+    def fronteira(self):
+        if self._fronteira is None:
+            self._fronteira = AnaliseFronteira(self.grafo())
+        return self._fronteira
+
+    def chamar(self, metodo, params):
+        funcao = self.metodos.get(metodo)
+        if funcao is None:
+            raise ErroRPC(-32601, f"Método desconhecido: {metodo}")
+        # Só erro de assinatura vira "parâmetros inválidos"; TypeError de dentro do método é bug (-32603)
+        try:
+            inspect.signature(funcao).bind(**params)
+        except TypeError as e:
+            raise ErroRPC(-32602, f"Parâmetros inválidos: {e}")
+        self.atualizar()
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            resultado = funcao(**params)
+        resultado["output"] = saida.getvalue()
+        return resultado
+
+    # MÉTODOS RPC
+
+    def ping(self):
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.iniciado_em, 1),
+            "files": len(self.indice.entradas),
+        }
+
+    def audit(self, profile=False):
+        # hits/misses do relatório são desta auditoria, não da vida do daemon
+        self.cache.hits = self.cache.misses = 0
+        auditor_funcional.auditar_unico(cache=self.cache, cache_clones=self.cache_clones, perfilar=profile)
+        return {"report": auditor_funcional.carregar_relatorio()}
+
+    def plan_fix(self):
+        faxineiro.cabecalho()
+        plano = faxineiro.planejar()
+        diff = ""
+        if os.path.exists(faxineiro.DIFF_FILE):
+            with open(faxineiro.DIFF_FILE, "r", encoding="utf-8", newline="") as f:
+                diff = f.read()
+        return {"totals": plano["totais"], "diff": diff}
+
+    def apply_fix(self):
+        plano = faxineiro.carregar_plano()
+        if plano is None:
+            raise ErroRPC(1, "Nenhum plano salvo. Chame plan-fix primeiro.")
+        aplicados, pulados, id_backup = faxineiro.aplicar(plano)
+        self._grafo = None
+        self._fronteira = None
+        return {"applied": aplicados, "skipped": pulados, "backup": id_backup}
+
+    def zombies(self):
+        grafo = self.grafo()
+        return {
+            "zombies": [c.replace("\\", "/") for c in cacador_zumbis.listar_zumbis(grafo)],
+            "unresolved": {c.replace("\\", "/"): e for c, e in sorted(grafo.nao_resolvidos.items())},
+        }
+
+    def boundaries(self):
+        return {"violations": violacoes_json(self.fronteira())}
+
+
+def gerar_token(caminho=TOKEN_FILE):
+    """Token novo a cada início do daemon, legível só pelo dono do arquivo"""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    token = secrets.token_hex(32)
+    temp = caminho + ".tmp"
+    fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    os.replace(temp, caminho)
+    return token
+
+
+class TratadorRPC(BaseHTTPRequestHandler):
+    """
+    POST / com {"jsonrpc": "2.0", "id", "method", "params"}
+
+    O daemon reescreve código, então qualquer página aberta no navegador não
+    pode chamá-lo: pedidos com Origin (fetch de navegador), sem Content-Type
+    application/json (fetch "simples" sem preflight) ou sem o token são recusados.
+    """
+
+    estado = None
+    token = None
+
+    def _recusar(self, status, mensagem):
+        corpo = json.dumps({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": mensagem}},
+                           ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _autorizado(self):
+        if self.headers.get("Origin") is not None:
+            self._recusar(403, "Pedidos de navegador não são aceitos")
+            return False
+        tipo = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if tipo != "application/json":
+            self._recusar(415, "Content-Type deve ser application/json")
+            return False
+        enviado = self.headers.get("Authorization", "")
+        esperado = f"Bearer {self.token}"
+        if not self.token or not hmac.compare_digest(enviado.encode("utf-8"), esperado.encode("utf-8")):
+            self._recusar(401, "Token inválido")
+            return False
+        return True
+
+    def do_POST(self):
+        if not self._autorizado():
+            return
+        id_pedido = None
+        try:
+            tamanho = int(self.headers.get("Content-Length", 0))
+            if tamanho > TAMANHO_MAXIMO_PEDIDO:
+                raise ErroRPC(-32600, "Pedido grande demais")
+            try:
+                pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+            except ValueError:
+                raise ErroRPC(-32700, "JSON inválido")
+            if not isinstance(pedido, dict) or not isinstance(pedido.get("params", {}), dict):
+                raise ErroRPC(-32600, "Pedido inválido")
+            id_pedido = pedido.get("id")
+            resultado = self.estado.chamar(pedido.get("method"), pedido.get("params", {}))
+            resposta = {"jsonrpc": "2.0", "id": id_pedido, "result": resultado}
+        except ErroRPC as e:
+            resposta = {"jsonrpc": "2.0", "id": id_pedido, "error": {"code": e.codigo, "message": e.mensagem}}
+        except Exception as e:
+            print(f"❌ Erro no pedido: {e}", file=sys.stderr)
+            resposta = {"jsonrpc": "2.0", "id": id_pedido, "error": {"code": -32603, "message": str(e)}}
+
+        corpo = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        print(f"📨 {self.address_string()} {formato % args}", file=sys.stderr)
+
+
+def _encerrar(*_):
+    # SIGTERM segue o mesmo caminho do Ctrl+C (apaga o token no finally)
+    raise KeyboardInterrupt
+
+
+def servir(porta=PORTA):
+    print("🛰️  DAEMON DE AUDITORIA")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    TratadorRPC.estado = EstadoAuditoria()
+    TratadorRPC.token = gerar_token()
+    print(f"📁 {len(TratadorRPC.estado.indice.entradas)} arquivos indexados em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+    # Servidor de uma thread só: os pedidos são atendidos em série e nunca
+    # disputam o índice ou os arquivos que apply-fix reescreve
+    servidor = HTTPServer((HOST, porta), TratadorRPC)
+    print(f"🚀 Ouvindo em http://{HOST}:{porta} (métodos: {', '.join(TratadorRPC.estado.metodos)})")
+    print(f"🔑 Token em {TOKEN_FILE}")
+    signal.signal(signal.SIGTERM, _encerrar)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Daemon encerrado.")
+    finally:
+        servidor.server_close()
+        try:
+            os.remove(TOKEN_FILE)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daemon local (JSON-RPC sobre HTTP) com o índice e os achados em memória")
+    parser.add_argument("--port", type=int, default=PORTA)
+    args = parser.parse_args()
+    servir(args.port)
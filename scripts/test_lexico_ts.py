@@ -0,0 +1,75 @@
+"""Casos do Lexico: rode com `python -m pytest scripts`"""
+import pytest
+
+from lexico_ts import CODIGO, COMENTARIO, REGEX, STRING, TEMPLATE, Lexico
+
+# (fonte, trecho procurado, ocorrência do trecho, contexto esperado no início dele)
+CASOS = [
+    # strings e comentários
+    ('const a = "x // y"; b()', "x // y", 0, STRING),
+    ('const a = "x // y"; b()', "b()", 0, CODIGO),
+    ("const a = 'it\\'s'; b()", "s'", 0, STRING),
+    ("const a = 'it\\'s'; b()", "b()", 0, CODIGO),
+    ("a() // console.log(1)", "console", 0, COMENTARIO),
+    ("/* console.log(1) */ b()", "console", 0, COMENTARIO),
+    ("/* console.log(1) */ b()", "b()", 0, CODIGO),
+    ('const a = "sem fim\nconsole.log(1)', "console", 0, CODIGO),
+    # JSX: apóstrofo depois de letra é texto, "://" em texto não abre comentário
+    ("<p>Don't do it</p>; console.log(1)", "console", 0, CODIGO),
+    ("<a>http://x.com</a>; console.log(1)", "console", 0, CODIGO),
+    # templates, com ${...} aninhados
+    ("`a ${b} c`", "a ", 0, TEMPLATE),
+    ("`a ${b} c`", "b}", 0, CODIGO),
+    ("`a ${b} c`", " c", 0, TEMPLATE),
+    ("`x ${ {k: `y ${z}`}.k } w`; d()", "k:", 0, CODIGO),
+    ("`x ${ {k: `y ${z}`}.k } w`; d()", "y ", 0, TEMPLATE),
+    ("`x ${ {k: `y ${z}`}.k } w`; d()", "z}", 0, CODIGO),
+    ("`x ${ {k: `y ${z}`}.k } w`; d()", ".k", 0, CODIGO),
+    ("`x ${ {k: `y ${z}`}.k } w`; d()", " w", 0, TEMPLATE),
+    ("`x ${ {k: `y ${z}`}.k } w`; d()", "d()", 0, CODIGO),
+    # regex vs divisão
+    ("x = /ab+c/.test(s)", "ab+c", 0, REGEX),
+    ("if (/^\\/api/.test(p)) go()", "api", 0, REGEX),
+    ("if (/^\\/api/.test(p)) go()", "go()", 0, CODIGO),
+    ("x = a / b / c; console.log(1)", "b /", 0, CODIGO),
+    ("x = a / b / c; console.log(1)", "console", 0, CODIGO),
+    ("x = a++ / 2; console.log(1) // y", "console", 0, CODIGO),
+    ("x = a++ / 2; console.log(1) // y", " y", 0, COMENTARIO),
+    ("x = a-- / 2; console.log(1) // y", "console", 0, CODIGO),
+    ("x = [/[/]/, 1]; console.log(1)", "[/]", 0, REGEX),
+    ("x = [/[/]/, 1]; console.log(1)", "console", 0, CODIGO),
+    ("x = a + /re/.source", "re/", 0, REGEX),
+]
+
+
+def _posicao(fonte, trecho, ocorrencia):
+    pos = -1
+    for _ in range(ocorrencia + 1):
+        pos = fonte.index(trecho, pos + 1)
+    return pos
+
+
+@pytest.mark.parametrize("fonte, trecho, ocorrencia, esperado", CASOS)
+def test_contexto(fonte, trecho, ocorrencia, esperado):
+    assert Lexico(fonte).contexto(_posicao(fonte, trecho, ocorrencia)) == esperado
+
+
+@pytest.mark.parametrize("fonte, trecho, ocorrencia, esperado", CASOS)
+def test_contexto_em_bytes(fonte, trecho, ocorrencia, esperado):
+    # Mesma segmentação sobre bytes (é assim que o motor de padrões chama)
+    dados = fonte.encode("utf-8")
+    pos = len(fonte[:_posicao(fonte, trecho, ocorrencia)].encode("utf-8"))
+    assert Lexico(dados).contexto(pos) == esperado
+
+
+def test_offsets_em_bytes_com_multibyte():
+    fonte = 'const s = "ação"; console.log(s)'
+    dados = fonte.encode("utf-8")
+    assert Lexico(dados).contexto(dados.index(b"console")) == CODIGO
+    assert Lexico(dados).contexto(dados.index("ção".encode("utf-8"))) == STRING
+
+
+def test_segmento_devolve_limites():
+    fonte = 'a("xy") + b'
+    tipo, inicio, fim = Lexico(fonte).segmento(fonte.index("xy"))
+    assert (tipo, fonte[inicio:fim]) == (STRING, '"xy"')
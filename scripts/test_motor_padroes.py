@@ -0,0 +1,99 @@
+"""varrer_bytes contra a varredura de referência (linhas × regras): rode com `python -m pytest scripts`"""
+import os
+import re
+
+import pytest
+
+from auditor_funcional import PADROES
+from indice_fontes import EXTENSOES, PASTA_SRC
+from lexico_ts import Lexico, contextos, CONTEXTOS
+from motor_padroes import MotorPadroes
+
+MOTOR = MotorPadroes(PADROES)
+
+
+def referencia(texto):
+    """
+    A auditoria antes do motor combinado: cada regra testada em cada posição
+    de cada linha, contando no máximo uma vez por linha se a ocorrência começa
+    num contexto permitido. Regras multilinha rodam no texto inteiro.
+    """
+    lexico = Lexico(texto)
+    achados = set()
+    inicios = [0] + [m.end() for m in re.finditer("\n", texto)]
+    for nome, regra in PADROES.items():
+        permitidos = contextos(regra.get("contexto", CONTEXTOS))
+        padrao = re.compile(regra["regex"])
+        if regra.get("multilinha"):
+            for m in padrao.finditer(texto):
+                if lexico.contexto(m.start()) in permitidos:
+                    achados.add((texto.count("\n", 0, m.start()) + 1, nome))
+            continue
+        for num, inicio in enumerate(inicios, 1):
+            fim = texto.find("\n", inicio)
+            linha = texto[inicio:fim if fim != -1 else len(texto)]
+            pos = 0
+            while (m := padrao.search(linha, pos)) is not None:
+                if lexico.contexto(inicio + m.start()) in permitidos:
+                    achados.add((num, nome))
+                    break
+                pos = m.start() + 1
+    return sorted(achados, key=lambda a: (a[0], list(PADROES).index(a[1])))
+
+
+def motor(texto):
+    return [(linha, MOTOR.nomes[idx]) for linha, idx, *_ in MOTOR.varrer_bytes(texto.encode("utf-8"))]
+
+
+# (fonte, achados esperados [(linha, regra)])
+CASOS = [
+    ("console.log(1)", [(1, "console_log")]),
+    ('const s = "console.log(1)"', []),
+    ("// console.log(1)\nconsole.log(2)", [(2, "console_log")]),
+    ("x = a++ / 2; console.log(1) // y", [(1, "console_log")]),
+    ("console.log(1); console.log(2)", [(1, "console_log")]),
+    ("// TODO: revisar\nconst todo = 'TODO'", [(1, "todo_comment")]),
+    ("const mockUser = {}\nconst s = `const fakeX = 1`", [(1, "mock_data")]),
+    ("fetch('http://localhost:3000/api')", [(1, "localhost_hardcoded")]),
+    ('<a href="http://localhost:3000">x</a>', [(1, "localhost_hardcoded"), (1, "href_localhost")]),
+    ('<a href="#">x</a>', [(1, "href_vazio")]),
+    ("<button onClick={() => {\n}}>x</button>", [(1, "botao_vazio")]),
+    ("router.push(\n  ''\n)", [(1, "router_push_vazio")]),
+    ("const s = 'ação'; console.log(s)", [(1, "console_log")]),
+    ("", []),
+]
+
+
+@pytest.mark.parametrize("fonte, esperado", CASOS)
+def test_casos(fonte, esperado):
+    assert motor(fonte) == esperado
+
+
+@pytest.mark.parametrize("fonte", [fonte for fonte, _ in CASOS])
+def test_casos_iguais_a_referencia(fonte):
+    assert motor(fonte) == referencia(fonte)
+
+
+def _fontes_do_projeto():
+    if not os.path.isdir(PASTA_SRC):
+        return []
+    caminhos = []
+    for raiz, dirs, arquivos in os.walk(PASTA_SRC):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "node_modules"]
+        caminhos.extend(os.path.join(raiz, n) for n in arquivos if os.path.splitext(n)[1] in EXTENSOES)
+    return sorted(caminhos)
+
+
+def test_projeto_igual_a_referencia():
+    """Todos os arquivos de src/: o motor acha exatamente o que a varredura ingênua acha"""
+    caminhos = _fontes_do_projeto()
+    if not caminhos:
+        pytest.skip("src/ não encontrado (rode da raiz do projeto)")
+    divergentes = []
+    for caminho in caminhos:
+        with open(caminho, "rb") as f:
+            dados = f.read()
+        texto = dados.decode("utf-8", errors="replace")
+        if motor(texto) != referencia(texto):
+            divergentes.append(caminho)
+    assert divergentes == []
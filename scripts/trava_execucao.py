@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+
+# CONFIGURAÇÃO
+TRAVA_FILE = os.path.join(".cache", "audit", "execucao.lock")
+ULTIMA_FILE = os.path.join(".cache", "audit", "ultima_execucao.json")
+INTERVALO_ESPERA = 0.1
+ESPERA_MAXIMA = 300      # segundos esperando a trava antes de desistir
+IDADE_MAXIMA = 30 * 60   # trava mais velha que isso é considerada abandonada
+PRAZO_ESCRITA = 5        # trava vazia/ilegível por mais que isso: o dono morreu ao criá-la
+
+
+class TravaOcupada(Exception):
+    def __init__(self, dono):
+        super().__init__(
+            f"Outra execução ({dono.get('tipo')}, PID {dono.get('pid')}) segura {TRAVA_FILE} há mais de {ESPERA_MAXIMA}s"
+        )
+        self.dono = dono
+
+
+# Trava que este processo já segura (o daemon chama faxineiro.aplicar, que também trava)
+_dono_atual = None
+
+
+def _processo_vivo_windows(pid):
+    # No Windows os.kill(pid, 0) chama TerminateProcess: mataria o dono da trava.
+    # OpenProcess + GetExitCodeProcess só consulta.
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    STILL_ACTIVE = 259
+    ERROR_ACCESS_DENIED = 5
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    kernel32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # Existe mas é protegido/de outro usuário: na dúvida, vivo
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        codigo = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(codigo)):
+            return True
+        return codigo.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _processo_vivo(pid):
+    if os.name == "nt":
+        return _processo_vivo_windows(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        # Existe mas é de outro usuário (ou o SO não deixa sondar): na dúvida, vivo
+        return True
+    return True
+
+
+def ler_trava():
+    """Dono atual da trava, {} se o arquivo existe mas ainda está sendo escrito, None se livre"""
+    try:
+        with open(TRAVA_FILE, "r", encoding="utf-8") as f:
+            conteudo = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError:
+        return {}
+    try:
+        return json.loads(conteudo)
+    except ValueError:
+        return {}
+
+
+def _obsoleta(dono):
+    """Dono morto ou trava velha demais (processo travado, máquina reiniciada...)"""
+    if not dono:
+        try:
+            return time.time() - os.path.getmtime(TRAVA_FILE) > PRAZO_ESCRITA
+        except OSError:
+            return False
+    return not _processo_vivo(dono["pid"]) or time.time() - dono["inicio"] > IDADE_MAXIMA
+
+
+def _remover_obsoleta(dono):
+    # rename é atômico: se dois processos acham a mesma trava obsoleta, só um a tira
+    temp = f"{TRAVA_FILE}.obsoleta.{os.getpid()}"
+    try:
+        os.rename(TRAVA_FILE, temp)
+    except OSError:
+        return
+    with open(temp, "r", encoding="utf-8") as f:
+        removida = f.read()
+    try:
+        mesma = json.loads(removida) == dono
+    except ValueError:
+        mesma = dono == {}
+    if mesma:
+        os.remove(temp)
+        print(f"🔓 Trava abandonada removida (PID {dono.get('pid')}, {dono.get('tipo')})", file=sys.stderr)
+    elif not os.path.exists(TRAVA_FILE):
+        # Entre ler e renomear outro processo pegou a trava: devolve
+        os.rename(temp, TRAVA_FILE)
+    else:
+        os.remove(temp)
+
+
+def _tentar_criar(tipo):
+    dono = {
+        "id": f"{time.time_ns()}-{os.getpid()}",
+        "pid": os.getpid(),
+        "tipo": tipo,
+        "inicio": time.time(),
+    }
+    os.makedirs(os.path.dirname(TRAVA_FILE), exist_ok=True)
+    try:
+        fd = os.open(TRAVA_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(dono, f)
+    return dono
+
+
+def _liberar(dono, ok):
+    temp = ULTIMA_FILE + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump({**dono, "fim": time.time(), "ok": ok}, f)
+    os.replace(temp, ULTIMA_FILE)
+    if (ler_trava() or {}).get("id") == dono["id"]:
+        os.remove(TRAVA_FILE)
+
+
+def _concluida(id_execucao):
+    """True se a execução id_execucao terminou sem erro"""
+    try:
+        with open(ULTIMA_FILE, "r", encoding="utf-8") as f:
+            ultima = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return ultima.get("id") == id_execucao and ultima.get("ok")
+
+
+def _esperar(tipo, coalescer, espera_maxima):
+    """
+    Laço comum: adquire a trava (retorna (dono, None)) ou, se coalescer e a
+    execução em andamento for do mesmo tipo, espera ela terminar e retorna
+    (None, dono_dela).
+    """
+    limite = time.monotonic() + espera_maxima
+    seguida = None
+    avisado = False
+    while True:
+        if seguida is not None and _concluida(seguida["id"]):
+            return None, seguida
+        dono = _tentar_criar(tipo)
+        if dono is not None:
+            return dono, None
+
+        atual = ler_trava()
+        if atual is None:
+            continue
+        if _obsoleta(atual):
+            _remover_obsoleta(atual)
+            continue
+        if coalescer and seguida is None and atual.get("tipo") == tipo:
+            seguida = atual
+        if atual and not avisado:
+            acao = "aguardando o resultado dela" if seguida is not None else "aguardando"
+            print(f"⏳ Execução em andamento ({atual.get('tipo')}, PID {atual.get('pid')}); {acao}...", file=sys.stderr)
+            avisado = True
+        if time.monotonic() > limite:
+            raise TravaOcupada(atual)
+        time.sleep(INTERVALO_ESPERA)
+
+
+@contextmanager
+def _segurando(dono):
+    global _dono_atual
+    _dono_atual = dono
+    ok = False
+    try:
+        yield dono
+        ok = True
+    finally:
+        _dono_atual = None
+        _liberar(dono, ok)
+
+
+@contextmanager
+def trava_exclusiva(tipo, espera_maxima=ESPERA_MAXIMA):
+    """
+    Serializa execuções que leem ou reescrevem src/ e os relatórios (auditoria,
+    faxina, restauração do cofre). Reentrante dentro do mesmo processo.
+    """
+    if _dono_atual is not None:
+        yield _dono_atual
+        return
+    dono, _ = _esperar(tipo, False, espera_maxima)
+    with _segurando(dono):
+        yield dono
+
+
+def executar_unico(tipo, funcao, ler_resultado, espera_maxima=ESPERA_MAXIMA):
+    """
+    Single-flight: se já há uma execução do mesmo tipo em andamento, espera
+    ela terminar e devolve ler_resultado() em vez de repetir o trabalho.
+    Execuções de outro tipo (ex: uma faxina) são esperadas e depois esta roda.
+    Retorna (resultado, dono da execução seguida ou None se rodou aqui).
+    """
+    if _dono_atual is not None:
+        return funcao(), None
+    dono, seguida = _esperar(tipo, True, espera_maxima)
+    if seguida is not None:
+        return ler_resultado(), seguida
+    with _segurando(dono):
+        return funcao(), None
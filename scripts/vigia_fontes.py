@@ -0,0 +1,173 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from indice_fontes import PASTA_SRC, IGNORE_DIRS
+
+# CONFIGURAÇÃO
+DEBOUNCE = 0.05        # silêncio (s) que encerra uma rajada de saves
+ESPERA_MAXIMA = 0.5    # uma rajada contínua é liberada depois disso
+INTERVALO_POLLING = 0.5
+
+# Constantes do inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+MASCARA = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENTO = struct.Struct("iIII")
+
+
+def _carregar_libc():
+    """libc com inotify, ou None (macOS, Windows, libc sem suporte)"""
+    nome = ctypes.util.find_library("c")
+    if not nome:
+        return None
+    try:
+        libc = ctypes.CDLL(nome, use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def _pastas(raiz, ignore_dirs):
+    pilha = [raiz]
+    while pilha:
+        atual = pilha.pop()
+        yield atual
+        try:
+            with os.scandir(atual) as it:
+                for item in it:
+                    if item.is_dir(follow_symlinks=False) and item.name not in ignore_dirs:
+                        pilha.append(item.path)
+        except OSError:
+            continue
+
+
+def _fotografia(raiz, ignore_dirs):
+    """{caminho: (tamanho, mtime)} de todos os arquivos (usado no polling)"""
+    foto = {}
+    for pasta in _pastas(raiz, ignore_dirs):
+        try:
+            with os.scandir(pasta) as it:
+                for item in it:
+                    if item.is_file():
+                        st = item.stat()
+                        foto[item.path] = (st.st_size, st.st_mtime)
+        except OSError:
+            continue
+    return foto
+
+
+class VigiaFontes:
+    """
+    Observa uma pasta e entrega rajadas de alterações já agrupadas (debounce).
+    Usa inotify quando disponível e cai para polling por mtime quando não.
+
+    lotes() gera conjuntos de caminhos alterados, ou None quando não dá para
+    saber exatamente o que mudou (pasta criada/removida, fila do kernel
+    estourada) e a árvore inteira precisa ser revarrida.
+    """
+
+    def __init__(self, pasta=PASTA_SRC, ignore_dirs=IGNORE_DIRS, forcar_polling=False):
+        self.pasta = pasta
+        self.ignore_dirs = set(ignore_dirs)
+        self.libc = None if forcar_polling else _carregar_libc()
+        self.fd = None
+        self.pastas_por_wd = {}
+        if self.libc is not None:
+            fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self.fd = fd
+                self._observar_arvore()
+
+    @property
+    def modo(self):
+        return "inotify" if self.fd is not None else "polling"
+
+    def _observar_arvore(self):
+        for pasta in _pastas(self.pasta, self.ignore_dirs):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(pasta), MASCARA)
+            if wd < 0:
+                erro = ctypes.get_errno()
+                if erro == errno.ENOSPC:
+                    print(f"⚠️  Limite de inotify atingido (fs.inotify.max_user_watches); {pasta} não será observada")
+                continue
+            self.pastas_por_wd[wd] = pasta
+
+    def _ler_eventos(self):
+        """Eventos pendentes como (caminhos, precisa_varredura_completa)"""
+        caminhos, completa = set(), False
+        while True:
+            try:
+                dados = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return caminhos, completa
+            pos = 0
+            while pos < len(dados):
+                wd, mascara, _, tamanho = EVENTO.unpack_from(dados, pos)
+                nome = dados[pos + EVENTO.size:pos + EVENTO.size + tamanho].rstrip(b"\0")
+                pos += EVENTO.size + tamanho
+                if mascara & IN_Q_OVERFLOW:
+                    completa = True
+                    continue
+                if mascara & IN_IGNORED:
+                    self.pastas_por_wd.pop(wd, None)
+                    continue
+                pasta = self.pastas_por_wd.get(wd)
+                if pasta is None:
+                    continue
+                if mascara & (IN_ISDIR | IN_DELETE_SELF):
+                    completa = True
+                    continue
+                caminhos.add(os.path.join(pasta, os.fsdecode(nome)))
+
+    def _lotes_inotify(self):
+        while True:
+            select.select([self.fd], [], [])
+            caminhos, completa = self._ler_eventos()
+            inicio = time.monotonic()
+            # Debounce: espera a rajada acabar (ou a espera máxima)
+            while time.monotonic() - inicio < ESPERA_MAXIMA:
+                prontos, _, _ = select.select([self.fd], [], [], DEBOUNCE)
+                if not prontos:
+                    break
+                mais, completa_mais = self._ler_eventos()
+                caminhos |= mais
+                completa = completa or completa_mais
+            if completa:
+                # Pastas novas precisam de watch próprio
+                self._observar_arvore()
+                yield None
+            elif caminhos:
+                yield caminhos
+
+    def _lotes_polling(self):
+        anterior = _fotografia(self.pasta, self.ignore_dirs)
+        while True:
+            time.sleep(INTERVALO_POLLING)
+            atual = _fotografia(self.pasta, self.ignore_dirs)
+            if atual == anterior:
+                continue
+            alterados = {c for c in atual.keys() | anterior.keys() if atual.get(c) != anterior.get(c)}
+            anterior = atual
+            yield alterados
+
+    def lotes(self):
+        return self._lotes_inotify() if self.fd is not None else self._lotes_polling()
+
+    def fechar(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -4,7 +4,7 @@ import { useEffect, useState } from 'react'
 import { 
   Activity, FileCode, AlertTriangle, Bug, FileText, 
   Globe, RefreshCw, CheckCircle, Terminal, Search, 
-  Loader2, Link2, Copy, Eye, X, AlertCircle
+  Loader2, Link2, Copy, Eye, X, AlertCircle, Gauge, Layers
 } from 'lucide-react'
 import { Button } from '@/components/ui/button'
 
@@ -30,7 +30,44 @@ interface AuditReport {
     console_logs: number
     mock_data: number
     localhost_urls: number
+    clone_groups?: number
   }
+  perf?: AuditPerf
+  clones?: AuditClones
+}
+
+// Seção gerada por `python scripts/auditor_funcional.py --profile`
+interface AuditPerf {
+  phases_ms: Record<string, number>
+  files_profiled: number
+  rules: {
+    rule: string
+    time_ms: number
+    lines: number
+    hits: number
+    us_per_1k_lines: number
+  }[]
+  slowest_files: {
+    file: string
+    read_ms: number
+    scan_ms: number
+    bytes: number
+  }[]
+}
+
+// Grupos de código duplicado (detector_clones.py), maiores primeiro
+interface AuditClones {
+  min_tokens: number
+  groups: {
+    tokens: number
+    lines: number
+    occurrences: {
+      file: string
+      start_line: number
+      end_line: number
+      tokens: number
+    }[]
+  }[]
 }
 
 // Severidade por tipo de erro
@@ -68,19 +105,54 @@ export default function AuditPage() {
     loadReport()
   }, [])
 
-  async function runAudit() {
+  async function runAudit(profile = false) {
     try {
       setRunningAudit(true)
       setActionLog(null)
       
-      const response = await fetch('/api/admin/audit/run', { method: 'POST' })
-      const data = await response.json()
+      const response = await fetch('/api/admin/audit/run?stream=1' + (profile ? '&profile=1' : ''), { method: 'POST' })
       
-      if (data.success) {
+      if (!response.ok || !response.body) {
+        const data = await response.json().catch(() => null)
+        setActionLog('❌ ' + (data?.message || 'Falha desconhecida'))
+        return
+      }
+      
+      // NDJSON: progresso ao vivo enquanto o auditor roda
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      let findings = 0
+      let finished = false
+      let failure: string | null = null
+      
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split('\n')
+        buffer = lines.pop() || ''
+        
+        for (const line of lines) {
+          if (!line.trim()) continue
+          const record = JSON.parse(line)
+          if (record.type === 'finding') {
+            findings++
+          } else if (record.type === 'progress') {
+            setActionLog(`🔍 Analisando... ${record.files_done}/${record.files_total} arquivos, ${findings} problemas`)
+          } else if (record.type === 'summary') {
+            finished = true
+          } else if (record.type === 'error') {
+            failure = record.message
+          }
+        }
+      }
+      
+      if (finished && !failure) {
         setActionLog('✅ Auditoria concluída! Atualizando relatório...')
         await loadReport()
       } else {
-        setActionLog('❌ ' + (data.message || 'Falha desconhecida'))
+        setActionLog('❌ ' + (failure || 'Falha desconhecida'))
       }
     } catch (err) {
       setActionLog('❌ Erro ao executar auditoria')
@@ -192,7 +264,7 @@ export default function AuditPage() {
             </p>
             
             <Button 
-              onClick={runAudit}
+              onClick={() => runAudit()}
               disabled={runningAudit}
               className="bg-blue-600 hover:bg-blue-700 text-white px-8 py-6 text-lg rounded-xl shadow-lg"
             >
@@ -244,7 +316,7 @@ export default function AuditPage() {
           </div>
           <div className="flex gap-2">
             <Button 
-              onClick={runAudit}
+              onClick={() => runAudit()}
               disabled={runningAudit || fixingLocalhost || isProduction}
               className="bg-indigo-600 hover:bg-indigo-700"
             >
@@ -255,6 +327,14 @@ export default function AuditPage() {
               )}
               {runningAudit ? 'Analisando...' : 'Rodar Auditoria'}
             </Button>
+            <Button
+              onClick={() => runAudit(true)}
+              disabled={runningAudit || fixingLocalhost || isProduction}
+              variant="outline"
+              title="Rodar com --profile (mede regras e arquivos mais lentos)"
+            >
+              <Gauge className="w-4 h-4" />
+            </Button>
             <Button onClick={loadReport} variant="outline">
               <RefreshCw className="w-4 h-4" />
             </Button>
@@ -423,6 +503,78 @@ export default function AuditPage() {
           </div>
         </div>
 
+        {/* Desempenho (só aparece quando a auditoria rodou com --profile) */}
+        {report.perf && (
+          <div className="bg-white rounded-2xl shadow-lg overflow-hidden mb-8">
+            <div className="bg-gray-50 px-6 py-3 border-b flex items-center gap-2">
+              <Gauge className="w-5 h-5 text-indigo-500" />
+              <span className="font-bold text-gray-900">Desempenho da Auditoria</span>
+              <span className="ml-auto text-xs text-gray-500">{report.perf.files_profiled} arquivos perfilados</span>
+            </div>
+            <div className="p-6 grid md:grid-cols-3 gap-6">
+              <div>
+                <p className="text-xs text-gray-500 font-medium mb-2">Fases</p>
+                {Object.entries(report.perf.phases_ms).map(([phase, ms]) => (
+                  <div key={phase} className="flex justify-between text-sm py-1">
+                    <span className="text-gray-600">{phase}</span>
+                    <span className="font-mono text-gray-900">{ms.toFixed(1)} ms</span>
+                  </div>
+                ))}
+              </div>
+              <div>
+                <p className="text-xs text-gray-500 font-medium mb-2">Regras (mais caras primeiro)</p>
+                {report.perf.rules.map((rule, idx) => (
+                  <div key={rule.rule} className="flex justify-between text-sm py-1">
+                    <span className={idx === 0 ? 'text-red-600 font-medium' : 'text-gray-600'}>
+                      {rule.rule} <span className="text-xs text-gray-400">({rule.hits} hits)</span>
+                    </span>
+                    <span className="font-mono text-gray-900">{rule.time_ms.toFixed(1)} ms</span>
+                  </div>
+                ))}
+              </div>
+              <div>
+                <p className="text-xs text-gray-500 font-medium mb-2">Arquivos mais lentos</p>
+                <div className="max-h-64 overflow-y-auto">
+                  {report.perf.slowest_files.map(f => (
+                    <div key={f.file} className="flex justify-between gap-2 text-sm py-1">
+                      <span className="text-gray-600 truncate" title={f.file}>{f.file}</span>
+                      <span className="font-mono text-gray-900 shrink-0">{(f.read_ms + f.scan_ms).toFixed(2)} ms</span>
+                    </div>
+                  ))}
+                </div>
+              </div>
+            </div>
+          </div>
+        )}
+
+        {/* Código duplicado */}
+        {report.clones && report.clones.groups.length > 0 && (
+          <div className="bg-white rounded-2xl shadow-lg overflow-hidden mb-8">
+            <div className="bg-gray-50 px-6 py-3 border-b flex items-center gap-2">
+              <Layers className="w-5 h-5 text-teal-500" />
+              <span className="font-bold text-gray-900">Código Duplicado</span>
+              <span className="ml-auto text-xs text-gray-500">
+                {report.clones.groups.length} grupos (mínimo {report.clones.min_tokens} tokens)
+              </span>
+            </div>
+            <div className="p-6 space-y-4 max-h-96 overflow-y-auto">
+              {report.clones.groups.map((group, idx) => (
+                <div key={idx}>
+                  <p className="text-sm font-medium text-gray-900">
+                    {group.occurrences.length} cópias
+                    <span className="text-xs text-gray-400 ml-2">~{group.tokens} tokens / {group.lines} linhas</span>
+                  </p>
+                  {group.occurrences.map(o => (
+                    <p key={`${o.file}:${o.start_line}`} className="text-xs font-mono text-gray-600 truncate" title={o.file}>
+                      {o.file}:{o.start_line}-{o.end_line}
+                    </p>
+                  ))}
+                </div>
+              ))}
+            </div>
+          </div>
+        )}
+
         {/* Lista Detalhada */}
         {summary.total_errors > 0 ? (
           <div className="space-y-4">
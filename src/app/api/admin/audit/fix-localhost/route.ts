@@ -1,9 +1,6 @@
 import { NextResponse } from 'next/server'
-import { exec } from 'child_process'
-import { promisify } from 'util'
 import { requireInternalAuth, blockInProduction } from '@/lib/security/internal-auth'
-
-const execAsync = promisify(exec)
+import { runAuditCli } from '@/lib/audit/cli'
 
 export async function POST(request: Request) {
   // SECURITY: Bloquear em produção (modifica código-fonte)
@@ -18,10 +15,7 @@ export async function POST(request: Request) {
   }
 
   try {
-    const { stdout, stderr } = await execAsync('python scripts/fix_localhost.py', {
-      cwd: process.cwd(),
-      timeout: 60000,
-    })
+    const { stdout, stderr } = await runAuditCli(['fix-localhost', '--yes'], 60000)
 
     return NextResponse.json({
       success: true,
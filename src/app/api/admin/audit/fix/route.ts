@@ -1,9 +1,9 @@
 import { NextResponse } from 'next/server'
-import { exec } from 'child_process'
-import { promisify } from 'util'
+import { readFile } from 'fs/promises'
+import path from 'path'
 import { requireInternalAuth, blockInProduction } from '@/lib/security/internal-auth'
-
-const execAsync = promisify(exec)
+import { callAuditDaemon } from '@/lib/audit/daemon-client'
+import { runAuditCli } from '@/lib/audit/cli'
 
 export async function POST(request: Request) {
   // SECURITY: Bloquear em produção (executa código Python)
@@ -17,16 +17,51 @@ export async function POST(request: Request) {
     throw error
   }
 
+  // action: 'plan' (gera o plano + diff), 'apply' (aplica o último plano salvo)
+  // ou ausente (planeja e aplica na mesma chamada, comportamento antigo)
+  let action: string | undefined
   try {
-    // O script faxineiro.py precisa de confirmação, então vamos criar uma versão
-    // que aceita "s" automaticamente via stdin
-    const { stdout, stderr } = await execAsync(
-      'echo s | python scripts/faxineiro.py',
-      {
-        cwd: process.cwd(),
-        timeout: 120000, // 2 minutos timeout
-      }
-    )
+    const body = await request.json()
+    action = body?.action
+  } catch {
+    action = undefined
+  }
+
+  if (action && action !== 'plan' && action !== 'apply') {
+    return NextResponse.json({
+      success: false,
+      message: 'Ação inválida. Use "plan" ou "apply".'
+    }, { status: 400 })
+  }
+
+  try {
+    // Daemon rodando (scripts/servidor_auditoria.py): sem subir o Python de novo
+    const daemonResponse = await fixWithDaemon(action)
+    if (daemonResponse) {
+      return daemonResponse
+    }
+
+    // Sem action, planeja e aplica com --yes (sem confirmação no stdin)
+    const args = action === 'plan'
+      ? ['fix', '--dry-run']
+      : action === 'apply'
+        ? ['fix', '--saved-plan']
+        : ['fix', '--yes']
+
+    const { stdout, stderr } = await runAuditCli(args, 120000) // 2 minutos timeout
+
+    if (action === 'plan') {
+      const diff = await readFile(path.join(process.cwd(), '.cache', 'faxina', 'plano.diff'), 'utf-8')
+        .catch(() => '')
+
+      return NextResponse.json({
+        success: true,
+        message: 'Plano de faxina gerado. Revise o diff e aplique com action "apply".',
+        output: stdout,
+        diff,
+        errors: stderr || null
+      })
+    }
 
     return NextResponse.json({
       success: true,
@@ -47,6 +82,41 @@ export async function POST(request: Request) {
   }
 }
 
+async function fixWithDaemon(action: string | undefined) {
+  let output = ''
+
+  if (action !== 'apply') {
+    const plan = await callAuditDaemon<{ totals: Record<string, number>; diff: string; output: string }>('plan-fix')
+    if (!plan) return null
+    output += plan.output
+
+    if (action === 'plan') {
+      return NextResponse.json({
+        success: true,
+        message: 'Plano de faxina gerado. Revise o diff e aplique com action "apply".',
+        output,
+        diff: plan.diff,
+        errors: null
+      })
+    }
+    if (plan.totals.arquivos === 0) {
+      return NextResponse.json({ success: true, message: 'Nada para corrigir! Código já está limpo.', output, errors: null })
+    }
+  }
+
+  const applied = await callAuditDaemon<{ applied: string[]; skipped: string[]; backup: string | null; output: string }>('apply-fix')
+  if (!applied) return null
+  output += applied.output
+
+  return NextResponse.json({
+    success: true,
+    message: 'Faxina concluída com sucesso!',
+    output,
+    backup: applied.backup,
+    errors: null
+  })
+}
+
 export async function GET(request: Request) {
   // SECURITY: Proteger endpoint
   try {
@@ -59,7 +129,7 @@ export async function GET(request: Request) {
   }
 
   return NextResponse.json({
-    message: 'Use POST para executar a faxina automática',
+    message: 'Use POST para executar a faxina automática ({ action: "plan" } para preview, { action: "apply" } para aplicar)',
     note: 'Endpoint disponível apenas em desenvolvimento'
   })
 }
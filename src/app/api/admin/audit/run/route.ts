@@ -1,9 +1,8 @@
 import { NextResponse } from 'next/server'
-import { exec } from 'child_process'
-import { promisify } from 'util'
+import { spawn } from 'child_process'
 import { requireInternalAuth, blockInProduction } from '@/lib/security/internal-auth'
-
-const execAsync = promisify(exec)
+import { callAuditDaemon } from '@/lib/audit/daemon-client'
+import { runAuditCli } from '@/lib/audit/cli'
 
 export async function POST(request: Request) {
   // SECURITY: Bloquear em produção (executa código Python)
@@ -17,11 +16,34 @@ export async function POST(request: Request) {
     throw error
   }
 
+  // ?profile=1 grava a seção perf (fases, regras, arquivos lentos) no relatório
+  const { searchParams } = new URL(request.url)
+  const profile = searchParams.get('profile') === '1'
+
+  // ?stream=1 repassa o NDJSON do auditor linha a linha, sem esperar o fim
+  const stream = searchParams.get('stream') === '1'
+
   try {
-    const { stdout, stderr } = await execAsync('python scripts/auditor_funcional.py', {
-      cwd: process.cwd(),
-      timeout: 60000, // 60 segundos timeout
-    })
+    // Daemon rodando (scripts/servidor_auditoria.py): índice e cache já em memória
+    const daemon = await callAuditDaemon<{ report: any; output: string }>('audit', { profile })
+    if (daemon) {
+      if (stream) {
+        return new Response(reportToNdjson(daemon.report), { headers: NDJSON_HEADERS })
+      }
+      return NextResponse.json({
+        success: true,
+        message: 'Auditoria concluída com sucesso!',
+        output: daemon.output,
+        errors: null
+      })
+    }
+
+    if (stream) {
+      return streamAudit(profile)
+    }
+
+    // Saída 1 (achados encontrados) também é sucesso aqui
+    const { stdout, stderr } = await runAuditCli(profile ? ['audit', '--profile'] : ['audit'], 60000) // 60 segundos timeout
 
     return NextResponse.json({
       success: true,
@@ -42,6 +64,64 @@ export async function POST(request: Request) {
   }
 }
 
+const NDJSON_HEADERS = {
+  'Content-Type': 'application/x-ndjson; charset=utf-8',
+  'Cache-Control': 'no-cache',
+}
+
+// Mesmos registros do --stream, montados a partir do relatório que o daemon devolve
+function reportToNdjson(report: any) {
+  const total = report.summary.files_scanned
+  const records = [
+    { type: 'start', files_total: total },
+    ...report.errors.map((error: any) => ({ type: 'finding', error })),
+    { type: 'progress', files_done: total, files_total: total },
+    { type: 'summary', summary: report.summary, report: 'public/audit-report.json' },
+  ]
+  return records.map(record => JSON.stringify(record)).join('\n') + '\n'
+}
+
+// Registros NDJSON: start, finding, progress e summary (+ error se o processo falhar)
+function streamAudit(profile: boolean) {
+  const args = ['scripts/auditor_funcional.py', '--stream']
+  if (profile) args.push('--profile')
+
+  const child = spawn('python', args, { cwd: process.cwd() })
+  const timer = setTimeout(() => child.kill(), 60000) // 60 segundos timeout
+  const encoder = new TextEncoder()
+  // Depois de cancel() (cliente desconectou) ou do primeiro fim ('error' e 'close' disparam os dois
+  // quando o spawn falha), o controller não aceita mais nada: enqueue/close lançariam "Invalid state"
+  let closed = false
+
+  const body = new ReadableStream({
+    start(controller) {
+      const finish = (error?: string) => {
+        if (closed) return
+        closed = true
+        clearTimeout(timer)
+        if (error) {
+          controller.enqueue(encoder.encode(JSON.stringify({ type: 'error', message: error }) + '\n'))
+        }
+        controller.close()
+      }
+
+      child.stdout.on('data', (chunk: Buffer) => {
+        if (!closed) controller.enqueue(chunk)
+      })
+      child.stderr.on('data', (chunk: Buffer) => console.error('Auditoria:', chunk.toString()))
+      child.on('error', (error) => finish(error.message))
+      child.on('close', (code) => finish(code !== 0 ? `Auditor saiu com código ${code}` : undefined))
+    },
+    cancel() {
+      closed = true
+      clearTimeout(timer)
+      child.kill()
+    },
+  })
+
+  return new Response(body, { headers: NDJSON_HEADERS })
+}
+
 export async function GET(request: Request) {
   // SECURITY: Proteger endpoint
   try {
@@ -0,0 +1,48 @@
+import 'server-only'
+
+import { execFile } from 'child_process'
+
+/**
+ * Cliente da CLI de auditoria (python -m scripts <subcomando>)
+ *
+ * Usado pelos routes de /api/admin/audit quando o daemon não está rodando.
+ * Os subcomandos recebem --yes/--dry-run em vez de ler a confirmação do
+ * stdin, e o resultado vem pelo código de saída.
+ */
+
+export const CLI_EXIT = {
+  OK: 0,
+  PENDING: 1, // rodou e achou algo (achados, zumbis, correções não aplicadas)
+  ERROR: 2,
+  BUSY: 3, // outra auditoria/faxina segurou a trava por tempo demais
+  NEEDS_CONFIRMATION: 4, // faltou --yes ou --dry-run
+} as const
+
+export interface AuditCliResult {
+  code: number
+  stdout: string
+  stderr: string
+}
+
+/**
+ * Roda `python -m scripts ...args` na raiz do projeto
+ * @returns stdout/stderr quando a saída é OK ou PENDING
+ * @throws Error com code, stdout e stderr nos demais casos (ou timeout)
+ */
+export function runAuditCli(args: string[], timeoutMs = 120000): Promise<AuditCliResult> {
+  return new Promise((resolve, reject) => {
+    execFile(
+      'python',
+      ['-m', 'scripts', ...args],
+      { cwd: process.cwd(), timeout: timeoutMs, maxBuffer: 16 * 1024 * 1024 },
+      (error, stdout, stderr) => {
+        const code = error ? (typeof error.code === 'number' ? error.code : -1) : CLI_EXIT.OK
+        if (code === CLI_EXIT.OK || code === CLI_EXIT.PENDING) {
+          resolve({ code, stdout, stderr })
+          return
+        }
+        reject(Object.assign(error ?? new Error(`python -m scripts saiu com código ${code}`), { code, stdout, stderr }))
+      }
+    )
+  })
+}
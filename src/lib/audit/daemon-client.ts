@@ -0,0 +1,84 @@
+import 'server-only'
+
+import { readFile } from 'fs/promises'
+import path from 'path'
+
+/**
+ * Cliente do daemon de auditoria (python scripts/servidor_auditoria.py)
+ *
+ * O daemon mantém o índice de src/, o cache de achados e o grafo de imports
+ * em memória. Os routes de /api/admin/audit usam o daemon quando ele está
+ * rodando e voltam a executar os scripts Python quando não está.
+ *
+ * Cada pedido leva o token que o daemon grava ao iniciar: sem ele (ou vindo
+ * de um navegador, com Origin) o daemon recusa.
+ */
+
+const DAEMON_URL = `http://127.0.0.1:${process.env.AUDIT_DAEMON_PORT || '8765'}`
+const DAEMON_TOKEN_FILE = path.join(process.cwd(), '.cache', 'audit', 'daemon.token')
+
+async function readDaemonToken(): Promise<string | null> {
+  try {
+    return (await readFile(DAEMON_TOKEN_FILE, 'utf-8')).trim() || null
+  } catch {
+    return null
+  }
+}
+
+export type AuditDaemonMethod = 'ping' | 'audit' | 'plan-fix' | 'apply-fix' | 'zombies' | 'boundaries'
+
+export class AuditDaemonError extends Error {
+  code: number
+
+  constructor(message: string, code: number) {
+    super(message)
+    this.name = 'AuditDaemonError'
+    this.code = code
+  }
+}
+
+/**
+ * Chama um método JSON-RPC do daemon
+ * @returns o resultado, ou null se o daemon não estiver rodando
+ * @throws AuditDaemonError se o daemon respondeu com erro
+ */
+export async function callAuditDaemon<T = any>(
+  method: AuditDaemonMethod,
+  params: Record<string, unknown> = {},
+  timeoutMs = 120000
+): Promise<T | null> {
+  // Sem token o daemon não está rodando (ele apaga o arquivo ao encerrar)
+  const token = await readDaemonToken()
+  if (!token) {
+    return null
+  }
+
+  let response: Response
+  try {
+    response = await fetch(DAEMON_URL, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` },
+      body: JSON.stringify({ jsonrpc: '2.0', id: Date.now(), method, params }),
+      signal: AbortSignal.timeout(timeoutMs),
+      cache: 'no-store',
+    })
+  } catch (error: any) {
+    // Timeout: o daemon está vivo mas lento, não vale rodar o script de novo
+    if (error?.name === 'TimeoutError') {
+      throw new AuditDaemonError('Daemon de auditoria não respondeu a tempo', -32000)
+    }
+    // Conexão recusada: daemon fora do ar
+    return null
+  }
+
+  // Token de um daemon antigo (arquivo sobrou de um encerramento abrupto): roda os scripts
+  if (response.status === 401) {
+    return null
+  }
+
+  const data = await response.json()
+  if (data.error) {
+    throw new AuditDaemonError(data.error.message, data.error.code)
+  }
+  return data.result as T
+}